@@ -3,10 +3,16 @@ Admin configuration for the custom User model.
 This file customizes how the User model appears and is managed in the Django admin interface.
 """
 
+import re
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from .changelist import EstimatedCountPaginator, KeysetChangeList
 from .models import User
 
+# A whole address, searched with the unique index rather than a substring scan
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     """
@@ -25,7 +31,19 @@ class UserAdmin(BaseUserAdmin):
     )
     # Columns to display in the user list view
     list_display = ("email", "full_name", "is_staff", "is_active")
-    # Fields to enable search by in the admin
+    # Fields to enable search by in the admin (trigram-indexed on PostgreSQL)
     search_fields = ("email", "full_name")
-    # Default ordering for the user list
+    # Default ordering for the user list, also the keyset the changelist pages by
     ordering = ("email",)
+    # Estimated counts instead of COUNT(*) on every page
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if EMAIL_RE.match(search_term):
+            return queryset.filter(email=User.objects.normalize_email(search_term)), False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,61 @@
+"""
+Authentication backend for the custom User model.
+Extends Django's ModelBackend to look users up through the user cache, and so the
+async login path never hashes on the event loop.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from config.db_router import apin_if_sticky_email, pin_if_sticky_email
+
+UserModel = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates users by email and password.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        pin_if_sticky_email(username)
+        try:
+            user = UserModel._default_manager.get_cached(email=username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+        else:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        """
+        Async variant of authenticate() that awaits the hashing pool, including for the
+        dummy hash run for unknown emails.
+        """
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return
+        await apin_if_sticky_email(username)
+        try:
+            user = await UserModel._default_manager.aget_cached(email=username)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            await UserModel().aset_password(password)
+        else:
+            if await user.acheck_password(password) and self.user_can_authenticate(user):
+                return user
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.get_cached(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,252 @@
+"""
+Streaming bulk import and export of users (see the import_users and export_users
+management commands).
+Rows are read and written in fixed-size batches, so memory stays bounded whatever the
+file size. Passwords are carried as Django-encoded hashes and never re-hashed; users
+without one get an unusable password. On PostgreSQL each batch is loaded with COPY into
+a temporary table and inserted from there, elsewhere with bulk_create. Emails that
+already exist are skipped, which makes re-importing a batch harmless.
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .email_filter import get_email_filter
+
+User = get_user_model()
+
+FIELDS = ("email", "full_name", "password", "is_active", "is_staff", "is_superuser", "date_joined")
+
+FORMATS = ("csv", "jsonl")
+
+_TRUE = {"1", "t", "true", "y", "yes"}
+_FALSE = {"", "0", "f", "false", "n", "no"}
+
+
+def detect_format(path):
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_rows(f, fmt):
+    """
+    Yield the rows of a CSV (with a header) or JSON Lines file: dicts for CSV, and
+    the unparsed lines for JSON Lines, which clean_row() decodes so that a malformed
+    line only skips that row.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def _bool(value, default):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"Invalid boolean {value!r}.")
+
+
+def _text(row, name):
+    value = row.get(name)
+    # JSON Lines values can be any JSON type
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"Invalid {name} {value!r}.")
+    return value
+
+
+def clean_row(row):
+    """
+    Validate an input row (a dict, or a JSON Lines line) and return the user's field values.
+    Raises ValueError for rows that can't be imported.
+    """
+    if isinstance(row, str):
+        # json.JSONDecodeError is a ValueError
+        row = json.loads(row)
+        if not isinstance(row, dict):
+            raise ValueError("Row is not a JSON object.")
+    email = User.objects.normalize_email(_text(row, "email"))
+    if "@" not in email:
+        raise ValueError(f"Invalid email {email!r}.")
+    password = _text(row, "password") or None
+    if password is None:
+        password = make_password(None)
+    else:
+        # Must already be encoded by one of PASSWORD_HASHERS (or be unusable)
+        if not password.startswith("!"):
+            identify_hasher(password)
+    date_joined = _text(row, "date_joined")
+    if date_joined:
+        date_joined = parse_datetime(date_joined)
+        if date_joined is None:
+            raise ValueError(f"Invalid date_joined {row['date_joined']!r}.")
+        if timezone.is_naive(date_joined):
+            date_joined = timezone.make_aware(date_joined, dt_timezone.utc)
+    values = {
+        "email": email,
+        "full_name": (_text(row, "full_name") or "").strip(),
+        "password": password,
+        "is_active": _bool(row.get("is_active"), True),
+        "is_staff": _bool(row.get("is_staff"), False),
+        "is_superuser": _bool(row.get("is_superuser"), False),
+        "date_joined": date_joined or timezone.now(),
+    }
+    # Checked here, since a value the column can't hold fails the whole batch's insert
+    for name in ("email", "full_name", "password"):
+        max_length = User._meta.get_field(name).max_length
+        if len(values[name]) > max_length:
+            raise ValueError(f"{name} is longer than {max_length} characters.")
+    return values
+
+
+def _copy_insert(rows):
+    """
+    Load rows with COPY into a temporary table, then insert the new ones.
+    """
+    table = connection.ops.quote_name(User._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(User._meta.get_field(name).column) for name in FIELDS)
+    data = io.StringIO()
+    # Quoted, because an unquoted empty CSV field is NULL to COPY
+    writer = csv.writer(data, quoting=csv.QUOTE_ALL)
+    for row in rows:
+        writer.writerow([row[name] for name in FIELDS])
+    data.seek(0)
+    copy_sql = f"COPY import_users ({columns}) FROM STDIN WITH (FORMAT csv)"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE import_users ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            raw.copy_expert(copy_sql, data)
+        else:
+            # psycopg 3
+            with raw.copy(copy_sql) as copy:
+                copy.write(data.getvalue())
+        first_name = connection.ops.quote_name(User._meta.get_field("first_name").column)
+        last_name = connection.ops.quote_name(User._meta.get_field("last_name").column)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}, {first_name}, {last_name}) "
+            f"SELECT {columns}, '', '' FROM import_users "
+            f"ON CONFLICT ({connection.ops.quote_name(User._meta.get_field('email').column)}) DO NOTHING"
+        )
+        return cursor.rowcount
+
+
+def insert_batch(rows):
+    """
+    Insert a batch of cleaned rows in one transaction and return how many were new.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            inserted = _copy_insert(rows)
+        else:
+            emails = {row["email"] for row in rows}
+            existing = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+            users = {}
+            for row in rows:
+                if row["email"] not in existing:
+                    users.setdefault(row["email"], User(**row))
+            User.objects.bulk_create(users.values(), ignore_conflicts=True)
+            # ignore_conflicts silently drops conflicting rows, so count the batch's
+            # emails again rather than trusting len(users)
+            inserted = User.objects.filter(email__in=emails).count() - len(existing)
+    # Neither path sends post_save; adding emails that already existed is harmless
+    get_email_filter().add_many([row["email"] for row in rows])
+    return inserted
+
+
+def open_private(path, truncate=True):
+    """
+    Open a text file for writing, creating it readable by its owner only, since
+    exports carry password hashes.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if truncate else 0)
+    return os.fdopen(os.open(path, flags, 0o600), "w", newline="")
+
+
+def export_batches(batch_size, after_id=0):
+    """
+    Yield (last id, rows) batches of users in id order, starting after `after_id`.
+    Pages by id rather than OFFSET, so each batch is an index range scan.
+    """
+    while True:
+        rows = list(
+            User.objects.filter(pk__gt=after_id).order_by("pk").values_list("pk", *FIELDS)[:batch_size]
+        )
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        yield after_id, [dict(zip(FIELDS, row[1:])) for row in rows]
+
+
+def write_rows(f, fmt, rows, header):
+    """
+    Write exported rows as CSV (with a header when `header`) or JSON Lines.
+    """
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if header:
+            writer.writeheader()
+        writer.writerows({**row, "date_joined": row["date_joined"].isoformat()} for row in rows)
+    else:
+        for row in rows:
+            f.write(json.dumps({**row, "date_joined": row["date_joined"].isoformat()}, separators=(",", ":")))
+            f.write("\n")
+
+
+class Checkpoint:
+    """
+    Progress of a bulk command, saved as JSON after every committed batch so an
+    interrupted run can resume where it stopped.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.state = {}
+
+    def load(self):
+        """
+        Return the saved state, or {} if there is none. Raises ValueError if the
+        checkpoint belongs to another file.
+        """
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if self.state.get("source") != self.source:
+            raise ValueError(f"Checkpoint {self.path} is for {self.state.get('source')}, not {self.source}.")
+        return self.state
+
+    def save(self, **state):
+        self.state = {**self.state, **state, "source": self.source}
+        tmp = f"{self.path}.tmp"
+        with open_private(tmp) as f:
+            json.dump(self.state, f)
+        # Atomic, so a crash leaves either the old or the new checkpoint
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
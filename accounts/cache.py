@@ -0,0 +1,275 @@
+"""
+Write-through cache for User rows.
+Users are stored in Redis in a compact JSON form keyed by pk, with a pointer from the
+normalized email to the pk, and a small in-process LRU in front of Redis. Entries are
+refreshed when a save commits and dropped from post_delete (see accounts.signals), and
+expire after a bounded TTL so updates that bypass signals are picked up eventually.
+Read-through fills only write missing entries, so a fill carrying a row read before a
+concurrent save can't overwrite the fresher entry that save wrote through.
+Lookups are counted in the auth_user_cache_lookups_total metric.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import cached_property
+
+from django.conf import settings
+
+from config.metrics import record_user_cache_lookup
+from config.redis_client import get_redis, write_pipeline
+
+# Look up the pk behind an email pointer and return that user's entry in one round trip
+_GET_BY_EMAIL = """
+local pk = redis.call('GET', KEYS[1])
+if not pk then return nil end
+return redis.call('GET', ARGV[1] .. pk)
+"""
+
+
+def normalize_email(email):
+    """
+    Canonical form of an email address, as stored in User.email.
+    """
+    return email.strip().lower()
+
+
+class UserCache:
+    """
+    Two-tier (local LRU + Redis) cache of User instances.
+    Local entries live for `local_timeout` seconds only, since other processes cannot
+    invalidate them; Redis entries live for `timeout` seconds.
+    """
+
+    def __init__(self, timeout, local_max_size, local_timeout):
+        self.timeout = timeout
+        self.local_max_size = local_max_size
+        self.local_timeout = local_timeout
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._script = None
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.USER_CACHE
+        return cls(config["TIMEOUT"], config["LOCAL_MAX_SIZE"], config["LOCAL_TIMEOUT"])
+
+    @cached_property
+    def model(self):
+        from .models import User
+        return User
+
+    @cached_property
+    def fields(self):
+        return [f.attname for f in self.model._meta.concrete_fields]
+
+    @cached_property
+    def prefix(self):
+        # Entries written for a different set of columns are never read back
+        schema = hashlib.md5(",".join(self.fields).encode()).hexdigest()[:8]
+        return f"user:{schema}:"
+
+    def _pk_key(self, pk):
+        return f"{self.prefix}pk:{pk}"
+
+    def _email_key(self, email):
+        return f"{self.prefix}email:{normalize_email(email)}"
+
+    # Serialization
+
+    def _dumps(self, user):
+        values = [getattr(user, name) for name in self.fields]
+        return json.dumps(values, separators=(",", ":"), default=lambda value: value.isoformat())
+
+    def _loads(self, data):
+        fields = self.model._meta.concrete_fields
+        values = [field.to_python(value) for field, value in zip(fields, json.loads(data))]
+        return self.model.from_db("default", self.fields, values)
+
+    # Local tier
+
+    def _local_get(self, key):
+        if not self.local_max_size:
+            return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _local_set(self, key, value):
+        if not self.local_max_size:
+            return
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_timeout, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_size:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    # Public API
+
+    def get(self, pk=None, email=None):
+        """
+        Return the user with the given pk or email, reading through to the database.
+        Raises User.DoesNotExist like a manager lookup.
+        """
+        if pk is not None:
+            key = self._pk_key(pk)
+        else:
+            key = self._email_key(email)
+        data = self._local_get(key)
+        if data is not None:
+            self.local_hits += 1
+            record_user_cache_lookup("local_hit")
+        else:
+            redis_conn = get_redis()
+            if pk is not None:
+                data = redis_conn.get(key)
+            else:
+                if self._script is None:
+                    self._script = redis_conn.register_script(_GET_BY_EMAIL)
+                data = self._script(keys=[key], args=[self._pk_key("")], client=redis_conn)
+            if data is not None:
+                self.redis_hits += 1
+                record_user_cache_lookup("redis_hit")
+                self._local_set(key, data)
+        if data is not None:
+            user = self._loads(data)
+            # An email pointer may outlive an email change; only trust matching entries
+            if pk is not None or normalize_email(user.email) == normalize_email(email):
+                return user
+        self.misses += 1
+        record_user_cache_lookup("miss")
+        lookup = {"pk": pk} if pk is not None else {"email": normalize_email(email)}
+        user = self.model._default_manager.get(**lookup)
+        self._fill([user])
+        return user
+
+    def get_many(self, pks):
+        """
+        Return a dict of pk -> user for the given pks: local hits, then one Redis MGET,
+        then one `pk__in` query for the rest. Missing users are left out.
+        """
+        found, remote = {}, []
+        for pk in dict.fromkeys(pks):
+            data = self._local_get(self._pk_key(pk))
+            if data is not None:
+                self.local_hits += 1
+                record_user_cache_lookup("local_hit")
+                found[pk] = self._loads(data)
+            else:
+                remote.append(pk)
+        if remote:
+            values = get_redis().mget([self._pk_key(pk) for pk in remote])
+            missing = []
+            for pk, data in zip(remote, values):
+                if data is not None:
+                    self.redis_hits += 1
+                    record_user_cache_lookup("redis_hit")
+                    self._local_set(self._pk_key(pk), data)
+                    found[pk] = self._loads(data)
+                else:
+                    missing.append(pk)
+            if missing:
+                self.misses += len(missing)
+                record_user_cache_lookup("miss", len(missing))
+                users = list(self.model._default_manager.filter(pk__in=missing))
+                self._fill(users)
+                found.update((user.pk, user) for user in users)
+        return found
+
+    def set(self, user):
+        """
+        Write the user's current field values through to both tiers.
+        """
+        self.set_many([user])
+
+    def set_many(self, users):
+        """
+        Write several users through to both tiers in one Redis round trip.
+        """
+        if not users:
+            return
+        with write_pipeline() as pipe:
+            for user in users:
+                data = self._dumps(user)
+                pk_key, email_key = self._pk_key(user.pk), self._email_key(user.email)
+                pipe.set(pk_key, data, ex=self.timeout)
+                pipe.set(email_key, user.pk, ex=self.timeout)
+                self._local_set(pk_key, data)
+                self._local_set(email_key, data)
+
+    def _fill(self, users):
+        """
+        Cache users just read from the database, in Redis only and only where no entry
+        exists. The local tier picks them up from Redis on the next read.
+        """
+        if not users:
+            return
+        with write_pipeline() as pipe:
+            for user in users:
+                pipe.set(self._pk_key(user.pk), self._dumps(user), ex=self.timeout, nx=True)
+                pipe.set(self._email_key(user.email), user.pk, ex=self.timeout, nx=True)
+
+    def delete(self, user):
+        """
+        Drop the user from both tiers.
+        """
+        pk_key, email_key = self._pk_key(user.pk), self._email_key(user.email)
+        with write_pipeline() as pipe:
+            pipe.delete(pk_key, email_key)
+        self._local_delete(pk_key, email_key)
+
+    def delete_many(self, pks):
+        """
+        Drop users by pk. Email pointers to a missing entry are ignored on read.
+        """
+        keys = [self._pk_key(pk) for pk in pks]
+        if keys:
+            with write_pipeline() as pipe:
+                pipe.delete(*keys)
+            self._local_delete(*keys)
+
+    def stats(self):
+        """
+        Hit/miss counters for this process.
+        """
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0,
+        }
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    """
+    Return the process-wide user cache, created from settings on first use.
+    """
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache.from_settings()
+    return _user_cache
@@ -0,0 +1,103 @@
+"""
+Changelist pieces that keep the user admin fast on very large tables.
+Counts are estimated or capped instead of running an exact COUNT(*), and the default
+(email) ordering is paged by key: each page is an index range scan starting after the
+last email shown, however deep it is. Sorting by another column falls back to
+Django's numbered pages.
+"""
+
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+AFTER_VAR = "after"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts more than `exact_limit` rows. On PostgreSQL an
+    unfiltered table uses the planner's row estimate instead.
+    """
+    exact_limit = 10_000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_is_exact = True
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self.estimate(queryset)
+            if estimate is not None and estimate > self.exact_limit:
+                self.count_is_exact = False
+                return estimate
+        # Stops reading rows once past the limit
+        count = queryset.order_by()[: self.exact_limit + 1].count()
+        if count > self.exact_limit:
+            self.count_is_exact = False
+            return self.exact_limit
+        return count
+
+    def estimate(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 until the table has been analyzed
+        return row[0] if row and row[0] >= 0 else None
+
+    @property
+    def count_display(self):
+        if self.count_is_exact:
+            return str(self.count)
+        if self.count == self.exact_limit:
+            return f"{self.count:,}+"
+        return f"~{self.count:,}"
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList paging by `keyset_field` (which must be unique and the admin's
+    ordering) with ?after=<value> links instead of page numbers.
+    """
+    keyset_field = "email"
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        self.after = self.params.pop(AFTER_VAR, None)
+        # Keyset paging only follows the default ordering
+        self.keyset = ORDER_VAR not in self.params and not self.show_all
+        if not self.keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        if self.after:
+            queryset = queryset.filter(**{f"{self.keyset_field}__gt": self.after})
+        result_list = queryset[: self.list_per_page]
+        rows = list(result_list)
+        has_next = len(rows) == self.list_per_page and queryset.filter(
+            **{f"{self.keyset_field}__gt": getattr(rows[-1], self.keyset_field)}
+        ).exists()
+
+        self.next_url = has_next and self.get_query_string({AFTER_VAR: getattr(rows[-1], self.keyset_field)})
+        self.first_url = self.get_query_string()
+        self.result_count = paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = self.root_queryset.count() if self.show_full_result_count else None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = has_next or bool(self.after)
+        self.paginator = paginator
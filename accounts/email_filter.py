@@ -0,0 +1,101 @@
+"""
+Bloom filter of registered emails, kept in a Redis bitmap.
+The login path asks it (inside authapi.login_guard's pre-check script) whether an email
+can belong to an account at all, so logins for unknown addresses are rejected without
+a database lookup or a password hash. A Bloom filter has no false negatives but a small
+rate of false positives, which simply take the normal path.
+New emails are added from post_save and by the bulk import paths. Removing an email
+isn't possible, so deleted accounts stay "possibly present" until the filter is rebuilt
+with `manage.py rebuild_email_filter`, which also creates it on a new deployment. Until
+the filter exists, every email takes the normal path.
+"""
+
+import hashlib
+import math
+from itertools import islice
+
+from django.conf import settings
+
+from config.redis_client import get_redis, get_script, write_pipeline
+
+from .cache import normalize_email
+
+# KEYS: filter keys (live and, during a rebuild, the one being built). ARGV: bit offsets.
+# Only sets bits in filters that exist, so an add never creates a partial filter.
+_ADD = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        for i = 1, #ARGV do redis.call('SETBIT', key, ARGV[i], 1) end
+    end
+end
+return 1
+"""
+
+
+class EmailFilter:
+    """
+    Bloom filter sized for `capacity` emails at the given false positive rate.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        # A resized filter gets a new key and is rebuilt, never mixed with the old bits
+        self.key = f"emails:filter:{self.size}:{self.hashes}"
+        self.building_key = f"{self.key}:building"
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.EMAIL_FILTER
+        return cls(config["CAPACITY"], config["ERROR_RATE"])
+
+    def offsets(self, email):
+        """
+        Bit offsets for an email, by double hashing one digest.
+        """
+        digest = hashlib.blake2b(normalize_email(email).encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add_many(self, emails):
+        """
+        Add emails to the filter (and to the one being rebuilt, if any).
+        """
+        offsets = [offset for email in emails for offset in self.offsets(email)]
+        if offsets:
+            with write_pipeline() as pipe:
+                get_script(_ADD)(keys=[self.key, self.building_key], args=offsets, client=pipe)
+
+    def rebuild(self, emails, batch_size=10000):
+        """
+        Build a fresh filter from all emails and swap it in atomically.
+        Returns the number of emails added.
+        """
+        redis_conn = get_redis()
+        redis_conn.delete(self.building_key)
+        # Allocate the whole bitmap, which also lets concurrent adds reach it
+        redis_conn.setbit(self.building_key, self.size - 1, 0)
+        emails = iter(emails)
+        count = 0
+        while batch := list(islice(emails, batch_size)):
+            bitfield = redis_conn.bitfield(self.building_key)
+            for email in batch:
+                for offset in self.offsets(email):
+                    bitfield.set("u1", offset, 1)
+            bitfield.execute()
+            count += len(batch)
+        redis_conn.rename(self.building_key, self.key)
+        return count
+
+
+_email_filter = None
+
+
+def get_email_filter():
+    """
+    Return the process-wide email filter, created from settings on first use.
+    """
+    global _email_filter
+    if _email_filter is None:
+        _email_filter = EmailFilter.from_settings()
+    return _email_filter
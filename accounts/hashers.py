@@ -0,0 +1,64 @@
+"""
+Password hashers tuned by a calibration profile.
+`manage.py calibrate_hashers` measures the hashers on the target machine and writes
+their parameters to the PASSWORD_HASHER_PROFILE JSON file; these hashers read them from
+there, falling back to Django's defaults without a profile. Hashes made with other
+parameters still verify and are upgraded on the next successful login.
+"""
+
+import json
+from functools import cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+@cache
+def get_profile():
+    """
+    Return the calibration profile, or {} if none has been written.
+    """
+    try:
+        with open(settings.PASSWORD_HASHER_PROFILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@receiver(setting_changed)
+def reset_profile(setting, **kwargs):
+    if setting == "PASSWORD_HASHER_PROFILE":
+        get_profile.cache_clear()
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with the profile's time cost, memory cost (KiB) and parallelism.
+    """
+
+    def _param(self, name):
+        return get_profile().get(self.algorithm, {}).get(name, getattr(Argon2PasswordHasher, name))
+
+    @property
+    def time_cost(self):
+        return self._param("time_cost")
+
+    @property
+    def memory_cost(self):
+        return self._param("memory_cost")
+
+    @property
+    def parallelism(self):
+        return self._param("parallelism")
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the profile's iteration count.
+    """
+
+    @property
+    def iterations(self):
+        return get_profile().get(self.algorithm, {}).get("iterations", PBKDF2PasswordHasher.iterations)
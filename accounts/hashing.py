@@ -0,0 +1,307 @@
+"""
+Bounded worker pool for password hashing.
+Password hashes are deliberately expensive, so they run in a process pool instead of
+on the request thread. Only a bounded number of hashes may be queued at once; callers
+beyond that get a 503 with Retry-After instead of piling up behind the pool.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.db import connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from config.metrics import record_hash
+
+
+class HashingPoolSaturated(APIException):
+    """
+    Raised when the hashing pool already has its maximum number of pending jobs.
+    DRF's exception handler turns `wait` into a Retry-After header.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Service is busy, please retry shortly."
+    default_code = "hashing_pool_saturated"
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+def _init_worker(settings_module):
+    """
+    Configure Django in a freshly started pool process (no-op for forked workers).
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+def _make_password(password):
+    return hashers.make_password(password)
+
+
+def _make_passwords(passwords):
+    return [hashers.make_password(password) for password in passwords]
+
+
+def _verify_password(password, encoded):
+    """
+    Return (is_correct, must_update) for a password against an encoded hash.
+    """
+    upgrade = []
+    is_correct = hashers.check_password(password, encoded, setter=upgrade.append)
+    return is_correct, bool(upgrade)
+
+
+class HashingExecutor:
+    """
+    Process pool for hash and verify calls with a bounded number of pending jobs.
+    The pool is created lazily so each gunicorn worker gets its own after fork.
+    With workers=0, hashing runs inline on the calling thread.
+    """
+
+    def __init__(self, workers, max_pending, retry_after):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._slots = None
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.PASSWORD_HASHING
+        return cls(config["WORKERS"], config["MAX_PENDING"], config["RETRY_AFTER"])
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        initializer=_init_worker,
+                        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),),
+                    )
+                    self._slots = threading.BoundedSemaphore(self.max_pending)
+                    self._pid = pid
+        return self._pool
+
+    def _reset(self, pool):
+        """
+        Drop a broken pool so the next submit starts a fresh one.
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+
+    def submit(self, fn, *args):
+        """
+        Schedule fn(*args) on the pool and return a concurrent.futures.Future.
+        Raises HashingPoolSaturated when max_pending jobs are already queued.
+        """
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        pool = self._get_pool()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingPoolSaturated(self.retry_after)
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self._reset(pool)
+            raise
+        future.add_done_callback(lambda f: slots.release())
+        return future
+
+    def call(self, fn, *args):
+        """
+        Run fn(*args) on the pool and wait for the result.
+        """
+        start = time.perf_counter()
+        future = self.submit(fn, *args)
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._reset(self._pool)
+            raise
+        finally:
+            record_hash(time.perf_counter() - start)
+
+    async def acall(self, fn, *args):
+        """
+        Await fn(*args) on the pool without blocking the event loop.
+        """
+        start = time.perf_counter()
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._reset(self._pool)
+            raise
+        finally:
+            record_hash(time.perf_counter() - start)
+
+    def make_password(self, password):
+        if password is None:
+            # Unusable passwords are random strings, there is nothing to hash
+            return hashers.make_password(None)
+        return self.call(_make_password, password)
+
+    def make_passwords(self, passwords, chunk_size=32):
+        """
+        Hash many passwords in parallel across the pool, in chunks so each job
+        amortizes its round trip to the worker process. At most `workers` chunks are
+        queued at a time, leaving the other pending slots to interactive logins.
+        """
+        if not self.workers:
+            return _make_passwords(passwords)
+        chunk_size = max(1, min(chunk_size, -(-len(passwords) // (self.workers * 4))))
+        window = threading.BoundedSemaphore(self.workers)
+        futures = []
+        start = time.perf_counter()
+        try:
+            for i in range(0, len(passwords), chunk_size):
+                window.acquire()
+                try:
+                    future = self.submit(_make_passwords, passwords[i:i + chunk_size])
+                except BaseException:
+                    window.release()
+                    raise
+                future.add_done_callback(lambda f: window.release())
+                futures.append(future)
+            return [encoded for future in futures for encoded in future.result()]
+        except BrokenProcessPool:
+            self._reset(self._pool)
+            raise
+        finally:
+            record_hash(time.perf_counter() - start)
+
+    def verify_password(self, password, encoded):
+        if password is None or not encoded or not hashers.is_password_usable(encoded):
+            return False, False
+        return self.call(_verify_password, password, encoded)
+
+    async def amake_password(self, password):
+        if password is None:
+            return hashers.make_password(None)
+        return await self.acall(_make_password, password)
+
+    async def averify_password(self, password, encoded):
+        if password is None or not encoded or not hashers.is_password_usable(encoded):
+            return False, False
+        return await self.acall(_verify_password, password, encoded)
+
+
+_executor = None
+
+
+def get_executor():
+    """
+    Return the process-wide hashing executor, creating it from settings on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = HashingExecutor.from_settings()
+    return _executor
+
+
+def make_password(password):
+    """
+    Hash a raw password on the hashing pool.
+    """
+    return get_executor().make_password(password)
+
+
+def make_passwords(passwords):
+    """
+    Hash a list of raw passwords in parallel on the hashing pool.
+    """
+    return get_executor().make_passwords(passwords)
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Verify a raw password on the hashing pool.
+    Mirrors django.contrib.auth.hashers.check_password: `setter` is called with the
+    raw password when the hash is correct but uses outdated hasher parameters.
+    """
+    is_correct, must_update = get_executor().verify_password(password, encoded)
+    if is_correct and must_update and setter:
+        setter(password)
+    return is_correct
+
+
+async def amake_password(password):
+    """
+    See make_password().
+    """
+    return await get_executor().amake_password(password)
+
+
+# Users whose hash upgrade is queued, so a burst of logins queues it once
+_rehash_pending = set()
+_rehash_lock = threading.Lock()
+_rehash_executor = None
+
+
+def _rehash(user, raw_password):
+    try:
+        encoded = make_password(raw_password)
+    except HashingPoolSaturated:
+        # Upgrades can wait; the next login tries again
+        return False
+    finally:
+        with _rehash_lock:
+            _rehash_pending.discard(user.pk)
+    try:
+        # Only replace the hash that was verified, never a password changed meanwhile
+        updated = type(user)._default_manager.filter(pk=user.pk, password=user.password).update(password=encoded)
+        if updated:
+            from .cache import get_user_cache
+            get_user_cache().delete(user)
+        return bool(updated)
+    finally:
+        connections.close_all()
+
+
+def schedule_rehash(user, raw_password):
+    """
+    Upgrade a user's stored hash to the preferred hasher and parameters on a
+    background thread, after a successful login verified `raw_password` against it.
+    Returns a Future resolving to whether the hash was replaced, or None if an
+    upgrade for the user is already queued.
+    """
+    global _rehash_executor
+    with _rehash_lock:
+        if user.pk in _rehash_pending:
+            return None
+        _rehash_pending.add(user.pk)
+        if _rehash_executor is None:
+            _rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+        return _rehash_executor.submit(_rehash, user, raw_password)
+
+
+async def acheck_password(password, encoded, setter=None):
+    """
+    See check_password(). `setter` must be a coroutine function here.
+    """
+    is_correct, must_update = await get_executor().averify_password(password, encoded)
+    if is_correct and must_update and setter:
+        await setter(password)
+    return is_correct
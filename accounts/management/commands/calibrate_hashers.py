@@ -0,0 +1,135 @@
+"""
+Management command measuring the password hashers on this machine and writing the
+parameters that meet a per-hash latency target to the hasher profile.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+
+ALGORITHMS = ("argon2", "pbkdf2_sha256")
+
+# Lowest Argon2 memory cost the command will pick, in KiB
+MIN_ARGON2_MEMORY = 8 * 1024
+
+# Lowest PBKDF2 iteration count the command will pick: Django's default, which existing
+# hashes already use. Fewer would have logins re-hash those passwords more weakly.
+MIN_PBKDF2_ITERATIONS = PBKDF2PasswordHasher.iterations
+
+
+def measure(hasher, rounds):
+    """
+    Median seconds for one hash with the hasher's current parameters.
+    """
+    timings = []
+    for _ in range(rounds):
+        salt = hasher.salt()
+        start = time.perf_counter()
+        hasher.encode("calibration-password", salt)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the password hashers and write a profile for a target latency per hash."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=250, help="Target time for one hash, in milliseconds.")
+        parser.add_argument("--max-memory-mib", type=int, default=64, help="Argon2 memory budget per hash, in MiB.")
+        parser.add_argument("--parallelism", type=int, default=1, help="Argon2 lanes per hash.")
+        parser.add_argument("--algorithm", choices=ALGORITHMS, default="argon2", help="Hasher used for new hashes.")
+        parser.add_argument("--rounds", type=int, default=5, help="Hashes timed per measurement.")
+        parser.add_argument("--output", default=str(settings.PASSWORD_HASHER_PROFILE), help="Profile file to write.")
+
+    def handle(self, *args, **options):
+        target = options["target_ms"] / 1000
+        if target <= 0:
+            raise CommandError("--target-ms must be positive.")
+        rounds = options["rounds"]
+
+        pbkdf2 = self.calibrate_pbkdf2(target, rounds)
+        try:
+            argon2 = self.calibrate_argon2(target, options["max_memory_mib"] * 1024, options["parallelism"], rounds)
+        except ValueError as exc:
+            # argon2-cffi missing
+            if options["algorithm"] == "argon2":
+                raise CommandError(str(exc))
+            argon2 = None
+
+        profile = {
+            "algorithm": options["algorithm"],
+            "target_ms": options["target_ms"],
+            "pbkdf2_sha256": pbkdf2,
+            "calibrated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "host": {"node": platform.node(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        }
+        if argon2 is not None:
+            profile["argon2"] = argon2
+        with open(options["output"], "w") as f:
+            json.dump(profile, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+        chosen = profile[options["algorithm"]]
+        workers = settings.PASSWORD_HASHING["WORKERS"] or 1
+        self.stdout.write(f"pbkdf2_sha256: {pbkdf2}")
+        if argon2 is not None:
+            self.stdout.write(f"argon2: {argon2}")
+        self.stdout.write(
+            f"Wrote {options['output']}. New hashes use {options['algorithm']} at ~{chosen['measured_ms']:.0f}ms, "
+            f"about {workers * 1000 / chosen['measured_ms']:.0f} logins/s per web worker with "
+            f"{workers} hashing process(es). Restart the service to apply it."
+        )
+
+    def calibrate_pbkdf2(self, target, rounds):
+        """
+        PBKDF2's cost is linear in its iterations: time a baseline and scale it.
+        Never goes below MIN_PBKDF2_ITERATIONS, whatever the target.
+        """
+        hasher = PBKDF2PasswordHasher()
+        hasher.iterations = 100_000
+        per_iteration = measure(hasher, rounds) / hasher.iterations
+        iterations = int(round(target / per_iteration, -3))
+        if iterations < MIN_PBKDF2_ITERATIONS:
+            self.stderr.write(self.style.WARNING(
+                f"pbkdf2_sha256: {iterations} iterations would meet the target, using the minimum of "
+                f"{MIN_PBKDF2_ITERATIONS} instead."
+            ))
+            iterations = MIN_PBKDF2_ITERATIONS
+        hasher.iterations = iterations
+        return {"iterations": hasher.iterations, "measured_ms": round(measure(hasher, rounds) * 1000, 1)}
+
+    def calibrate_argon2(self, target, memory_budget, parallelism, rounds):
+        """
+        Argon2 is memory-hard, so spend the whole memory budget first, then raise the
+        time cost until a hash reaches the target. If one pass over the budget is
+        already too slow, halve the memory instead.
+        """
+        hasher = Argon2PasswordHasher()
+        hasher.parallelism = parallelism
+        hasher.time_cost = 1
+        hasher.memory_cost = memory_budget
+        elapsed = measure(hasher, rounds)
+        while elapsed > target and hasher.memory_cost // 2 >= MIN_ARGON2_MEMORY:
+            hasher.memory_cost //= 2
+            elapsed = measure(hasher, rounds)
+        while elapsed < target:
+            hasher.time_cost += 1
+            next_elapsed = measure(hasher, rounds)
+            if next_elapsed > target and next_elapsed - target > target - elapsed:
+                # The previous step was closer to the target
+                hasher.time_cost -= 1
+                break
+            elapsed = next_elapsed
+        return {
+            "time_cost": hasher.time_cost,
+            "memory_cost": hasher.memory_cost,
+            "parallelism": hasher.parallelism,
+            "measured_ms": round(elapsed * 1000, 1),
+        }
@@ -0,0 +1,50 @@
+"""
+Management command exporting users to a CSV or JSON Lines file (see accounts.bulk).
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bulk import FORMATS, Checkpoint, detect_format, export_batches, open_private, write_rows
+
+
+class Command(BaseCommand):
+    help = "Export users with their password hashes to CSV or JSON Lines, resuming from a checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output file.")
+        parser.add_argument("--format", choices=FORMATS, help="File format; guessed from the extension by default.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per query.")
+        parser.add_argument("--checkpoint", help="Checkpoint file; defaults to <path>.checkpoint.")
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        fmt = options["format"] or detect_format(path)
+        checkpoint = Checkpoint(options["checkpoint"] or f"{path}.checkpoint", path)
+        try:
+            state = checkpoint.load()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        after_id, exported = state.get("after_id", 0), state.get("rows", 0)
+        if state:
+            self.stdout.write(f"Resuming after user id {after_id}.")
+
+        start = time.perf_counter()
+        written = 0
+        with open_private(path, truncate=not state) as f:
+            if state:
+                # Drop anything written after the last checkpoint
+                f.truncate(state["size"])
+                f.seek(state["size"])
+            for after_id, rows in export_batches(options["batch_size"], after_id):
+                write_rows(f, fmt, rows, header=exported == 0)
+                f.flush()
+                exported += len(rows)
+                written += len(rows)
+                checkpoint.save(after_id=after_id, rows=exported, size=f.tell())
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"{exported} user(s) exported, {written / elapsed:.0f} rows/s.")
+        checkpoint.clear()
+        self.stdout.write(f"Exported {exported} user(s) to {path}.")
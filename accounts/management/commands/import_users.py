@@ -0,0 +1,67 @@
+"""
+Management command importing users from a CSV or JSON Lines file (see accounts.bulk).
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.bulk import FORMATS, Checkpoint, clean_row, detect_format, insert_batch, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import users with pre-hashed passwords from CSV or JSON Lines, resuming from a checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV (with a header) or JSON Lines file.")
+        parser.add_argument("--format", choices=FORMATS, help="File format; guessed from the extension by default.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction.")
+        parser.add_argument("--checkpoint", help="Checkpoint file; defaults to <path>.checkpoint.")
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over.")
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        fmt = options["format"] or detect_format(path)
+        checkpoint = Checkpoint(options["checkpoint"] or f"{path}.checkpoint", path)
+        if options["restart"]:
+            checkpoint.clear()
+        try:
+            state = checkpoint.load()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        done = state.get("rows", 0)
+        imported, skipped = state.get("imported", 0), state.get("skipped", 0)
+        if done:
+            self.stdout.write(f"Resuming after row {done}.")
+
+        start = time.perf_counter()
+        read = 0
+        batch = []
+        with open(path, newline="") as f:
+            for number, row in enumerate(read_rows(f, fmt), 1):
+                if number <= done:
+                    continue
+                read += 1
+                try:
+                    batch.append(clean_row(row))
+                except ValueError as exc:
+                    skipped += 1
+                    self.stderr.write(f"Row {number}: {exc}")
+                if read % options["batch_size"] == 0:
+                    imported += insert_batch(batch) if batch else 0
+                    checkpoint.save(rows=number, imported=imported, skipped=skipped)
+                    batch = []
+                    self.progress(number, imported, read, start)
+            if batch:
+                imported += insert_batch(batch)
+        checkpoint.clear()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"Imported {imported} new user(s), skipped {skipped} invalid row(s), "
+            f"{read / elapsed if elapsed else 0:.0f} rows/s."
+        )
+
+    def progress(self, number, imported, read, start):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"Row {number}: {imported} imported, {read / elapsed:.0f} rows/s.")
@@ -0,0 +1,21 @@
+"""
+Management command (re)building the Bloom filter of registered emails used by login.
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.email_filter import get_email_filter
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = "Rebuild the filter of registered emails from the users table and swap it in."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000, help="Emails read and written per batch.")
+
+    def handle(self, *args, **options):
+        email_filter = get_email_filter()
+        emails = User.objects.values_list("email", flat=True).iterator(chunk_size=options["batch_size"])
+        count = email_filter.rebuild(emails, batch_size=options["batch_size"])
+        self.stdout.write(f"Added {count} emails to {email_filter.key}")
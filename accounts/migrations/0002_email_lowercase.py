@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:29
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    """
+    Store every email in lowercase. Of the accounts whose addresses differ only in
+    case, an active one keeps the address: the one with the latest last_login, else
+    the oldest (lowest id). last_login isn't recorded by the JWT login, so in practice
+    the oldest active account usually wins. The others are deactivated and renamed to
+    duplicate-<id>+<address> so nothing is deleted and they can be reviewed.
+    """
+    User = apps.get_model("accounts", "User")
+    duplicates = (
+        User.objects.annotate(canonical=Lower("email"))
+        .values("canonical")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("canonical", flat=True)
+    )
+    for canonical in list(duplicates):
+        users = list(
+            User.objects.annotate(canonical=Lower("email"))
+            .filter(canonical=canonical)
+            .order_by("-is_active", models.F("last_login").desc(nulls_last=True), "id")
+        )
+        for user in users[1:]:
+            local, _, domain = canonical.rpartition("@")
+            user.email = f"duplicate-{user.pk}+{local}@{domain}"
+            user.is_active = False
+            user.save(update_fields=["email", "is_active"])
+    # One set-based UPDATE for the rest
+    User.objects.exclude(email=Lower("email")).update(email=Lower("email"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.CheckConstraint(condition=models.Q(('email', django.db.models.functions.text.Lower('email'))), name='accounts_user_email_lowercase'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Match the UPPER("col"::text) LIKE UPPER(%s) that icontains generates on PostgreSQL
+INDEXES = (
+    ("accounts_user_email_trgm", "email"),
+    ("accounts_user_full_name_trgm", "full_name"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    GIN trigram indexes for the admin's substring search. PostgreSQL only; other
+    databases keep scanning, which is fine at test sizes.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    table = schema_editor.quote_name(apps.get_model("accounts", "User")._meta.db_table)
+    for name, column in INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {schema_editor.quote_name(name)} "
+            f"ON {table} USING gin (UPPER({schema_editor.quote_name(column)}::text) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run in a transaction, and doesn't lock out writes
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_email_lowercase'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -4,13 +4,29 @@ This file defines a custom User model using email as the unique identifier,
 and a UserManager to handle user and superuser creation.
 """
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.db.models.functions import Lower
+
+from . import hashing
+from .cache import normalize_email
 
 # Custom user manager to handle user creation with email and full_name
 class UserManager(BaseUserManager):
     use_in_migrations = True
 
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Canonical form of an email address: stripped and lowercased as a whole, so
+        lookups can match the stored value exactly and use the unique index.
+        """
+        return normalize_email(email or "")
+
+    def get_by_natural_key(self, username):
+        return self.get(**{self.model.USERNAME_FIELD: self.normalize_email(username)})
+
     def _create_user(self, email, password, full_name, username=None, **extra_fields):
         """
         Internal method to create and save a user with the given email, full name, and password.
@@ -20,10 +36,22 @@ class UserManager(BaseUserManager):
             raise ValueError('The Email must be set')
         email = self.normalize_email(email)
         user = self.model(email=email, full_name=full_name, **extra_fields)
-        user.set_password(password)
+        user.set_password(password)  # Hashed on the hashing pool, see User.set_password
         user.save(using=self._db)
         return user
 
+    async def _acreate_user(self, email, password, full_name, username=None, **extra_fields):
+        """
+        Async variant of _create_user for the ASGI request path.
+        """
+        if not email:
+            raise ValueError('The Email must be set')
+        email = self.normalize_email(email)
+        user = self.model(email=email, full_name=full_name, **extra_fields)
+        await user.aset_password(password)
+        await user.asave(using=self._db)
+        return user
+
     def create_user(self, email, password=None, full_name=None, username=None, **extra_fields):
         """
         Create and save a regular user with the given email, full name, and password.
@@ -34,6 +62,38 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', False)
         return self._create_user(email, password, full_name, username, **extra_fields)
 
+    async def acreate_user(self, email, password=None, full_name=None, username=None, **extra_fields):
+        """
+        Async variant of create_user.
+        """
+        if full_name is None:
+            raise TypeError('The full_name field is required.')
+        extra_fields.setdefault('is_staff', False)
+        extra_fields.setdefault('is_superuser', False)
+        return await self._acreate_user(email, password, full_name, username, **extra_fields)
+
+    def get_cached(self, pk=None, email=None):
+        """
+        Look up a user by pk or email through the user cache (see accounts.cache).
+        Raises DoesNotExist like get().
+        """
+        from .cache import get_user_cache
+        return get_user_cache().get(pk=pk, email=email)
+
+    async def aget_cached(self, pk=None, email=None):
+        """
+        Async variant of get_cached.
+        """
+        return await sync_to_async(self.get_cached)(pk=pk, email=email)
+
+    def get_cached_many(self, pks):
+        """
+        Look up several users by pk through the user cache, returning a dict of
+        pk -> user without the ones that don't exist.
+        """
+        from .cache import get_user_cache
+        return get_user_cache().get_many(pks)
+
     def create_superuser(self, email, password, full_name, username=None, **extra_fields):
         """
         Create and save a superuser with the given email, full name, and password.
@@ -63,8 +123,68 @@ class User(AbstractUser):
 
     objects = UserManager()  # Use the custom user manager
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Emails are stored in canonical (lowercase) form, see UserManager.normalize_email
+            models.CheckConstraint(condition=models.Q(email=Lower("email")), name="accounts_user_email_lowercase"),
+        ]
+
+    def set_password(self, raw_password, encoded=None):
+        """
+        Hash the password on the hashing pool instead of the request thread.
+        Callers that already hashed raw_password pass the hash as `encoded`.
+        """
+        self.password = encoded or hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Verify the password on the hashing pool. Outdated hashes are upgraded in the
+        background, so the login response doesn't wait for a second hash.
+        """
+        def setter(raw_password):
+            hashing.schedule_rehash(self, raw_password)
+
+        return hashing.check_password(raw_password, self.password, setter)
+
+    async def aset_password(self, raw_password, encoded=None):
+        """
+        Async variant of set_password, awaiting the hashing pool.
+        """
+        self.password = encoded or await hashing.amake_password(raw_password)
+        self._password = raw_password
+
+    async def acheck_password(self, raw_password):
+        """
+        Async variant of check_password.
+        """
+        async def setter(raw_password):
+            hashing.schedule_rehash(self, raw_password)
+
+        return await hashing.acheck_password(raw_password, self.password, setter)
+
     def __str__(self):
         """
         String representation of the user, returns the email.
         """
         return self.email
+
+
+class LoginEvent(models.Model):
+    """
+    A successful login. Recorded in batches by the record_logins worker rather than
+    by the login request (see authapi.activity).
+    """
+    # Covered by the (user, -created_at) index
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="login_events", db_index=False)
+    created_at = models.DateTimeField()
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="accounts_login_user_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} at {self.created_at}"
@@ -0,0 +1,54 @@
+"""
+Signal receivers keeping the user cache and the email filter in sync with the User
+model, and keeping users' reads on the primary database right after they write.
+"""
+
+from copy import copy
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.db_router import stick_to_primary
+
+from .cache import get_user_cache
+from .email_filter import get_email_filter
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def update_cached_user(sender, instance, raw, update_fields, **kwargs):
+    """
+    Drop the saved user's entry, then write the user through once the transaction
+    commits, so a rollback never leaves uncommitted values cached.
+    Partial saves may come from an instance with stale or deferred fields, so those
+    only drop the entry and let the next read load a fresh copy.
+    """
+    get_user_cache().delete(instance)
+    if not (raw or update_fields or instance.get_deferred_fields()):
+        # A copy, since the instance may change again before the commit
+        transaction.on_commit(partial(get_user_cache().set, copy(instance)))
+
+
+@receiver(post_delete, sender=User)
+def delete_cached_user(sender, instance, **kwargs):
+    get_user_cache().delete(instance)
+
+
+@receiver(post_save, sender=User)
+def stick_user_to_primary(sender, instance, created, raw, **kwargs):
+    """
+    After registering or changing password, read the user from the primary for a
+    few seconds so replication lag can't hide the change.
+    """
+    # set_password() keeps the raw password on the instance until save() completes
+    if not raw and (created or instance._password is not None):
+        stick_to_primary(instance)
+
+
+@receiver(post_save, sender=User)
+def add_email_to_filter(sender, instance, update_fields, **kwargs):
+    # Deletes aren't mirrored: a Bloom filter can't drop entries (see accounts.email_filter)
+    if update_fields is None or "email" in update_fields:
+        get_email_filter().add_many([instance.email])
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.admin import UserAdmin
+from accounts.changelist import EstimatedCountPaginator
+from accounts.models import User
+
+
+class UserAdminChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(email="admin@example.com", full_name="Admin", password="testpass123")
+        for name in ("alice", "bob", "carol", "dave"):
+            User.objects.create_user(email=f"{name}@example.com", full_name=name.title(), password="testpass123")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:accounts_user_changelist")
+
+    def emails(self, response):
+        return [user.email for user in response.context["cl"].result_list]
+
+    @mock.patch.object(UserAdmin, "list_per_page", 2)
+    def test_keyset_pages(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.emails(response), ["admin@example.com", "alice@example.com"])
+        cl = response.context["cl"]
+        self.assertEqual(cl.next_url, "?after=alice%40example.com")
+
+        response = self.client.get(self.url + cl.next_url)
+        self.assertEqual(self.emails(response), ["bob@example.com", "carol@example.com"])
+
+        response = self.client.get(self.url + response.context["cl"].next_url)
+        self.assertEqual(self.emails(response), ["dave@example.com"])
+        self.assertFalse(response.context["cl"].next_url)
+        self.assertContains(response, "First")
+
+    @mock.patch.object(UserAdmin, "list_per_page", 2)
+    def test_sorted_by_other_column_uses_numbered_pages(self):
+        response = self.client.get(self.url, {"o": "-2", "p": "2"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["cl"].keyset)
+        self.assertEqual(len(self.emails(response)), 2)
+
+    def test_substring_search(self):
+        response = self.client.get(self.url, {"q": "aro"})
+        self.assertEqual(self.emails(response), ["carol@example.com"])
+
+    def test_full_email_search_is_exact(self):
+        response = self.client.get(self.url, {"q": " Bob@Example.com "})
+        self.assertEqual(self.emails(response), ["bob@example.com"])
+
+    def test_count_is_capped(self):
+        with mock.patch.object(EstimatedCountPaginator, "exact_limit", 3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context["cl"].result_count, 3)
+        self.assertContains(response, "3+ users")
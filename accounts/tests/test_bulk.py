@@ -0,0 +1,124 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import hashers
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts import bulk
+from accounts.models import User
+
+
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.encoded = hashers.make_password("testpass123")
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name, content):
+        with open(self.path(name), "w") as f:
+            f.write(content)
+        return self.path(name)
+
+    def import_users(self, path, **options):
+        call_command("import_users", path, stdout=io.StringIO(), stderr=io.StringIO(), **options)
+
+    def test_import_keeps_hashes(self):
+        path = self.write("users.csv", (
+            "email,full_name,password,is_active\n"
+            f'one@example.com,User One,"{self.encoded}",true\n'
+            "two@example.com,User Two,,false\n"
+            "not-an-email,Bad Row,,\n"
+            f'one@example.com,Duplicate,"{self.encoded}",\n'
+        ))
+        with mock.patch.object(bulk, "make_password", wraps=bulk.make_password) as make_password:
+            self.import_users(path, batch_size=2)
+        self.assertEqual(User.objects.count(), 2)
+        one = User.objects.get(email="one@example.com")
+        self.assertEqual(one.password, self.encoded)
+        self.assertEqual(one.full_name, "User One")
+        two = User.objects.get(email="two@example.com")
+        self.assertFalse(two.has_usable_password())
+        self.assertFalse(two.is_active)
+        # Only the row without a password needed one, and it isn't hashed
+        make_password.assert_called_once_with(None)
+
+    def test_malformed_json_line_skipped(self):
+        path = self.write("users.jsonl", (
+            f'{{"email": "one@example.com", "full_name": "User One", "password": "{self.encoded}"}}\n'
+            '{"email": "broken@example.com",\n'
+            '["not", "an", "object"]\n'
+            '{"email": "two@example.com", "full_name": "User Two"}\n'
+        ))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("import_users", path, stdout=stdout, stderr=stderr)
+        self.assertEqual(set(User.objects.values_list("email", flat=True)), {"one@example.com", "two@example.com"})
+        self.assertIn("skipped 2 invalid row(s)", stdout.getvalue())
+        self.assertIn("Row 2:", stderr.getvalue())
+
+    def test_invalid_field_types_and_lengths_skipped(self):
+        path = self.write("users.jsonl", (
+            '{"email": 42, "full_name": "Number"}\n'
+            '{"email": "list@example.com", "full_name": ["User"]}\n'
+            '{"email": "hash@example.com", "password": {"hash": "x"}}\n'
+            f'{{"email": "{"a" * 250}@example.com"}}\n'
+            f'{{"email": "long@example.com", "full_name": "{"a" * 256}"}}\n'
+            '{"email": "one@example.com", "full_name": "User One"}\n'
+        ))
+        stdout = io.StringIO()
+        call_command("import_users", path, stdout=stdout, stderr=io.StringIO())
+        self.assertEqual(list(User.objects.values_list("email", flat=True)), ["one@example.com"])
+        self.assertIn("skipped 5 invalid row(s)", stdout.getvalue())
+
+    def test_insert_counts_only_new_rows(self):
+        rows = [bulk.clean_row({"email": f"user{i}@example.com", "full_name": "User"}) for i in range(2)]
+        create = User.objects.bulk_create
+
+        def conflicting_create(users, **kwargs):
+            # As if ignore_conflicts dropped the first user
+            return create(list(users)[1:], **kwargs)
+
+        with mock.patch.object(User.objects, "bulk_create", conflicting_create):
+            self.assertEqual(bulk.insert_batch(rows), 1)
+
+    def test_resume_from_checkpoint(self):
+        path = self.write("users.jsonl", "".join(
+            f'{{"email": "user{i}@example.com", "full_name": "User {i}", "password": "{self.encoded}"}}\n'
+            for i in range(5)
+        ))
+        insert_batch = bulk.insert_batch
+        calls = []
+
+        def failing_insert(rows):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return insert_batch(rows)
+
+        with mock.patch("accounts.management.commands.import_users.insert_batch", failing_insert):
+            with self.assertRaises(RuntimeError):
+                self.import_users(path, batch_size=2)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertTrue(os.path.exists(f"{path}.checkpoint"))
+
+        self.import_users(path, batch_size=2)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertFalse(os.path.exists(f"{path}.checkpoint"))
+
+    def test_export_round_trip(self):
+        for i in range(3):
+            User.objects.create_user(email=f"user{i}@example.com", full_name=f"User {i}", password="testpass123")
+        path = self.path("export.csv")
+        call_command("export_users", path, batch_size=2, stdout=io.StringIO())
+        exported = {user.email: user.password for user in User.objects.all()}
+        User.objects.all().delete()
+
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+        self.import_users(path)
+        self.assertEqual({user.email: user.password for user in User.objects.all()}, exported)
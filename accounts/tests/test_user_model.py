@@ -0,0 +1,211 @@
+import runpy
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts import hashing
+from accounts.cache import UserCache
+from accounts.management.commands import calibrate_hashers
+from accounts.models import User
+
+
+class UserModelTests(TestCase):
+    def test_create_user_hashes_password(self):
+        user = User.objects.create_user(
+            email="test@example.com", full_name="Test User", password="testpass123"
+        )
+        self.assertNotEqual(user.password, "testpass123")
+        self.assertTrue(user.check_password("testpass123"))
+        self.assertFalse(user.check_password("wrongpass"))
+
+    def test_email_stored_lowercase(self):
+        user = User.objects.create_user(email=" Test@Example.COM ", full_name="Test User", password="testpass123")
+        self.assertEqual(user.email, "test@example.com")
+        self.assertEqual(User.objects.get_by_natural_key("TEST@example.com"), user)
+        self.assertEqual(User.objects.get_cached(email="TEST@example.com"), user)
+
+    def test_inline_executor(self):
+        executor = hashing.HashingExecutor(workers=0, max_pending=1, retry_after=1)
+        encoded = executor.make_password("testpass123")
+        self.assertEqual(executor.verify_password("testpass123", encoded), (True, False))
+        self.assertEqual(executor.verify_password("testpass123", None), (False, False))
+
+
+class CaseInsensitiveEmailTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def test_login_with_mixed_case(self):
+        response = self.client.post(reverse("login"), {"email": "Test@Example.com", "password": "testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_register_with_mixed_case_duplicate(self):
+        response = self.client.post(
+            reverse("register"), {"email": "TEST@example.com", "full_name": "Other", "password": "testpass123"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("email", response.data)
+
+
+class LowercaseEmailMigrationTests(TransactionTestCase):
+    migrate_from = [("accounts", "0001_initial")]
+    migrate_to = [("accounts", "0002_email_lowercase")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        # Leave the schema at the latest migration for the tests that follow
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes("accounts"))
+
+    def test_backfill_and_dedupe(self):
+        apps = self.migrate(self.migrate_from)
+        OldUser = apps.get_model("accounts", "User")
+        kept = OldUser.objects.create(email="Dup@Example.com", full_name="Kept", last_login="2025-01-02T00:00:00Z")
+        dropped = OldUser.objects.create(email="dup@example.com", full_name="Dropped")
+        mixed = OldUser.objects.create(email="Mixed@Example.com", full_name="Mixed")
+        inactive = OldUser.objects.create(email="Other@Example.com", full_name="Inactive", is_active=False)
+        active = OldUser.objects.create(email="other@example.com", full_name="Active")
+
+        apps = self.migrate(self.migrate_to)
+        NewUser = apps.get_model("accounts", "User")
+        self.assertEqual(NewUser.objects.get(pk=kept.pk).email, "dup@example.com")
+        dropped = NewUser.objects.get(pk=dropped.pk)
+        self.assertEqual(dropped.email, f"duplicate-{dropped.pk}+dup@example.com")
+        self.assertFalse(dropped.is_active)
+        self.assertEqual(NewUser.objects.get(pk=mixed.pk).email, "mixed@example.com")
+        self.assertEqual(NewUser.objects.get(pk=active.pk).email, "other@example.com")
+        self.assertEqual(NewUser.objects.get(pk=inactive.pk).email, f"duplicate-{inactive.pk}+other@example.com")
+
+
+class HashingBackpressureTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def test_saturated_pool_returns_503(self):
+        saturated = hashing.HashingExecutor(workers=1, max_pending=0, retry_after=3)
+        with mock.patch.object(hashing, "_executor", saturated):
+            response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "3")
+
+    def test_cheap_requests_served_while_pool_saturated(self):
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        busy = hashing.HashingExecutor(workers=1, max_pending=1, retry_after=1)
+        # A slow hash holds the pool's only process and its only pending slot
+        future = busy.submit(time.sleep, 1)
+        try:
+            with mock.patch.object(hashing, "_executor", busy):
+                self.assertEqual(self.client.get(reverse("me")).status_code, status.HTTP_200_OK)
+                response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+                self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        finally:
+            future.result()
+            busy._pool.shutdown()
+
+    def test_gunicorn_threads_outnumber_pending_hashes(self):
+        config = runpy.run_path(settings.BASE_DIR / "config" / "gunicorn.py")
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertGreater(config["threads"], settings.PASSWORD_HASHING["MAX_PENDING"])
+
+
+class CalibrateHashersTests(TestCase):
+    def test_pbkdf2_iterations_not_lowered(self):
+        stderr = StringIO()
+        command = calibrate_hashers.Command(stdout=StringIO(), stderr=stderr)
+        # A slow machine: 100,000 iterations in 100ms
+        with mock.patch.object(calibrate_hashers, "measure", return_value=0.1):
+            pbkdf2 = command.calibrate_pbkdf2(0.25, rounds=1)
+        self.assertEqual(pbkdf2["iterations"], hashers.PBKDF2PasswordHasher.iterations)
+        self.assertIn("using the minimum", stderr.getvalue())
+
+
+class RehashOnLoginTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+        self.old_hash = hashers.make_password("testpass123", hasher="pbkdf2_sha256")
+        User.objects.filter(pk=self.user.pk).update(password=self.old_hash)
+        cache.clear()
+
+    def test_outdated_hash_upgraded_after_login(self):
+        futures = []
+        schedule_rehash = hashing.schedule_rehash
+        with mock.patch.object(hashing, "schedule_rehash", side_effect=lambda *args: futures.append(schedule_rehash(*args))):
+            response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(futures[0].result(timeout=10))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("argon2$"))
+        self.assertTrue(self.user.check_password("testpass123"))
+
+    def test_changed_password_not_overwritten(self):
+        user = User.objects.get(pk=self.user.pk)
+        User.objects.filter(pk=user.pk).update(password=hashers.make_password("changedpass123"))
+        self.assertFalse(hashing.schedule_rehash(user, "testpass123").result(timeout=10))
+
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user_cache = UserCache(timeout=60, local_max_size=16, local_timeout=60)
+        self.user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def test_read_through(self):
+        cache.clear()
+        misses = REGISTRY.get_sample_value("auth_user_cache_lookups_total", {"result": "miss"}) or 0
+        with self.assertNumQueries(1):
+            self.user_cache.get(email="test@example.com")
+            cached = self.user_cache.get(email="Test@Example.com")
+            self.user_cache.get(pk=self.user.pk)
+        self.assertEqual(cached.pk, self.user.pk)
+        self.assertEqual(cached.password, self.user.password)
+        self.assertEqual(cached.date_joined, self.user.date_joined)
+        self.assertEqual(self.user_cache.stats()["misses"], 1)
+        self.assertEqual(REGISTRY.get_sample_value("auth_user_cache_lookups_total", {"result": "miss"}) - misses, 1)
+
+    def test_fill_does_not_overwrite_write_through(self):
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.full_name = "Renamed User"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        # A read that started before the save fills the cache after it
+        self.user_cache._fill([stale])
+        self.assertEqual(self.user_cache.get(pk=self.user.pk).full_name, "Renamed User")
+
+    def test_save_writes_through(self):
+        self.user.full_name = "Renamed User"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(User.objects.get_cached(pk=self.user.pk).full_name, "Renamed User")
+
+    def test_rollback_not_cached(self):
+        with self.assertRaises(ValueError), transaction.atomic():
+            self.user.full_name = "Renamed User"
+            self.user.save()
+            raise ValueError
+        self.assertEqual(User.objects.get_cached(pk=self.user.pk).full_name, "Test User")
+
+    def test_delete_invalidates(self):
+        pk = self.user.pk
+        self.user.delete()
+        with self.assertRaises(User.DoesNotExist):
+            User.objects.get_cached(pk=pk)
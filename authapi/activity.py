@@ -0,0 +1,151 @@
+"""
+Write-behind recording of logins.
+LoginView only appends the login to a Redis stream, in the same pipeline as the new
+token family, so a login costs no database write. The `record_logins` management
+command consumes the stream in batches: per batch it sets every user's `last_login`
+with one UPDATE (the latest login wins when a user logged in several times) and
+inserts the LoginEvent rows with one bulk INSERT. The stream is capped at
+LOGIN_EVENTS_MAX_BUFFERED entries, so if the worker is down the oldest logins are
+dropped instead of Redis filling up.
+"""
+
+import ipaddress
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from redis.exceptions import ResponseError
+from rest_framework.throttling import BaseThrottle
+
+from accounts.cache import get_user_cache
+from accounts.models import LoginEvent
+from config.redis_client import get_redis
+
+User = get_user_model()
+
+STREAM = "activity:logins"
+GROUP = "recorders"
+
+
+def _client_ip(request):
+    # As the throttles see it (honours NUM_PROXIES); None unless it's a single address
+    try:
+        return str(ipaddress.ip_address(BaseThrottle().get_ident(request)))
+    except ValueError:
+        return None
+
+
+def _payload(user, request, at):
+    return json.dumps({
+        "user": user.pk,
+        "at": at,
+        "ip": _client_ip(request),
+        "ua": request.headers.get("User-Agent", "")[:255],
+    }, separators=(",", ":"))
+
+
+def record_login(pipe, user, request, at):
+    """
+    Queue a login on the given Redis pipeline (or client). `at` is a Unix timestamp.
+    """
+    pipe.xadd(
+        STREAM, {"payload": _payload(user, request, at)},
+        maxlen=settings.LOGIN_EVENTS_MAX_BUFFERED, approximate=True,
+    )
+
+
+class LoginRecorder:
+    """
+    Consumes the login stream as one member of the `recorders` consumer group.
+    """
+
+    def __init__(self, consumer, batch_size=1000, block_ms=5000, claim_idle_ms=60000):
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.redis = get_redis()
+
+    def ensure_group(self):
+        try:
+            self.redis.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def read_batch(self, block):
+        """
+        Return up to batch_size entries: first any left pending by a crashed worker,
+        then new ones.
+        """
+        _, entries, *_ = self.redis.xautoclaim(
+            STREAM, GROUP, self.consumer, self.claim_idle_ms, count=self.batch_size
+        )
+        if entries:
+            return entries
+        response = self.redis.xreadgroup(
+            GROUP, self.consumer, {STREAM: ">"}, count=self.batch_size, block=self.block_ms if block else None
+        )
+        return response[0][1] if response else []
+
+    def process_batch(self, block=True):
+        """
+        Write one batch of logins, waiting up to block_ms for new ones if `block`.
+        Returns the number of stream entries handled.
+        """
+        try:
+            entries = self.read_batch(block)
+        except ResponseError as exc:
+            if "NOGROUP" not in str(exc):
+                raise
+            self.ensure_group()
+            return 0
+        if not entries:
+            return 0
+
+        logins = [json.loads(fields[b"payload"]) for _, fields in entries if fields]
+        self.write(logins)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.xack(STREAM, GROUP, *[entry_id for entry_id, _ in entries])
+        pipe.xdel(STREAM, *[entry_id for entry_id, _ in entries])
+        pipe.execute()
+        return len(entries)
+
+    def write(self, logins):
+        """
+        Apply a batch of logins in one transaction: one UPDATE for last_login and one
+        INSERT for the events. Logins of since-deleted users are skipped.
+        """
+        latest = {}
+        for login in logins:
+            at = datetime.fromtimestamp(login["at"], tz=timezone.utc)
+            login["at"] = at
+            latest[login["user"]] = max(latest.get(login["user"], at), at)
+        with transaction.atomic():
+            # Locked until the end of the batch, so the cached copies written below match the rows
+            users = list(User.objects.select_for_update().filter(pk__in=latest))
+            existing = {user.pk for user in users}
+            if not existing:
+                return
+            # Never moves last_login backwards, e.g. for a batch claimed late from a crashed worker
+            User.objects.filter(pk__in=existing).update(last_login=Case(
+                *[
+                    When(pk=pk, then=Greatest(Coalesce(F("last_login"), Value(at)), Value(at)))
+                    for pk, at in latest.items() if pk in existing
+                ],
+                default=F("last_login"),
+                output_field=DateTimeField(),
+            ))
+            LoginEvent.objects.bulk_create([
+                LoginEvent(user_id=login["user"], created_at=login["at"], ip_address=login["ip"], user_agent=login["ua"])
+                for login in logins if login["user"] in existing
+            ])
+            # The bulk UPDATE bypasses post_save; write the new last_login through to the
+            # cache, so a later save() of a cached instance can't write an old one back
+            for user in users:
+                user.last_login = max(user.last_login or latest[user.pk], latest[user.pk])
+            get_user_cache().set_many(users)
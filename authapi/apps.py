@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AuthapiConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "authapi"
+
+    def ready(self):
+        # Register signal receivers
+        from . import signals  # noqa: F401
@@ -0,0 +1,202 @@
+"""
+Async views for authentication endpoints, served under ASGI (e.g. uvicorn).
+Same endpoints and responses as authapi.views, but the handlers await the async ORM,
+redis.asyncio and the hashing pool instead of blocking a thread per request.
+Enabled with the ASYNC_VIEWS setting.
+"""
+
+import time
+
+from adrf.views import APIView
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, get_user_model
+from drf_spectacular.utils import OpenApiExample, extend_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+
+from accounts.hashing import amake_password
+from config.redis_client import adeferred_writes, get_async_redis
+
+from .activity import record_login
+from .conditional import me_response
+from .idempotency import IdempotencyMixin
+from .login_guard import login_guard
+from .outbox import aenqueue_password_reset
+from .reset_tokens import reset_tokens
+from .serializers import (
+    RegisterSerializer, LoginSerializer, ForgotPasswordSerializer,
+    ResetPasswordSerializer, UserSerializer
+)
+from .token_families import token_families
+from .tokens import USER_VERSIONS_KEY, UserSnapshotRefreshToken
+
+# Get the custom user model
+User = get_user_model()
+
+
+class RegisterView(IdempotencyMixin, APIView):
+    """
+    API endpoint for user registration.
+    Retries with the same Idempotency-Key get the first response back.
+    """
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "login"
+
+    @extend_schema(
+        request=RegisterSerializer,
+        responses={201: UserSerializer},
+        examples=[OpenApiExample(
+            "Register Example",
+            value={"email": "user@example.com", "full_name": "John Doe", "password": "strongpassword123"}
+        )]
+    )
+    async def post(self, request):
+        """
+        Handle POST request for user registration.
+        """
+        serializer = RegisterSerializer(data=request.data)
+        # Validation includes the email uniqueness query, which is sync in DRF
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        # The post_save receivers' Redis writes go out in one round trip
+        async with adeferred_writes():
+            user = await User.objects.acreate_user(
+                email=serializer.validated_data["email"],
+                full_name=serializer.validated_data["full_name"],
+                password=serializer.validated_data["password"]
+            )
+        return Response(UserSerializer.serialize(user), status=status.HTTP_201_CREATED)
+
+
+class LoginView(APIView):
+    """
+    API endpoint for user login. Returns JWT access and refresh tokens.
+    """
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "login"
+
+    @extend_schema(
+        request=LoginSerializer,
+        responses={200: OpenApiExample(
+            "JWT Token Example",
+            value={"access": "jwt-access-token", "refresh": "jwt-refresh-token"}
+        )},
+        examples=[OpenApiExample(
+            "Login Example",
+            value={"email": "user@example.com", "password": "strongpassword123"}
+        )]
+    )
+    async def post(self, request):
+        """
+        Handle POST request for user login.
+        Authenticates the user and returns JWT tokens if credentials are valid.
+        """
+        serializer = LoginSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        email = serializer.validated_data["email"]
+        # Unknown emails, locked accounts and shed logins stop here, before any query or hash
+        if not await login_guard.acheck(email):
+            return Response({"detail": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED)
+        user = await aauthenticate(request, email=email, password=serializer.validated_data["password"])
+        if not user:
+            await login_guard.afailed(email)
+            return Response({"detail": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED)
+        redis_conn = get_async_redis()
+        version = int(await redis_conn.hget(USER_VERSIONS_KEY, user.pk) or 0)
+        refresh = UserSnapshotRefreshToken.for_user(user, version=version)
+        # One round trip for the new token family, the write-behind login record and
+        # clearing the account's failed logins
+        pipe = redis_conn.pipeline(transaction=False)
+        await token_families.astart(refresh, pipe)
+        record_login(pipe, user, request, time.time())
+        login_guard.succeeded(pipe, email)
+        await pipe.execute()
+        return Response({
+            "access": str(refresh.access_token),
+            "refresh": str(refresh)
+        })
+
+
+class MeView(APIView):
+    """
+    API endpoint to get details of the authenticated user.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        responses={200: UserSerializer},
+        description="Get authenticated user details."
+    )
+    async def get(self, request):
+        """
+        Handle GET request to return the authenticated user's details.
+        Answers 304 when the client's ETag or Last-Modified is still current.
+        """
+        return me_response(request)
+
+
+class ForgotPasswordView(APIView):
+    """
+    API endpoint to initiate password reset.
+    Queues a reset email in the outbox; the token is only ever sent by email.
+    """
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "password_reset"
+
+    @extend_schema(
+        request=ForgotPasswordSerializer,
+        responses={200: OpenApiExample(
+            "Forgot Password Example",
+            value={"detail": "Password reset email sent if user exists."}
+        )}
+    )
+    async def post(self, request):
+        """
+        Handle POST request to initiate password reset.
+        """
+        serializer = ForgotPasswordSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Same single Redis command whether or not the email is registered, so the
+        # response time doesn't leak it; the outbox worker looks the user up and mails them
+        await aenqueue_password_reset(serializer.validated_data["email"])
+        return Response({"detail": "Password reset email sent if user exists."})
+
+
+class ResetPasswordView(IdempotencyMixin, APIView):
+    """
+    API endpoint to reset the user's password using a token.
+    Retries with the same Idempotency-Key get the first response back.
+    """
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "password_reset"
+
+    @extend_schema(
+        request=ResetPasswordSerializer,
+        responses={200: OpenApiExample(
+            "Reset Password Example",
+            value={"detail": "Password has been reset successfully."}
+        )}
+    )
+    async def post(self, request):
+        """
+        Handle POST request to reset the user's password.
+        Validates the token from Redis and updates the user's password.
+        """
+        serializer = ResetPasswordSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = serializer.validated_data["token"]
+        password = serializer.validated_data["password"]
+        # Hash before consuming the token, so a busy hashing pool (503) leaves it usable
+        encoded = await amake_password(password)
+        # Consumes the token, so concurrent requests can't redeem it twice
+        user_id = await reset_tokens.aredeem(token)
+        if not user_id:
+            return Response({"detail": "Invalid or expired token."}, status=400)
+        try:
+            user = await User.objects.aget_cached(pk=user_id)
+        except User.DoesNotExist:
+            return Response({"detail": "User not found."}, status=404)
+        await user.aset_password(password, encoded)
+        # The cached copy may be stale, so only the password is written back
+        async with adeferred_writes():
+            await user.asave(update_fields=["password"])
+        return Response({"detail": "Password has been reset successfully."})
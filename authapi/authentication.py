@@ -0,0 +1,111 @@
+"""
+Authentication classes for the API.
+ClaimsJWTAuthentication trusts the user snapshot embedded in access tokens instead of
+loading the user from the database on every request.
+"""
+
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.drainage import set_override
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from config.db_router import pin_to_primary, replicas_enabled, sticky_user_key
+from config.redis_client import get_redis
+
+from .token_families import FAMILY_CLAIM, revoked_key
+from .tokens import SNAPSHOT_CLAIMS, USER_VERSIONS_KEY, VERSION_CLAIM
+
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user backed by the claims of a validated token.
+    Exposes the same fields as UserSerializer without a database row.
+    """
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def email(self):
+        return self.token["email"]
+
+    @cached_property
+    def full_name(self):
+        return self.token["full_name"]
+
+    def __str__(self):
+        return self.email
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication returning a ClaimsUser for tokens with a user snapshot.
+    The only per-request lookup is one Redis round trip for the user's version and
+    the token family's revocation marker, so tokens issued before a password reset,
+    deactivation or logout are rejected immediately.
+    Tokens without a snapshot fall back to loading the user from the database.
+    """
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token or any(c not in validated_token for c in SNAPSHOT_CLAIMS):
+            return super().get_user(validated_token)
+        self.check_revocation(validated_token)
+        return ClaimsUser(validated_token)
+
+    def check_revocation(self, validated_token):
+        """
+        Reject tokens issued before the user's current version or from a revoked family.
+        With read replicas, the same round trip tells whether the user's reads must stay
+        on the primary.
+        """
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hget(USER_VERSIONS_KEY, user_id)
+        sticky = replicas_enabled()
+        if sticky:
+            pipe.exists(sticky_user_key(user_id))
+        if FAMILY_CLAIM in validated_token:
+            pipe.exists(revoked_key(validated_token[FAMILY_CLAIM]))
+        version, *revoked = pipe.execute()
+        if sticky and revoked.pop(0):
+            pin_to_primary()
+        if int(version or 0) != validated_token.get(VERSION_CLAIM, 0) or any(revoked):
+            raise AuthenticationFailed(_("Token is no longer valid"), code="token_not_valid")
+
+
+class DatabaseJWTAuthentication(ClaimsJWTAuthentication):
+    """
+    JWT authentication returning the full User, for views that need more than the
+    token snapshot (staff status, permissions). Applies the same revocation check,
+    then loads the user through the user cache.
+    """
+
+    def get_user(self, validated_token):
+        self.check_revocation(validated_token)
+        try:
+            user = self.user_model.objects.get_cached(pk=validated_token[api_settings.USER_ID_CLAIM])
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """
+    Documents ClaimsJWTAuthentication and its subclasses as the JWT bearer scheme.
+    SimpleJWT's own extension only matches JWTAuthentication exactly.
+    """
+
+    target_class = "authapi.authentication.ClaimsJWTAuthentication"
+    match_subclasses = True
+
+    def get_security_definition(self, auto_schema):
+        # Every subclass documents the same jwtAuth component
+        set_override(type(self.target), "suppress_collision_warning", True)
+        return super().get_security_definition(auto_schema)
@@ -0,0 +1,82 @@
+"""
+Bulk registration for partner onboarding.
+A batch is validated item by item, duplicates are found within the batch and against
+the database with one `email__in` query, the passwords of the valid items are hashed in
+parallel on the hashing pool, and the new users are inserted with bulk_create. Each
+item gets its own result, so one bad row doesn't fail the batch.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from accounts import hashing
+from accounts.email_filter import get_email_filter
+
+from .serializers import BulkRegisterItemSerializer, UserSerializer
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def _existing_emails(emails):
+    return set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+
+
+def register_users(items):
+    """
+    Register a list of {"email", "full_name", "password"} items and return one result
+    per item, in order: {"status": "created", "user": ...} or {"status": "error", "errors": ...}.
+    """
+    results = [None] * len(items)
+    valid = {}
+    item_serializer = BulkRegisterItemSerializer()
+    for index, item in enumerate(items):
+        try:
+            data = item_serializer.run_validation(item)
+        except ValidationError as exc:
+            results[index] = {"status": "error", "errors": exc.detail}
+            continue
+        if data["email"] in valid:
+            results[index] = {"status": "error", "errors": {"email": ["Duplicate email in this batch."]}}
+            continue
+        valid[data["email"]] = (index, data)
+
+    def reject_existing(emails):
+        for email in emails:
+            index, _ = valid.pop(email)
+            results[index] = {"status": "error", "errors": {"email": ["user with this email already exists."]}}
+
+    reject_existing(_existing_emails(list(valid)))
+    if valid:
+        entries = list(valid.values())
+        encoded = hashing.make_passwords([data["password"] for _, data in entries])
+        users = {
+            data["email"]: User(email=data["email"], full_name=data["full_name"], password=password)
+            for (_, data), password in zip(entries, encoded)
+        }
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users.values(), batch_size=BATCH_SIZE)
+        except IntegrityError:
+            # Lost a race with a concurrent registration; drop those emails and retry once
+            taken = _existing_emails(list(users))
+            reject_existing(taken)
+            for email in taken:
+                del users[email]
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(users.values(), batch_size=BATCH_SIZE)
+            except IntegrityError:
+                # Raced again: fail the rest rather than the whole batch
+                for email in users:
+                    results[valid[email][0]] = {
+                        "status": "error", "errors": {"non_field_errors": ["Registration conflicted, please retry."]}
+                    }
+                users = {}
+        # bulk_create doesn't send post_save
+        get_email_filter().add_many(users)
+        for email, user in users.items():
+            results[valid[email][0]] = {"status": "created", "user": UserSerializer.serialize(user)}
+    return results
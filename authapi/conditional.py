@@ -0,0 +1,43 @@
+"""
+Conditional GET for /api/auth/me.
+The ETag is a version stamp of the user as the response shows them: the token version
+plus a digest of the serialized fields, so it changes whenever the body would. For
+users served from the token's snapshot, Last-Modified is when the snapshot was taken
+(the token's `iat`). Polling clients sending If-None-Match or If-Modified-Since get a
+304 with no body.
+"""
+
+import hashlib
+
+import orjson
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .authentication import ClaimsUser
+from .serializers import UserSerializer
+from .tokens import VERSION_CLAIM
+
+
+def user_etag(data, version):
+    digest = hashlib.blake2b(orjson.dumps(data), digest_size=8).hexdigest()
+    return f'"{version}-{digest}"'
+
+
+def me_response(request):
+    """
+    The /me response for request.user: a 304 if the client's copy is current,
+    otherwise the user's details. Both carry the validators.
+    """
+    data = UserSerializer.serialize(request.user)
+    etag = user_etag(data, request.auth.get(VERSION_CLAIM, 0))
+    # A user loaded from the database may have changed after the token was issued
+    issued_at = request.auth.get("iat") if isinstance(request.user, ClaimsUser) else None
+    response = get_conditional_response(request, etag=etag, last_modified=issued_at) or Response(data)
+    response["ETag"] = etag
+    if issued_at:
+        response["Last-Modified"] = http_date(issued_at)
+    # Per-user, and revalidated on every use
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Authorization",))
+    return response
@@ -0,0 +1,216 @@
+"""
+Idempotency-Key support for POST endpoints that clients retry.
+The first request with a given key takes a lock on it in Redis and, once it has a
+response, stores that response along with a fingerprint of the request body (an HMAC
+keyed with SECRET_KEY, since bodies carry passwords). Retries with the same key and
+body get the stored response back (with an Idempotent-Replayed header) at the cost of
+one Redis call, without running validation, queries or hashing again. Concurrent
+duplicates get a 409 with Retry-After; async views first wait a little for the first
+request to finish, since waiting there doesn't hold a worker thread. The same key with
+a different body is a 422.
+Server errors and 429s aren't stored, so those requests can be retried with the same key.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from config.redis_client import get_async_redis, get_async_script, get_redis, get_script
+
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+# Seconds between checks while waiting for an in-flight duplicate
+POLL_INTERVAL = 0.05
+
+# KEYS: record. ARGV: fingerprint, owner token, lock ms.
+# Takes the key if it's free (returns nil), otherwise returns the record:
+# {fingerprint, owner, status, content type, body}, with owner set while in flight.
+_BEGIN = """
+local record = redis.call('HMGET', KEYS[1], 'fingerprint', 'owner', 'status', 'content_type', 'body')
+if record[1] then return record end
+redis.call('HSET', KEYS[1], 'fingerprint', ARGV[1], 'owner', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return nil
+"""
+
+# KEYS: record. ARGV: owner token, status, content type, body, ttl ms.
+# Stores the response, unless the lock expired and another request took the key.
+_FINISH = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] then return 0 end
+redis.call('HDEL', KEYS[1], 'owner')
+redis.call('HSET', KEYS[1], 'status', ARGV[2], 'content_type', ARGV[3], 'body', ARGV[4])
+redis.call('PEXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+# KEYS: record. ARGV: owner token. Frees the key for a retry.
+_RELEASE = """
+if redis.call('HGET', KEYS[1], 'owner') == ARGV[1] then redis.call('DEL', KEYS[1]) end
+return 1
+"""
+
+
+def _is_stored(response):
+    return response.status_code < 500 and response.status_code != 429
+
+
+class IdempotencyStore:
+    """
+    Redis records of keyed requests, with sync and async (redis.asyncio) variants.
+    """
+
+    def __init__(self, ttl, lock_seconds, wait_seconds):
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.IDEMPOTENCY
+        return cls(config["TTL_SECONDS"], config["LOCK_SECONDS"], config["WAIT_SECONDS"])
+
+    def record_key(self, path, key):
+        return f"idempotency:{path}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+    def fingerprint(self, body):
+        return hmac.new(settings.SECRET_KEY.encode(), body, hashlib.sha256).hexdigest()
+
+    def _finish_args(self, owner, response):
+        return [owner, response.status_code, response.get("Content-Type", ""), response.content, self.ttl * 1000]
+
+    def begin(self, record_key, fingerprint, owner):
+        redis_conn = get_redis()
+        return get_script(_BEGIN)(
+            keys=[record_key], args=[fingerprint, owner, self.lock_seconds * 1000], client=redis_conn
+        )
+
+    def finish(self, record_key, owner, response):
+        """
+        Store the response for replay, or free the key if it may not be replayed.
+        """
+        if not _is_stored(response):
+            return self.release(record_key, owner)
+        redis_conn = get_redis()
+        args = self._finish_args(owner, response)
+        get_script(_FINISH)(keys=[record_key], args=args, client=redis_conn)
+
+    def release(self, record_key, owner):
+        redis_conn = get_redis()
+        get_script(_RELEASE)(keys=[record_key], args=[owner], client=redis_conn)
+
+    async def abegin(self, record_key, fingerprint, owner):
+        redis_conn = get_async_redis()
+        return await get_async_script(_BEGIN)(
+            keys=[record_key], args=[fingerprint, owner, self.lock_seconds * 1000], client=redis_conn
+        )
+
+    async def afinish(self, record_key, owner, response):
+        if not _is_stored(response):
+            return await self.arelease(record_key, owner)
+        redis_conn = get_async_redis()
+        args = self._finish_args(owner, response)
+        await get_async_script(_FINISH)(keys=[record_key], args=args, client=redis_conn)
+
+    async def arelease(self, record_key, owner):
+        redis_conn = get_async_redis()
+        await get_async_script(_RELEASE)(keys=[record_key], args=[owner], client=redis_conn)
+
+
+idempotency = IdempotencyStore.from_settings()
+
+
+class IdempotencyMixin:
+    """
+    Makes a view's POST handler idempotent for requests carrying an Idempotency-Key
+    header. Works with DRF's and adrf's APIView; requests without the header are
+    handled as usual.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if request.method != "POST" or key is None:
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.adispatch_idempotent(request, key, *args, **kwargs)
+        return self.dispatch_idempotent(request, key, *args, **kwargs)
+
+    def _prepare(self, request, key):
+        """
+        Return (record key, fingerprint, owner token), or an error response for a bad key.
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JsonResponse({"detail": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters."}, status=400)
+        fingerprint = idempotency.fingerprint(request.body)
+        return idempotency.record_key(request.path, key), fingerprint, secrets.token_hex(16)
+
+    def _outcome(self, record, fingerprint):
+        """
+        The response for a key held by another request, or None while it's in flight.
+        """
+        stored_fingerprint, owner, status_code, content_type, body = record
+        if stored_fingerprint.decode() != fingerprint:
+            return JsonResponse(
+                {"detail": f"{HEADER} was already used with a different request body."}, status=422
+            )
+        if owner:
+            return None
+        response = HttpResponse(body, status=int(status_code), content_type=content_type.decode() or None)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    def _in_progress(self):
+        response = JsonResponse({"detail": f"A request with this {HEADER} is still in progress."}, status=409)
+        response["Retry-After"] = "1"
+        return response
+
+    def _render(self, response):
+        # DRF responses are rendered after the view returns; the body is needed now
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def dispatch_idempotent(self, request, key, *args, **kwargs):
+        prepared = self._prepare(request, key)
+        if isinstance(prepared, HttpResponse):
+            return prepared
+        record_key, fingerprint, owner = prepared
+        record = idempotency.begin(record_key, fingerprint, owner)
+        if record is not None:
+            outcome = self._outcome(record, fingerprint)
+            # Waiting would hold a worker thread, so in-flight duplicates are told to retry
+            return outcome if outcome is not None else self._in_progress()
+        try:
+            response = self._render(super().dispatch(request, *args, **kwargs))
+        except BaseException:
+            idempotency.release(record_key, owner)
+            raise
+        idempotency.finish(record_key, owner, response)
+        return response
+
+    async def adispatch_idempotent(self, request, key, *args, **kwargs):
+        prepared = self._prepare(request, key)
+        if isinstance(prepared, HttpResponse):
+            return prepared
+        record_key, fingerprint, owner = prepared
+        deadline = time.monotonic() + idempotency.wait_seconds
+        while (record := await idempotency.abegin(record_key, fingerprint, owner)) is not None:
+            outcome = self._outcome(record, fingerprint)
+            if outcome is not None:
+                return outcome
+            if time.monotonic() >= deadline:
+                return self._in_progress()
+            await asyncio.sleep(POLL_INTERVAL)
+        try:
+            response = self._render(await super().dispatch(request, *args, **kwargs))
+        except BaseException:
+            await idempotency.arelease(record_key, owner)
+            raise
+        await idempotency.afinish(record_key, owner, response)
+        return response
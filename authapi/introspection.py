@@ -0,0 +1,89 @@
+"""
+Batch token introspection for API gateways.
+A gateway validating many bearer tokens sends them in one request instead of calling
+/api/auth/me once per token. Signatures are verified with the already-parsed signing
+keys, the user versions and family revocation markers of every token are read in one
+Redis round trip, and the users are loaded with one cache multi-get (falling back to
+a single `pk__in` query).
+"""
+
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from config.redis_client import get_redis
+
+from .serializers import UserSerializer
+from .token_families import FAMILY_CLAIM, revoked_key
+from .tokens import USER_VERSIONS_KEY, VERSION_CLAIM, UserSnapshotAccessToken
+
+User = get_user_model()
+
+INACTIVE = {"active": False}
+
+
+def _decode(raw_tokens):
+    """
+    Return a dict of raw token -> validated access token, or None if invalid.
+    Duplicate tokens are only verified once.
+    """
+    tokens = {}
+    for raw in raw_tokens:
+        if raw not in tokens:
+            try:
+                tokens[raw] = UserSnapshotAccessToken(raw)
+            except TokenError:
+                tokens[raw] = None
+    return tokens
+
+
+def _read_state(user_ids, families):
+    """
+    Return (user id -> version, revoked families) in one Redis round trip.
+    """
+    if not user_ids:
+        return {}, set()
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hmget(USER_VERSIONS_KEY, user_ids)
+    if families:
+        pipe.mget([revoked_key(family) for family in families])
+    versions, *revoked = pipe.execute()
+    revoked = {family for family, marker in zip(families, revoked[0] if revoked else []) if marker}
+    return {pk: int(version or 0) for pk, version in zip(user_ids, versions)}, revoked
+
+
+def introspect(raw_tokens):
+    """
+    Return one result per token, in order: {"active": False} for tokens that are
+    invalid, expired, revoked or belong to an inactive user, otherwise the token's
+    subject and expiry with the user's UserSerializer fields.
+    """
+    tokens = _decode(raw_tokens)
+    valid = [token for token in tokens.values() if token is not None]
+    user_ids = sorted({int(token[api_settings.USER_ID_CLAIM]) for token in valid})
+    families = sorted({token[FAMILY_CLAIM] for token in valid if FAMILY_CLAIM in token})
+    versions, revoked = _read_state(user_ids, families)
+    users = User.objects.get_cached_many(user_ids) if user_ids else {}
+    serialized = {pk: UserSerializer.serialize(user) for pk, user in users.items() if user.is_active}
+
+    results = []
+    for raw in raw_tokens:
+        token = tokens[raw]
+        if token is None:
+            results.append(INACTIVE)
+            continue
+        user_id = int(token[api_settings.USER_ID_CLAIM])
+        if (
+            user_id not in serialized
+            or (VERSION_CLAIM in token and token[VERSION_CLAIM] != versions[user_id])
+            or token.get(FAMILY_CLAIM) in revoked
+        ):
+            results.append(INACTIVE)
+            continue
+        results.append({
+            "active": True,
+            "sub": str(user_id),
+            "exp": token["exp"],
+            "user": serialized[user_id],
+        })
+    return results
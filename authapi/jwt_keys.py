@@ -0,0 +1,173 @@
+"""
+Asymmetric JWT signing keys.
+Private keys are loaded from the PEM files in JWT_SIGNING_KEY_FILES, newest first: the
+first key signs new tokens, and all of them verify tokens and are published on the
+JWKS endpoint so other services can verify tokens locally. Rotating means adding a new
+key file at the front and dropping the oldest once tokens signed with it have expired.
+RSA keys sign with RS256 and Ed25519 keys with EdDSA. Without key files, tokens are
+signed with SimpleJWT's symmetric settings and the JWKS is empty.
+"""
+
+import base64
+import hashlib
+import json
+from functools import cache
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _thumbprint(jwk):
+    """
+    RFC 7638 thumbprint of a public JWK, used as its key id.
+    """
+    required = {"RSA": ("e", "kty", "n"), "OKP": ("crv", "kty", "x")}[jwk["kty"]]
+    canonical = json.dumps({k: jwk[k] for k in required}, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class SigningKey:
+    """
+    A private key with its algorithm, public key and key id.
+    """
+
+    def __init__(self, private_key):
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        if isinstance(private_key, rsa.RSAPrivateKey):
+            self.algorithm = "RS256"
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+            self.algorithm = "EdDSA"
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            raise ValueError("JWT signing keys must be RSA or Ed25519 keys.")
+        self.kid = _thumbprint(jwk)
+        self.jwk = {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "rb") as f:
+            return cls(load_pem_private_key(f.read(), password=None))
+
+
+class KeyRing:
+    """
+    Signing keys by key id; the first key signs.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.by_kid = {key.kid: key for key in self.keys}
+
+    @property
+    def current(self):
+        return self.keys[0]
+
+    def jwks(self):
+        return {"keys": [key.jwk for key in self.keys]}
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    SimpleJWT token backend signing with the key ring's current key and verifying with
+    the key named by the token's `kid` header.
+    """
+
+    def __init__(self, keyring):
+        super().__init__(
+            keyring.current.algorithm,
+            audience=api_settings.AUDIENCE,
+            issuer=api_settings.ISSUER,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+        self.keyring = keyring
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+        key = self.keyring.current
+        return jwt.encode(
+            jwt_payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        try:
+            key = self.keyring.by_kid.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise TokenBackendError(_("Token is invalid"))
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    "verify_aud": self.audience is not None,
+                    "verify_signature": verify,
+                },
+            )
+        except ExpiredSignatureError as e:
+            raise TokenBackendExpiredToken(_("Token is expired")) from e
+        except InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+
+
+@cache
+def get_keyring():
+    """
+    Return the key ring loaded from JWT_SIGNING_KEY_FILES, or None if none are set.
+    """
+    if not settings.JWT_SIGNING_KEY_FILES:
+        return None
+    return KeyRing(SigningKey.from_file(path) for path in settings.JWT_SIGNING_KEY_FILES)
+
+
+@cache
+def get_token_backend():
+    """
+    Return the backend used to sign and verify this service's tokens.
+    """
+    keyring = get_keyring()
+    if keyring is None:
+        from rest_framework_simplejwt.state import token_backend
+        return token_backend
+    return KeyRingTokenBackend(keyring)
+
+
+@cache
+def get_jwks_document():
+    """
+    Return the serialized JWKS and its ETag.
+    """
+    keyring = get_keyring()
+    body = json.dumps(keyring.jwks() if keyring else {"keys": []}, separators=(",", ":"))
+    return body, hashlib.sha256(body.encode()).hexdigest()
+
+
+@receiver(setting_changed)
+def reset_keyring(setting, **kwargs):
+    if setting in ("JWT_SIGNING_KEY_FILES", "SIMPLE_JWT"):
+        get_keyring.cache_clear()
+        get_token_backend.cache_clear()
+        get_jwks_document.cache_clear()
@@ -0,0 +1,199 @@
+"""
+Login defenses against credential stuffing, checked before any password is hashed.
+One Redis script call per login decides whether it may proceed:
+- emails missing from the registered-email filter (accounts.email_filter) are rejected
+  like wrong credentials, without a database lookup or a hash, and the failure is
+  counted like a wrong password;
+- emails with LOCKOUT_THRESHOLD failed logins in a row are locked, for a time that
+  doubles with every further failure up to LOCKOUT_MAX_SECONDS. Unknown emails lock
+  the same way, so a lockout doesn't reveal whether an account exists;
+- failed password checks across all accounts are counted per BREAKER_WINDOW_SECONDS,
+  and past HASH_FAILURE_BUDGET the breaker opens for BREAKER_COOLDOWN_SECONDS, during
+  which accounts that have recent failures are refused with a 503 instead of costing
+  another hash. Accounts without failures log in as usual.
+A successful login clears the account's failures.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+
+from accounts.cache import normalize_email
+from accounts.email_filter import get_email_filter
+from config.metrics import record_login_rejected
+from config.redis_client import get_async_redis, get_async_script, get_redis, get_script
+
+
+ALLOWED, LOCKED, UNKNOWN, SHED = range(4)
+
+BREAKER_KEY = "login:breaker"
+
+# KEYS: email filter, lock, failures, breaker. ARGV: the email's filter offsets.
+# Returns {verdict, milliseconds until it may be retried}.
+# Locks and the breaker come first, so unknown emails get the same answers as accounts.
+_CHECK = """
+local locked = redis.call('PTTL', KEYS[2])
+if locked > 0 then return {1, locked} end
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    local open = redis.call('PTTL', KEYS[4])
+    if open > 0 then return {3, open} end
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    for i = 1, #ARGV do
+        if redis.call('GETBIT', KEYS[1], ARGV[i]) == 0 then return {2, 0} end
+    end
+end
+return {0, 0}
+"""
+
+# KEYS: failures, lock, breaker window counter, breaker.
+# ARGV: failure window ms, lockout threshold, base lock ms, max lock ms, hash failure budget,
+# breaker window seconds, breaker cooldown ms, 1 if a password was hashed.
+# Returns the lock set, in ms (0 if none).
+_FAILED = """
+local failures = redis.call('INCR', KEYS[1])
+local lock = 0
+local beyond = failures - tonumber(ARGV[2])
+if beyond >= 0 then
+    lock = math.floor(math.min(tonumber(ARGV[3]) * 2 ^ beyond, tonumber(ARGV[4])))
+    redis.call('SET', KEYS[2], 1, 'PX', lock)
+end
+-- Outlive the lock, so the next failure after it escalates
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[1]) + lock)
+if ARGV[8] == '1' then
+    local spent = redis.call('INCR', KEYS[3])
+    if spent == 1 then redis.call('EXPIRE', KEYS[3], ARGV[6]) end
+    if spent > tonumber(ARGV[5]) then redis.call('SET', KEYS[4], 1, 'PX', ARGV[7]) end
+end
+return lock
+"""
+
+
+class AccountLocked(Throttled):
+    default_detail = "Too many failed logins for this account."
+    default_code = "account_locked"
+
+
+class LoginShed(APIException):
+    """
+    Raised while the hash-budget breaker is open, for accounts with recent failures.
+    DRF's exception handler turns `wait` into a Retry-After header.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Login is temporarily unavailable for this account, please retry shortly."
+    default_code = "login_shed"
+
+    def __init__(self, wait, detail=None, code=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+def _lock_key(email):
+    return f"login:locked:{email}"
+
+
+def _failures_key(email):
+    return f"login:failures:{email}"
+
+
+class LoginGuard:
+    """
+    Pre-login check and failure accounting, with sync and async (redis.asyncio) variants.
+    """
+
+    def __init__(self, lockout_threshold, lockout_base_seconds, lockout_max_seconds, failure_window_seconds,
+                 hash_failure_budget, breaker_window_seconds, breaker_cooldown_seconds):
+        self.lockout_threshold = lockout_threshold
+        self.lockout_base_seconds = lockout_base_seconds
+        self.lockout_max_seconds = lockout_max_seconds
+        self.failure_window_seconds = failure_window_seconds
+        self.hash_failure_budget = hash_failure_budget
+        self.breaker_window_seconds = breaker_window_seconds
+        self.breaker_cooldown_seconds = breaker_cooldown_seconds
+
+    @classmethod
+    def from_settings(cls):
+        config = settings.LOGIN_PROTECTION
+        return cls(
+            config["LOCKOUT_THRESHOLD"], config["LOCKOUT_BASE_SECONDS"], config["LOCKOUT_MAX_SECONDS"],
+            config["FAILURE_WINDOW_SECONDS"], config["HASH_FAILURE_BUDGET"], config["BREAKER_WINDOW_SECONDS"],
+            config["BREAKER_COOLDOWN_SECONDS"],
+        )
+
+    def _check_args(self, email):
+        email = normalize_email(email)
+        email_filter = get_email_filter()
+        keys = [email_filter.key, _lock_key(email), _failures_key(email), BREAKER_KEY]
+        return keys, email_filter.offsets(email)
+
+    def _failed_args(self, email, hashed):
+        email = normalize_email(email)
+        window = int(time.time() // self.breaker_window_seconds)
+        keys = [_failures_key(email), _lock_key(email), f"login:hash_failures:{window}", BREAKER_KEY]
+        return keys, [
+            self.failure_window_seconds * 1000, self.lockout_threshold, self.lockout_base_seconds * 1000, self.lockout_max_seconds * 1000,
+            self.hash_failure_budget, self.breaker_window_seconds, self.breaker_cooldown_seconds * 1000, int(hashed),
+        ]
+
+    def _verdict(self, result):
+        """
+        Raise for locked or shed logins; return False for unknown emails, True otherwise.
+        """
+        verdict, wait_ms = int(result[0]), int(result[1])
+        if verdict == ALLOWED:
+            return True
+        record_login_rejected(("allowed", "locked", "unknown", "shed")[verdict])
+        if verdict == UNKNOWN:
+            return False
+        wait = math.ceil(wait_ms / 1000)
+        if verdict == LOCKED:
+            raise AccountLocked(wait=wait)
+        raise LoginShed(wait=wait)
+
+    def check(self, email):
+        """
+        Decide whether a login for this email may check the password.
+        Returns False when the email can't belong to an account, so the caller answers
+        as for wrong credentials; the failure is already counted. Raises AccountLocked
+        (429) or LoginShed (503), both with Retry-After.
+        """
+        keys, args = self._check_args(email)
+        redis_conn = get_redis()
+        if self._verdict(get_script(_CHECK)(keys=keys, args=args, client=redis_conn)):
+            return True
+        self.failed(email, hashed=False)
+        return False
+
+    def failed(self, email, hashed=True):
+        """
+        Count a failed login, locking the email and opening the breaker as needed.
+        Only failures that cost a hash (`hashed`) count towards the breaker.
+        """
+        keys, args = self._failed_args(email, hashed)
+        redis_conn = get_redis()
+        get_script(_FAILED)(keys=keys, args=args, client=redis_conn)
+
+    def succeeded(self, pipe, email):
+        """
+        Clear the account's failures, on the given Redis pipeline (or client).
+        """
+        pipe.delete(_failures_key(normalize_email(email)))
+
+    async def acheck(self, email):
+        keys, args = self._check_args(email)
+        redis_conn = get_async_redis()
+        if self._verdict(await get_async_script(_CHECK)(keys=keys, args=args, client=redis_conn)):
+            return True
+        await self.afailed(email, hashed=False)
+        return False
+
+    async def afailed(self, email, hashed=True):
+        keys, args = self._failed_args(email, hashed)
+        redis_conn = get_async_redis()
+        await get_async_script(_FAILED)(keys=keys, args=args, client=redis_conn)
+
+
+login_guard = LoginGuard.from_settings()
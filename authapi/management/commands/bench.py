@@ -0,0 +1,148 @@
+"""
+Management command benchmarking the auth endpoints (see the bench package).
+"""
+
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bench import rendering, runner
+from bench.scenarios import SCENARIOS, cleanup, new_run_id
+
+
+class Command(BaseCommand):
+    help = "Benchmark the auth endpoints and write the results as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoints", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="Endpoints to run, in order.")
+        parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint sent first.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Client threads.")
+        parser.add_argument("--server", choices=("inprocess", "gunicorn", "uvicorn"), default="inprocess", help="Where requests are served.")
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes for a started gunicorn/uvicorn.")
+        parser.add_argument("--url", help="Benchmark an already running server instead of starting one.")
+        parser.add_argument("--output", default="bench-results.json", help="JSON results file.")
+        parser.add_argument("--keep-data", action="store_true", help="Don't delete the users created by the run.")
+        parser.add_argument(
+            "--render-iterations", type=int, default=20000,
+            help="Renders of the /me body timed for the CPU comparison (0 to skip).",
+        )
+
+    def handle(self, *args, **options):
+        if settings.SETTINGS_MODULE != "bench.settings":
+            self.stderr.write(self.style.WARNING(
+                "Throttle limits are not raised; run with --settings=bench.settings to avoid 429s."
+            ))
+        server = None
+        if options["url"]:
+            mode, driver = "http", runner.HTTPDriver(options["url"])
+        elif options["server"] == "inprocess":
+            mode, driver = "inprocess", runner.InProcessDriver()
+        else:
+            mode = options["server"]
+            server, url = self.start_server(mode, options["workers"], options["concurrency"])
+            driver = runner.HTTPDriver(url)
+
+        run_id = new_run_id()
+        results = {}
+        try:
+            for name in options["endpoints"]:
+                scenario = SCENARIOS[name](run_id)
+                requests = scenario.setup(options["warmup"] + options["requests"])
+                if options["warmup"]:
+                    runner.run(driver, requests[:options["warmup"]], options["concurrency"])
+                samples, elapsed = runner.run(driver, requests[options["warmup"]:], options["concurrency"])
+                results[name] = runner.summarize(samples, elapsed, driver.counts)
+                self.report(name, results[name])
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            if not options["keep_data"]:
+                cleanup(run_id)
+
+        document = {"meta": self.meta(mode, options), "endpoints": results}
+        if options["render_iterations"]:
+            document["rendering"] = rendering.compare(options["render_iterations"])
+            self.report_rendering(document["rendering"])
+        with open(options["output"], "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+        self.stdout.write(f"Results written to {options['output']}.")
+
+    def start_server(self, kind, workers, threads):
+        """
+        Start gunicorn or uvicorn on a free local port and wait until it accepts connections.
+        """
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        if kind == "gunicorn":
+            command = [
+                sys.executable, "-m", "gunicorn", "config.wsgi:application",
+                "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--threads", str(threads),
+            ]
+        else:
+            env["ASYNC_VIEWS"] = "True"
+            command = [
+                sys.executable, "-m", "uvicorn", "config.asgi:application",
+                "--port", str(port), "--workers", str(workers), "--no-access-log",
+            ]
+        process = subprocess.Popen(command, env=env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"{kind} exited with status {process.returncode}.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return process, f"http://127.0.0.1:{port}"
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"{kind} did not start listening on port {port}.")
+
+    def meta(self, mode, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "mode": mode,
+            "async_views": settings.ASYNC_VIEWS or mode == "uvicorn",
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "requests": options["requests"],
+            "warmup": options["warmup"],
+            "concurrency": options["concurrency"],
+            "workers": options["workers"] if mode in ("gunicorn", "uvicorn") else None,
+            "password_hashing_workers": settings.PASSWORD_HASHING["WORKERS"],
+        }
+
+    def report(self, name, result):
+        latency = result["latency_ms"]
+        line = (
+            f"{name:<16} {result['throughput_rps']:>9.1f} req/s  "
+            f"p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  p99 {latency['p99']:>8.2f}ms  "
+            f"errors {result['errors']}"
+        )
+        if result["sql_queries_per_request"] is not None:
+            line += f"  sql {result['sql_queries_per_request']:.2f}  redis {result['redis_round_trips_per_request']:.2f}"
+        self.stdout.write(line)
+
+    def report_rendering(self, result):
+        self.stdout.write(
+            f"/me body CPU: DRF {result['drf_cpu_us']:.2f}us, compiled {result['compiled_cpu_us']:.2f}us "
+            f"per request (saves {result['saved_cpu_us']:.2f}us, {result['speedup']:.1f}x)"
+        )
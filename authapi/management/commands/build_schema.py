@@ -0,0 +1,18 @@
+"""
+Management command generating the OpenAPI schema files served on /api/schema/.
+"""
+
+from django.core.management.base import BaseCommand
+
+from authapi.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once and write it (plain and gzipped) to OPENAPI_SCHEMA_DIR."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", help="Directory to write to instead of OPENAPI_SCHEMA_DIR.")
+
+    def handle(self, *args, **options):
+        for path in write_schema(options["output_dir"]):
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,15 @@
+"""
+collectstatic that also builds the OpenAPI schema, so deploys that already run
+collectstatic ship a prebuilt schema.
+"""
+
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+from django.core.management import call_command
+
+
+class Command(CollectStaticCommand):
+    def handle(self, **options):
+        result = super().handle(**options)
+        if not options["dry_run"]:
+            call_command("build_schema", verbosity=options["verbosity"])
+        return result
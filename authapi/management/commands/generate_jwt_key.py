@@ -0,0 +1,35 @@
+"""
+Management command generating a private key for JWT signing.
+The file is created readable by its owner only.
+"""
+
+import os
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.core.management.base import BaseCommand
+
+from authapi.jwt_keys import SigningKey
+
+
+class Command(BaseCommand):
+    help = "Generate a PEM private key for signing JWTs (add it first in JWT_SIGNING_KEY_FILES)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write the PEM private key to.")
+        parser.add_argument("--algorithm", choices=["RS256", "EdDSA"], default="RS256")
+
+    def handle(self, *args, **options):
+        if options["algorithm"] == "EdDSA":
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        else:
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        fd = os.open(options["path"], os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        self.stdout.write(f"Wrote {options['algorithm']} key {SigningKey(private_key).kid} to {options['path']}.")
@@ -0,0 +1,61 @@
+"""
+Management command running the write-behind login recorder.
+"""
+
+import logging
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from redis.exceptions import RedisError
+
+from authapi.activity import LoginRecorder
+
+logger = logging.getLogger(__name__)
+
+# Longest pause after consecutive failed batches, in seconds
+MAX_ERROR_BACKOFF = 30
+
+
+class Command(BaseCommand):
+    help = "Write queued logins to last_login and the login event table in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Logins per batch (one UPDATE and one INSERT each).")
+        parser.add_argument("--block", type=int, default=5000, help="Milliseconds to wait for new logins.")
+        parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}", help="Consumer name in the group.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue without blocking, then exit.")
+
+    def handle(self, *args, **options):
+        recorder = LoginRecorder(options["consumer"], batch_size=options["batch_size"], block_ms=options["block"])
+        recorder.ensure_group()
+        if not options["once"]:
+            self.running = True
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+            self.stdout.write(f"Login recorder {options['consumer']} started.")
+            errors = 0
+            while self.running:
+                try:
+                    recorder.process_batch()
+                except (DatabaseError, RedisError) as exc:
+                    # A connection blip shouldn't stop the recorder; the batch is claimed again later
+                    errors += 1
+                    delay = min(2 ** errors, MAX_ERROR_BACKOFF)
+                    logger.warning("Login batch failed, retrying in %ds: %s", delay, exc)
+                    close_old_connections()
+                    time.sleep(delay)
+                else:
+                    errors = 0
+        # Flush whatever is queued before exiting
+        recorded = 0
+        while handled := recorder.process_batch(block=False):
+            recorded += handled
+        self.stdout.write(f"Recorded {recorded} queued login(s).")
+
+    def stop(self, signum, frame):
+        # Finish the current batch, flush the queue, then exit
+        self.running = False
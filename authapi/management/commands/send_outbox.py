@@ -0,0 +1,71 @@
+"""
+Management command running the password reset email worker.
+"""
+
+import logging
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from redis.exceptions import RedisError
+
+from authapi.outbox import OutboxWorker
+
+logger = logging.getLogger(__name__)
+
+# Longest pause after consecutive failed batches, in seconds
+MAX_ERROR_BACKOFF = 30
+
+
+class Command(BaseCommand):
+    help = "Send queued password reset emails in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100, help="Messages per batch (one SMTP connection each).")
+        parser.add_argument("--block", type=int, default=5000, help="Milliseconds to wait for new messages.")
+        parser.add_argument("--max-attempts", type=int, default=5, help="Attempts before dead-lettering a message.")
+        parser.add_argument("--backoff", type=float, default=2.0, help="Base retry delay in seconds, doubled per attempt.")
+        parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}", help="Consumer name in the group.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue without blocking, then exit.")
+
+    def handle(self, *args, **options):
+        worker = OutboxWorker(
+            options["consumer"],
+            batch_size=options["batch_size"],
+            block_ms=options["block"],
+            max_attempts=options["max_attempts"],
+            backoff=options["backoff"],
+        )
+        worker.ensure_group()
+        if options["once"]:
+            sent = 0
+            while handled := worker.process_batch(block=False):
+                sent += handled
+            self.stdout.write(f"Processed {sent} queued message(s).")
+            return
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.stdout.write(f"Outbox worker {options['consumer']} started.")
+        errors = 0
+        while self.running:
+            try:
+                worker.process_batch()
+            except (DatabaseError, RedisError) as exc:
+                # A connection blip shouldn't stop the worker; the batch is claimed again later
+                errors += 1
+                delay = min(2 ** errors, MAX_ERROR_BACKOFF)
+                logger.warning("Outbox batch failed, retrying in %ds: %s", delay, exc)
+                close_old_connections()
+                time.sleep(delay)
+            else:
+                errors = 0
+        self.stdout.write("Outbox worker stopped.")
+
+    def stop(self, signum, frame):
+        # Finish the current batch, then exit
+        self.running = False
@@ -0,0 +1,186 @@
+"""
+Outbox for password reset emails.
+ForgotPasswordView only appends the requested email to a Redis stream, the same single
+command whether or not the account exists, and returns. The `send_outbox` management
+command consumes the stream in batches: it resolves the user, issues the reset token,
+sends the whole batch over one SMTP connection, retries failures with exponential
+backoff and moves messages that keep failing to a dead-letter stream.
+"""
+
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from redis.exceptions import ResponseError
+
+from config.redis_client import get_async_redis, get_redis
+
+from .reset_tokens import reset_tokens
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+STREAM = "outbox:password_reset"
+RETRY_QUEUE = "outbox:password_reset:retry"
+DEAD_LETTER_STREAM = "outbox:password_reset:dead"
+GROUP = "mailers"
+
+# Approximate cap on queued messages, so reset spam can't grow the stream without bound
+STREAM_MAX_LENGTH = 100_000
+
+# Move retries that are due from the retry queue back onto the stream
+_PROMOTE_RETRIES = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, payload in ipairs(due) do
+    redis.call('ZREM', KEYS[1], payload)
+    redis.call('XADD', KEYS[2], '*', 'payload', payload)
+end
+return #due
+"""
+
+
+def _payload(email, attempt=0):
+    return json.dumps({"email": email, "attempt": attempt}, separators=(",", ":"))
+
+
+def enqueue_password_reset(email):
+    """
+    Queue a password reset email. The account is not looked up here.
+    """
+    redis_conn = get_redis()
+    redis_conn.xadd(STREAM, {"payload": _payload(email)}, maxlen=STREAM_MAX_LENGTH, approximate=True)
+
+
+async def aenqueue_password_reset(email):
+    """
+    Async variant of enqueue_password_reset.
+    """
+    redis_conn = get_async_redis()
+    await redis_conn.xadd(STREAM, {"payload": _payload(email)}, maxlen=STREAM_MAX_LENGTH, approximate=True)
+
+
+def build_password_reset_message(user, token):
+    """
+    Build the reset email for a user and a raw reset token.
+    """
+    url = settings.PASSWORD_RESET_URL.format(token=token)
+    return EmailMessage(
+        subject="Reset your password",
+        body=(
+            f"Hi {user.full_name},\n\n"
+            f"Use the link below to reset your password:\n\n{url}\n\n"
+            "If you didn't request a password reset, you can ignore this email.\n"
+        ),
+        to=[user.email],
+    )
+
+
+class OutboxWorker:
+    """
+    Consumes the password reset stream as one member of the `mailers` consumer group.
+    """
+
+    def __init__(self, consumer, batch_size=100, block_ms=5000, max_attempts=5, backoff=2.0, claim_idle_ms=60000):
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.claim_idle_ms = claim_idle_ms
+        self.redis = get_redis()
+        self._promote = self.redis.register_script(_PROMOTE_RETRIES)
+
+    def ensure_group(self):
+        try:
+            self.redis.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def read_batch(self, block):
+        """
+        Return up to batch_size entries: first any left pending by a crashed worker,
+        then new ones.
+        """
+        _, entries, *_ = self.redis.xautoclaim(
+            STREAM, GROUP, self.consumer, self.claim_idle_ms, count=self.batch_size
+        )
+        if entries:
+            return entries
+        response = self.redis.xreadgroup(
+            GROUP, self.consumer, {STREAM: ">"}, count=self.batch_size, block=self.block_ms if block else None
+        )
+        return response[0][1] if response else []
+
+    def process_batch(self, block=True):
+        """
+        Send one batch of messages, waiting up to block_ms for new ones if `block`.
+        Returns the number of stream entries handled.
+        """
+        self._promote(keys=[RETRY_QUEUE, STREAM], args=[time.time(), self.batch_size])
+        try:
+            entries = self.read_batch(block)
+        except ResponseError as exc:
+            if "NOGROUP" not in str(exc):
+                raise
+            self.ensure_group()
+            return 0
+        if not entries:
+            return 0
+
+        jobs = []
+        for entry_id, fields in entries:
+            if not fields:
+                # Claimed entry that was deleted in the meantime
+                continue
+            job = json.loads(fields[b"payload"])
+            try:
+                user = User.objects.get_cached(email=job["email"])
+            except User.DoesNotExist:
+                user = None
+            if user is not None and user.is_active:
+                jobs.append((job, build_password_reset_message(user, reset_tokens.issue(user.pk))))
+
+        failed = []
+        if jobs:
+            # One SMTP connection for the whole batch
+            connection = get_connection()
+            try:
+                connection.open()
+                for job, message in jobs:
+                    message.connection = connection
+                    try:
+                        message.send()
+                    except Exception as exc:
+                        failed.append((job, exc))
+            except Exception as exc:
+                failed = [(job, exc) for job, _ in jobs]
+            finally:
+                connection.close()
+
+        pipe = self.redis.pipeline(transaction=False)
+        for job, exc in failed:
+            self.reschedule(pipe, job, exc)
+        pipe.xack(STREAM, GROUP, *[entry_id for entry_id, _ in entries])
+        pipe.xdel(STREAM, *[entry_id for entry_id, _ in entries])
+        pipe.execute()
+        return len(entries)
+
+    def reschedule(self, pipe, job, exc):
+        attempt = job["attempt"] + 1
+        if attempt >= self.max_attempts:
+            logger.error("Dead-lettering password reset email after %d attempts: %s", attempt, exc)
+            pipe.xadd(
+                DEAD_LETTER_STREAM,
+                {"payload": _payload(job["email"], attempt), "error": str(exc)},
+                maxlen=STREAM_MAX_LENGTH,
+                approximate=True,
+            )
+        else:
+            logger.warning("Retrying password reset email (attempt %d): %s", attempt, exc)
+            due = time.time() + self.backoff * 2 ** (attempt - 1)
+            pipe.zadd(RETRY_QUEUE, {_payload(job["email"], attempt): due})
@@ -0,0 +1,21 @@
+"""
+Permissions for service-to-service endpoints.
+"""
+
+import hmac
+
+from django.conf import settings
+from rest_framework import permissions
+
+
+class HasIntrospectionKey(permissions.BasePermission):
+    """
+    Allows requests carrying one of INTROSPECTION_KEYS in the X-Introspection-Key header.
+    """
+    header = "HTTP_X_INTROSPECTION_KEY"
+
+    def has_permission(self, request, view):
+        presented = request.META.get(self.header, "").encode()
+        # Compare against every key so the timing doesn't reveal which one matched
+        matches = [hmac.compare_digest(presented, key.encode()) for key in settings.INTROSPECTION_KEYS]
+        return bool(presented) and any(matches)
@@ -0,0 +1,57 @@
+"""
+JSON renderer built on orjson.
+Renders the same bytes as DRF's JSONRenderer with the default settings (UNICODE_JSON,
+COMPACT_JSON, STRICT_JSON), several times faster:
+- datetimes, dates and times, and types orjson doesn't know (lazy translations,
+  Decimal, querysets...) go through DRF's JSON encoder, so they get DRF's format
+  (milliseconds and "Z" for datetimes);
+- U+2028 and U+2029 are escaped, as DRF does for embedding in <script>;
+- NaN and infinities, which orjson would write as null, raise ValueError like DRF's
+  strict mode.
+Indented output and non-default JSON settings are rendered by JSONRenderer itself.
+"""
+
+import math
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def _has_non_finite(data):
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(value) for value in data)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same output with orjson.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if (
+            self.get_indent(accepted_media_type, renderer_context)
+            or self.ensure_ascii or not self.compact or not self.strict
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, or a type neither encoder knows: DRF's answer
+            return super().render(data, accepted_media_type, renderer_context)
+        # orjson writes non-finite floats as null; only then is the data worth a walk
+        if b"null" in ret and _has_non_finite(data):
+            raise ValueError("Out of range float values are not JSON compliant")
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
@@ -0,0 +1,95 @@
+"""
+Redis store for password reset tokens.
+Only a SHA-256 of each token is stored. Each user has an index key pointing at their
+live token, so issuing a new token revokes the previous one and the keyspace stays
+bounded by the number of users. Issuing and redeeming are single Lua script calls.
+"""
+
+import hashlib
+import secrets
+
+from django.conf import settings
+
+from config.redis_client import get_async_redis, get_async_script, get_redis, get_script
+
+
+TOKEN_KEY_PREFIX = "reset:"
+USER_INDEX_PREFIX = "reset:user:"
+
+# KEYS: token key, user index key. ARGV: user id, token hash, ttl, token key prefix.
+# Revokes the user's previous token and stores the new one.
+_ISSUE = """
+local previous = redis.call('GET', KEYS[2])
+if previous then redis.call('DEL', ARGV[4] .. previous) end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS: token key. ARGV: user index prefix, token hash.
+# Consumes the token and clears the user's index; returns the user id or nil.
+_REDEEM = """
+local user_id = redis.call('GET', KEYS[1])
+if not user_id then return nil end
+redis.call('DEL', KEYS[1])
+local index = ARGV[1] .. user_id
+if redis.call('GET', index) == ARGV[2] then redis.call('DEL', index) end
+return user_id
+"""
+
+
+def _hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class ResetTokenStore:
+    """
+    Issues and redeems reset tokens, with sync and async (redis.asyncio) variants.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def _issue_args(self, user_id):
+        token = secrets.token_urlsafe(32)
+        token_hash = _hash(token)
+        keys = [TOKEN_KEY_PREFIX + token_hash, f"{USER_INDEX_PREFIX}{user_id}"]
+        return token, keys, [user_id, token_hash, self.ttl, TOKEN_KEY_PREFIX]
+
+    def _redeem_args(self, token):
+        token_hash = _hash(token)
+        return [TOKEN_KEY_PREFIX + token_hash], [USER_INDEX_PREFIX, token_hash]
+
+    def issue(self, user_id):
+        """
+        Create a token for the user, revoking any earlier one. Returns the raw token.
+        """
+        token, keys, args = self._issue_args(user_id)
+        redis_conn = get_redis()
+        get_script(_ISSUE)(keys=keys, args=args, client=redis_conn)
+        return token
+
+    def redeem(self, token):
+        """
+        Consume a token. Returns the user id it was issued for, or None if the token is
+        unknown, expired or already used.
+        """
+        keys, args = self._redeem_args(token)
+        redis_conn = get_redis()
+        user_id = get_script(_REDEEM)(keys=keys, args=args, client=redis_conn)
+        return int(user_id) if user_id else None
+
+    async def aissue(self, user_id):
+        token, keys, args = self._issue_args(user_id)
+        redis_conn = get_async_redis()
+        await get_async_script(_ISSUE)(keys=keys, args=args, client=redis_conn)
+        return token
+
+    async def aredeem(self, token):
+        keys, args = self._redeem_args(token)
+        redis_conn = get_async_redis()
+        user_id = await get_async_script(_REDEEM)(keys=keys, args=args, client=redis_conn)
+        return int(user_id) if user_id else None
+
+
+reset_tokens = ResetTokenStore(ttl=settings.PASSWORD_RESET_TOKEN_TTL)
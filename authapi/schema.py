@@ -0,0 +1,144 @@
+"""
+Prebuilt OpenAPI schema.
+`manage.py build_schema` (also run by collectstatic) generates the schema once and
+writes it to OPENAPI_SCHEMA_DIR as YAML and JSON, each with a gzipped copy. The schema
+endpoint serves those files from memory with an ETag, so requests never introspect
+the views. The schema is only generated by build_schema (run when the Docker image is
+built), or on the first request if it hasn't been built, as in development.
+drf_spectacular itself is still loaded at startup (INSTALLED_APPS, DEFAULT_SCHEMA_CLASS
+and the views' extend_schema annotations); only its views module is not.
+"""
+
+import gzip
+import hashlib
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+CONTENT_TYPES = {
+    "yaml": "application/vnd.oai.openapi",
+    "json": "application/vnd.oai.openapi+json",
+}
+
+
+class SchemaDocument:
+    """
+    One format of the schema, plain and gzipped, with its ETag.
+    """
+
+    def __init__(self, body, gzipped=None):
+        self.body = body
+        self.gzipped = gzipped if gzipped is not None else gzip.compress(body, mtime=0)
+        self.etag = hashlib.sha256(body).hexdigest()
+
+
+def generate_schema():
+    """
+    Return the rendered schema by format. Imports drf_spectacular.
+    """
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        "yaml": OpenApiYamlRenderer().render(schema, renderer_context={}),
+        "json": OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def write_schema(directory=None):
+    """
+    Generate the schema and write schema.<format> and schema.<format>.gz files.
+    Returns the paths written.
+    """
+    directory = Path(directory or settings.OPENAPI_SCHEMA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt, body in generate_schema().items():
+        document = SchemaDocument(body)
+        for path, data in ((directory / f"schema.{fmt}", body), (directory / f"schema.{fmt}.gz", document.gzipped)):
+            tmp = path.with_name(f"{path.name}.tmp")
+            tmp.write_bytes(data)
+            # Atomic, so running workers never read a half-written file
+            tmp.replace(path)
+            paths.append(path)
+    get_schema_documents.cache_clear()
+    return paths
+
+
+@cache
+def get_schema_documents():
+    """
+    Return the schema documents by format, from the built files if they exist.
+    """
+    directory = Path(settings.OPENAPI_SCHEMA_DIR)
+    try:
+        return {
+            fmt: SchemaDocument((directory / f"schema.{fmt}").read_bytes(), (directory / f"schema.{fmt}.gz").read_bytes())
+            for fmt in CONTENT_TYPES
+        }
+    except FileNotFoundError:
+        return {fmt: SchemaDocument(body) for fmt, body in generate_schema().items()}
+
+
+def negotiate_format(request):
+    """
+    JSON for ?format=json or an Accept header asking for JSON, otherwise YAML like
+    drf_spectacular's own view.
+    """
+    fmt = request.GET.get("format")
+    if fmt in ("json", "openapi-json"):
+        return "json"
+    if fmt in ("yaml", "openapi"):
+        return "yaml"
+    accept = request.headers.get("Accept", "")
+    return "json" if "json" in accept and "yaml" not in accept else "yaml"
+
+
+def accepts_gzip(request):
+    """
+    Whether Accept-Encoding allows gzip: listed, or covered by "*", with a q-value
+    above zero.
+    """
+    qualities = {}
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def schema_etag(request):
+    etag = get_schema_documents()[negotiate_format(request)].etag
+    # Each encoding is a different representation
+    return f"{etag}-gzip" if accepts_gzip(request) else etag
+
+
+@cache
+def get_swagger_view():
+    from drf_spectacular.views import SpectacularSwaggerView
+    return SpectacularSwaggerView.as_view(url_name="schema")
+
+
+def swagger_view(request, *args, **kwargs):
+    """
+    Swagger UI, importing drf_spectacular's views on first use.
+    """
+    return get_swagger_view()(request, *args, **kwargs)
+
+
+@receiver(setting_changed)
+def reset_schema(setting, **kwargs):
+    if setting == "OPENAPI_SCHEMA_DIR":
+        get_schema_documents.cache_clear()
@@ -3,14 +3,49 @@ Serializers for authentication endpoints.
 These handle validation and transformation of input/output data for registration, login, password reset, and user info.
 """
 
+from django.conf import settings
+from django.core.validators import MaxLengthValidator
 from rest_framework import serializers
+from rest_framework.utils.formatting import lazy_format
+from rest_framework.validators import UniqueValidator
 from accounts.models import User
 
+class NormalizedEmailField(serializers.EmailField):
+    """
+    Email field returning the canonical form stored in User.email, so lookups and
+    uniqueness checks are exact matches on the email index.
+    """
+    def to_internal_value(self, data):
+        return User.objects.normalize_email(super().to_internal_value(data))
+
+class LimitedListField(serializers.ListField):
+    """
+    List field whose max_length is read from a setting when the serializer is built,
+    and checked before the items are validated, so an oversized list is rejected
+    without validating every item first.
+    """
+    def __init__(self, max_length_setting, **kwargs):
+        self.max_length_setting = max_length_setting
+        super().__init__(**kwargs)
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        self.max_length = getattr(settings, self.max_length_setting)
+        # As ListField(max_length=...) would, so the schema documents maxItems
+        message = lazy_format(self.error_messages["max_length"], max_length=self.max_length)
+        self.validators.append(MaxLengthValidator(self.max_length, message=message))
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and len(data) > self.max_length:
+            self.fail("max_length", max_length=self.max_length)
+        return super().to_internal_value(data)
+
 class RegisterSerializer(serializers.ModelSerializer):
     """
     Serializer for user registration.
     Validates and creates a new user with email, full name, and password.
     """
+    email = NormalizedEmailField(validators=[UniqueValidator(queryset=User.objects.all())])
     password = serializers.CharField(write_only=True, min_length=8)
 
     class Meta:
@@ -35,12 +70,36 @@ class RegisterSerializer(serializers.ModelSerializer):
         )
         return user
 
+class BulkRegisterItemSerializer(serializers.Serializer):
+    """
+    Serializer for one user in a bulk registration.
+    Validates like RegisterSerializer; email uniqueness is checked for the whole batch at once.
+    """
+    email = NormalizedEmailField()
+    full_name = serializers.CharField(max_length=255)
+    password = serializers.CharField(write_only=True, min_length=8)
+
+class BulkRegisterSerializer(serializers.Serializer):
+    """
+    Serializer for bulk registration.
+    Validates the list of users, up to BULK_REGISTER_MAX_USERS; items are validated one by one.
+    """
+    users = LimitedListField("BULK_REGISTER_MAX_USERS", child=serializers.DictField(), allow_empty=False)
+
+    class Meta:
+        # Example for OpenAPI/Swagger documentation
+        example = {
+            "users": [
+                {"email": "user@example.com", "full_name": "John Doe", "password": "strongpassword123"}
+            ]
+        }
+
 class LoginSerializer(serializers.Serializer):
     """
     Serializer for user login.
     Validates email and password input.
     """
-    email = serializers.EmailField()
+    email = NormalizedEmailField()
     password = serializers.CharField(write_only=True)
 
     class Meta:
@@ -55,7 +114,7 @@ class ForgotPasswordSerializer(serializers.Serializer):
     Serializer for forgot password endpoint.
     Validates the email input for password reset requests.
     """
-    email = serializers.EmailField()
+    email = NormalizedEmailField()
 
     class Meta:
         # Example for OpenAPI/Swagger documentation
@@ -78,10 +137,63 @@ class ResetPasswordSerializer(serializers.Serializer):
             "password": "newstrongpassword123"
         }
 
-class UserSerializer(serializers.ModelSerializer):
+class RefreshTokenSerializer(serializers.Serializer):
+    """
+    Serializer for the token refresh and logout endpoints.
+    Validates the refresh token input.
+    """
+    refresh = serializers.CharField()
+
+    class Meta:
+        # Example for OpenAPI/Swagger documentation
+        example = {
+            "refresh": "jwt-refresh-token"
+        }
+
+class IntrospectSerializer(serializers.Serializer):
+    """
+    Serializer for the batch token introspection endpoint.
+    Validates the list of access tokens, up to INTROSPECTION_MAX_TOKENS.
+    """
+    tokens = LimitedListField("INTROSPECTION_MAX_TOKENS", child=serializers.CharField(), allow_empty=False)
+
+    class Meta:
+        # Example for OpenAPI/Swagger documentation
+        example = {
+            "tokens": ["jwt-access-token", "another-jwt-access-token"]
+        }
+
+class CompiledSerializerMixin:
+    """
+    Adds `serialize(instance)`, returning the same data as `Serializer(instance).data`
+    from field accessors built once per class. Skips instantiating the serializer and
+    building its fields for every object, which dominates the cost of small payloads.
+    Only for flat, read-only output (no nested serializers or context-dependent fields).
+    """
+
+    @classmethod
+    def compiled_fields(cls):
+        if "_compiled_fields" not in cls.__dict__:
+            cls._compiled_fields = [
+                (field.field_name, field.source_attrs, field.to_representation)
+                for field in cls().fields.values() if not field.write_only
+            ]
+        return cls._compiled_fields
+
+    @classmethod
+    def serialize(cls, instance):
+        data = {}
+        for name, source_attrs, to_representation in cls.compiled_fields():
+            value = instance
+            for attr in source_attrs:
+                value = getattr(value, attr)
+            data[name] = None if value is None else to_representation(value)
+        return data
+
+class UserSerializer(CompiledSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for returning user details.
-    Used for authenticated user info endpoints.
+    Used for authenticated user info endpoints; use UserSerializer.serialize(user) on hot paths.
     """
     class Meta:
         model = User
@@ -0,0 +1,32 @@
+"""
+Signal receivers keeping token state in sync with the User model.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .tokens import bump_user_version, retire_user_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def invalidate_tokens(sender, instance, created, **kwargs):
+    """
+    Bump the user's token version when the password changes or the account is
+    deactivated, so previously issued tokens stop authenticating.
+    """
+    if created:
+        return
+    # set_password() keeps the raw password on the instance until save() completes
+    if instance._password is not None or not instance.is_active:
+        bump_user_version(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def retire_tokens(sender, instance, **kwargs):
+    """
+    Stop a deleted user's access and refresh tokens from authenticating.
+    """
+    retire_user_version(instance.pk)
@@ -0,0 +1,17 @@
+"""
+URLconf routing the auth endpoints to the async views, used by the async view tests.
+"""
+
+from django.urls import path
+
+from authapi import async_views, views
+
+urlpatterns = [
+    path("api/auth/register", async_views.RegisterView.as_view(), name='register'),
+    path("api/auth/login", async_views.LoginView.as_view(), name='login'),
+    path("api/auth/me", async_views.MeView.as_view(), name='me'),
+    path("api/auth/forgot-password", async_views.ForgotPasswordView.as_view(), name='forgot-password'),
+    path("api/auth/reset-password", async_views.ResetPasswordView.as_view(), name='reset-password'),
+    path("api/auth/token/refresh", views.TokenRefreshView.as_view(), name='token-refresh'),
+    path("api/auth/logout", views.LogoutView.as_view(), name='logout'),
+]
@@ -0,0 +1,108 @@
+import signal
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+import redis
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import LoginEvent, User
+from authapi.activity import LoginRecorder
+
+
+class LoginRecordingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        # Written through to the user cache on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def login(self):
+        return self.client.post(
+            reverse("login"), {"email": "test@example.com", "password": "testpass123"}, HTTP_USER_AGENT="tests/1.0"
+        )
+
+    def test_login_does_not_write(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+    def test_recorder_coalesces_logins(self):
+        self.login()
+        self.login()
+        recorder = LoginRecorder("test")
+        recorder.ensure_group()
+        # Existing users, one UPDATE and one INSERT, in a savepoint
+        with self.assertNumQueries(5):
+            self.assertEqual(recorder.process_batch(block=False), 2)
+
+        events = list(LoginEvent.objects.filter(user=self.user).order_by("created_at"))
+        self.assertEqual(len(events), 2)
+        self.assertEqual((events[0].ip_address, events[0].user_agent), ("127.0.0.1", "tests/1.0"))
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, events[1].created_at)
+
+    def test_shutdown_flushes_queue(self):
+        self.login()
+        call_command("record_logins", once=True, stdout=StringIO())
+        self.assertEqual(LoginEvent.objects.count(), 1)
+
+
+class RecordLoginsCommandTests(TestCase):
+    def setUp(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    @mock.patch("authapi.management.commands.record_logins.time.sleep")
+    def test_recorder_survives_transient_errors(self, sleep):
+        errors = iter([redis.ConnectionError("down"), DatabaseError("gone")])
+
+        def batches(block=True):
+            for exc in errors:
+                raise exc
+            if block:
+                # Then stop, as on SIGTERM
+                signal.raise_signal(signal.SIGTERM)
+            return 0
+
+        with mock.patch.object(LoginRecorder, "process_batch", side_effect=batches) as process_batch, \
+                self.assertLogs("authapi.management.commands.record_logins", "WARNING"):
+            call_command("record_logins", stdout=StringIO())
+        # Three blocking reads, then the final flush
+        self.assertEqual(process_batch.call_count, 4)
+        self.assertEqual([call.args for call in sleep.call_args_list], [(2,), (4,)])
+
+
+class LoginRecorderWriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+        self.recorder = LoginRecorder("test")
+
+    def login(self, at, user_id=None):
+        return {"user": user_id or self.user.pk, "at": at.timestamp(), "ip": None, "ua": ""}
+
+    def test_last_login_never_moves_back(self):
+        newer, older = datetime(2026, 2, 1, tzinfo=timezone.utc), datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.recorder.write([self.login(newer)])
+        self.recorder.write([self.login(older)])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, newer)
+        self.assertEqual(LoginEvent.objects.count(), 2)
+
+    def test_cached_user_refreshed(self):
+        at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.recorder.write([self.login(at)])
+        with self.assertNumQueries(0):
+            self.assertEqual(User.objects.get_cached(pk=self.user.pk).last_login, at)
+
+    def test_deleted_users_are_skipped(self):
+        self.recorder.write([self.login(datetime(2026, 1, 1, tzinfo=timezone.utc), user_id=self.user.pk + 100)])
+        self.assertEqual(LoginEvent.objects.count(), 0)
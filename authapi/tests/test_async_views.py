@@ -0,0 +1,10 @@
+from django.test import override_settings
+
+from authapi.tests import test_auth_flow
+
+
+@override_settings(ROOT_URLCONF="authapi.tests.async_urls")
+class AsyncAuthFlowTests(test_auth_flow.AuthFlowTests):
+    """
+    Runs the auth flow against the async views.
+    """
@@ -1,10 +1,21 @@
+import re
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework.test import APITestCase
+from accounts import hashing
 from accounts.models import User
+from authapi.reset_tokens import reset_tokens
 from rest_framework import status
 
 class AuthFlowTests(APITestCase):
     def setUp(self):
+        # Throttle history lives in Redis and would otherwise leak between tests
+        cache.clear()
         self.user = User.objects.create_user(
             email="test@example.com", full_name="Test User", password="testpass123"
         )
@@ -33,20 +44,34 @@ class AuthFlowTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["email"], "test@example.com")
 
+    def send_outbox(self):
+        call_command("send_outbox", once=True, stdout=StringIO())
+
     def test_forgot_password(self):
         url = reverse("forgot-password")
         data = {"email": "test@example.com"}
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("detail", response.data)
-        self.assertIn("reset_token", response.data)
+        self.assertNotIn("reset_token", response.data)
+        self.send_outbox()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["test@example.com"])
+
+    def test_forgot_password_unknown_email(self):
+        url = reverse("forgot-password")
+        response = self.client.post(url, {"email": "unknown@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.send_outbox()
+        self.assertEqual(len(mail.outbox), 0)
 
     def test_reset_password(self):
-        # Get reset token
+        # Get reset token from the reset email
         url = reverse("forgot-password")
         data = {"email": "test@example.com"}
-        response = self.client.post(url, data)
-        token = response.data.get("reset_token")
+        self.client.post(url, data)
+        self.send_outbox()
+        token = re.search(r"token=(\S+)", mail.outbox[-1].body).group(1)
         # Reset password
         url = reverse("reset-password")
         data = {"token": token, "password": "resetpass123"}
@@ -58,3 +83,22 @@ class AuthFlowTests(APITestCase):
         data = {"email": "test@example.com", "password": "resetpass123"}
         response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_reset_token_survives_busy_hashing_pool(self):
+        data = {"token": reset_tokens.issue(self.user.pk), "password": "resetpass123"}
+        saturated = hashing.HashingExecutor(workers=1, max_pending=0, retry_after=1)
+        with mock.patch.object(hashing, "_executor", saturated):
+            response = self.client.post(reverse("reset-password"), data)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        # The retry can still use the token
+        self.assertEqual(self.client.post(reverse("reset-password"), data).status_code, status.HTTP_200_OK)
+
+    def test_reset_password_keeps_concurrent_changes(self):
+        User.objects.get_cached(pk=self.user.pk)
+        # Deactivated behind the cache's back, so the cached copy is stale
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        data = {"token": reset_tokens.issue(self.user.pk), "password": "resetpass123"}
+        self.assertEqual(self.client.post(reverse("reset-password"), data).status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(self.user.check_password("resetpass123"))
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+
+
+@override_settings(BULK_REGISTER_MAX_USERS=10)
+class BulkRegisterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            email="admin@example.com", full_name="Admin User", password="testpass123", is_staff=True
+        )
+        response = self.client.post(reverse("login"), {"email": "admin@example.com", "password": "testpass123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def register(self, users):
+        return self.client.post(reverse("register-bulk"), {"users": users}, format="json")
+
+    def test_per_item_results(self):
+        response = self.register([
+            {"email": "one@example.com", "full_name": "User One", "password": "strongpass123"},
+            {"email": "two@example.com", "full_name": "User Two", "password": "short"},
+            {"email": "one@EXAMPLE.com", "full_name": "Duplicate", "password": "strongpass123"},
+            {"email": "admin@example.com", "full_name": "Existing", "password": "strongpass123"},
+            {"email": "three@example.com", "full_name": "User Three", "password": "strongpass123"},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 3))
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["created", "error", "error", "error", "created"])
+        self.assertIn("password", results[1]["errors"])
+        self.assertEqual(results[2]["errors"]["email"], ["Duplicate email in this batch."])
+        self.assertEqual(results[4]["user"]["email"], "three@example.com")
+        self.assertTrue(User.objects.get(email="one@example.com").check_password("strongpass123"))
+
+    def test_max_users(self):
+        users = [{"email": f"user{i}@example.com", "full_name": "User", "password": "strongpass123"} for i in range(11)]
+        with mock.patch.object(serializers.DictField, "run_validation") as run_validation:
+            response = self.register(users)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["users"], ["Ensure this field has no more than 10 elements."])
+        # Rejected before validating any item
+        run_validation.assert_not_called()
+
+    @mock.patch.object(User.objects, "bulk_create", side_effect=IntegrityError)
+    def test_repeated_race_fails_items(self, bulk_create):
+        response = self.register([
+            {"email": "one@example.com", "full_name": "User One", "password": "strongpass123"},
+            {"email": "two@example.com", "full_name": "User Two", "password": "short"},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(bulk_create.call_count, 2)
+        results = response.data["results"]
+        self.assertEqual([result["status"] for result in results], ["error", "error"])
+        self.assertIn("non_field_errors", results[0]["errors"])
+        self.assertFalse(User.objects.filter(email="one@example.com").exists())
+
+    def test_requires_staff(self):
+        User.objects.filter(pk=self.admin.pk).update(is_staff=False)
+        cache.clear()
+        response = self.register([{"email": "one@example.com", "full_name": "User One", "password": "strongpass123"}])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
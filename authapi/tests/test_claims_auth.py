@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+
+
+class ClaimsAuthTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", full_name="Test User", password="testpass123"
+        )
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_me_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("me"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"id": self.user.pk, "email": "test@example.com", "full_name": "Test User"})
+
+    def test_password_change_invalidates_token(self):
+        self.user.set_password("changedpass123")
+        self.user.save()
+        response = self.client.get(reverse("me"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_invalidates_token(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("me"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
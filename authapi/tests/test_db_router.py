@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from authapi.authentication import ClaimsJWTAuthentication
+from config import db_router
+from config.db_router import PrimaryReplicaRouter, ReplicaHealth, ReplicaRoutingMiddleware, sticky_email_key, sticky_user_key
+
+
+def in_request(func):
+    """
+    Run func as a request would under ReplicaRoutingMiddleware and return its result.
+    """
+    return ReplicaRoutingMiddleware(lambda request: func())(None)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+@mock.patch.object(db_router.replica_health, "healthy", return_value=["replica_1"])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    router = PrimaryReplicaRouter()
+
+    def test_request_reads_use_replica(self, healthy):
+        self.assertEqual(in_request(lambda: self.router.db_for_read(User)), "replica_1")
+
+    def test_reads_after_write_use_primary(self, healthy):
+        def read_after_write():
+            self.assertEqual(self.router.db_for_write(User), "default")
+            return self.router.db_for_read(User)
+        self.assertEqual(in_request(read_after_write), "default")
+
+    def test_reads_outside_requests_use_primary(self, healthy):
+        self.assertEqual(self.router.db_for_read(User), "default")
+
+    def test_reads_in_transaction_use_primary(self, healthy):
+        with mock.patch.object(connection, "in_atomic_block", True):
+            self.assertEqual(in_request(lambda: self.router.db_for_read(User)), "default")
+
+    def test_no_healthy_replica(self, healthy):
+        healthy.return_value = []
+        self.assertEqual(in_request(lambda: self.router.db_for_read(User)), "default")
+
+    def test_migrations_only_on_primary(self, healthy):
+        self.assertTrue(self.router.allow_migrate("default", "accounts"))
+        self.assertFalse(self.router.allow_migrate("replica_1", "accounts"))
+
+
+class ReplicaHealthTests(TestCase):
+    @override_settings(DATABASE_REPLICAS=["default"])
+    def test_check(self):
+        health = ReplicaHealth()
+        self.assertEqual(health.healthy(), ["default"])
+        with mock.patch.object(connection, "cursor", side_effect=OperationalError), mock.patch.object(connection, "close"):
+            with self.assertLogs("config.db_router", "WARNING"):
+                self.assertFalse(health.check("default"))
+        # Cached until the next check interval
+        self.assertEqual(health.healthy(), ["default"])
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+@mock.patch.object(db_router.replica_health, "healthy", return_value=[])
+class StickinessTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_register_sticks_to_primary(self, healthy):
+        response = self.client.post(
+            reverse("register"), {"email": "new@example.com", "full_name": "New User", "password": "strongpass123"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        redis_conn = get_redis_connection("default")
+        self.assertTrue(redis_conn.exists(sticky_user_key(response.data["id"])))
+        self.assertTrue(redis_conn.exists(sticky_email_key("New@Example.com")))
+
+    def test_auth_check_pins_sticky_user(self, healthy):
+        user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+        token = AccessToken.for_user(user)
+
+        def pinned():
+            ClaimsJWTAuthentication().check_revocation(token)
+            return db_router._state.get().pinned
+
+        self.assertTrue(in_request(pinned))
+        get_redis_connection("default").delete(sticky_user_key(user.pk))
+        self.assertFalse(in_request(pinned))
@@ -0,0 +1,69 @@
+import hashlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from django_redis import get_redis_connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from authapi.idempotency import idempotency
+from authapi.reset_tokens import reset_tokens
+
+
+class IdempotencyTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.data = {"email": "new@example.com", "full_name": "New User", "password": "newpass123"}
+
+    def register(self, data=None, key="key-1"):
+        return self.client.post(reverse("register"), data or self.data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_response(self):
+        first = self.register()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            retry = self.register()
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(User.objects.filter(email="new@example.com").count(), 1)
+
+    def test_key_reused_with_different_body(self):
+        self.register()
+        response = self.register({**self.data, "email": "other@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertFalse(User.objects.filter(email="other@example.com").exists())
+
+    def test_without_key(self):
+        self.client.post(reverse("register"), self.data, format="json")
+        response = self.client.post(reverse("register"), self.data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @mock.patch.object(idempotency, "wait_seconds", 0)
+    def test_duplicate_of_request_in_flight(self):
+        record_key = idempotency.record_key(reverse("register"), "key-1")
+        fingerprint = idempotency.fingerprint(JSONRenderer().render(self.data))
+        idempotency.begin(record_key, fingerprint, "other-request")
+        response = self.register()
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+
+    def test_reset_password_retry(self):
+        user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+        data = {"token": reset_tokens.issue(user.pk), "password": "resetpass123"}
+        url = reverse("reset-password")
+        self.assertEqual(self.client.post(url, data, format="json", HTTP_IDEMPOTENCY_KEY="reset-1").status_code, 200)
+        # The token is spent, but the retry gets the original answer
+        retry = self.client.post(url, data, format="json", HTTP_IDEMPOTENCY_KEY="reset-1")
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.json(), {"detail": "Password has been reset successfully."})
+
+    def test_password_not_recoverable_from_record(self):
+        self.register()
+        record_key = idempotency.record_key(reverse("register"), "key-1")
+        stored = get_redis_connection("default").hget(record_key, "fingerprint").decode()
+        self.assertNotEqual(stored, hashlib.sha256(JSONRenderer().render(self.data)).hexdigest())
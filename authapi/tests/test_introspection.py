@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+
+
+@override_settings(INTROSPECTION_KEYS=["gateway-key"], INTROSPECTION_MAX_TOKENS=3)
+class IntrospectionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", full_name="Test User", password="testpass123"
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", full_name="Other User", password="testpass123"
+        )
+        self.access = self.login("test@example.com")
+        self.other_access = self.login("other@example.com")
+
+    def login(self, email):
+        response = self.client.post(reverse("login"), {"email": email, "password": "testpass123"})
+        return response.data["access"]
+
+    def introspect(self, tokens, key="gateway-key"):
+        return self.client.post(
+            reverse("introspect"), {"tokens": tokens}, format="json", HTTP_X_INTROSPECTION_KEY=key
+        )
+
+    def test_batch(self):
+        cache.clear()
+        # One cache-miss query for both users
+        with self.assertNumQueries(1):
+            response = self.introspect([self.access, "not-a-token", self.other_access])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        active, invalid, other = response.data["results"]
+        self.assertEqual(active["sub"], str(self.user.pk))
+        self.assertEqual(active["user"], {"id": self.user.pk, "email": "test@example.com", "full_name": "Test User"})
+        self.assertEqual(invalid, {"active": False})
+        self.assertEqual(other["user"]["email"], "other@example.com")
+
+    def test_revoked_tokens_are_inactive(self):
+        self.user.set_password("changedpass123")
+        self.user.save()
+        results = self.introspect([self.access, self.other_access]).data["results"]
+        self.assertEqual([result["active"] for result in results], [False, True])
+
+    def test_requires_key(self):
+        self.assertEqual(self.introspect([self.access], key="wrong").status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_max_tokens(self):
+        with mock.patch.object(serializers.CharField, "run_validation") as run_validation:
+            response = self.introspect([self.access] * 4)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tokens"], ["Ensure this field has no more than 3 elements."])
+        # Rejected before validating any token
+        run_validation.assert_not_called()
@@ -0,0 +1,86 @@
+import os
+import stat
+import tempfile
+from io import StringIO
+from urllib.error import URLError
+
+import jwt
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from authapi.verifier import JWKSFetchError, JWKSVerifier
+
+
+class AsymmetricSigningTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def generate_key(self, name, algorithm):
+        path = os.path.join(self.tmp.name, name)
+        call_command("generate_jwt_key", path, algorithm=algorithm, stdout=StringIO())
+        return path
+
+    def login(self):
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        return response.data["access"]
+
+    def test_sign_and_verify_with_rotation(self):
+        old_key = self.generate_key("old.pem", "RS256")
+        with override_settings(JWT_SIGNING_KEY_FILES=[old_key]):
+            old_token = self.login()
+        self.assertEqual(jwt.get_unverified_header(old_token)["alg"], "RS256")
+
+        new_key = self.generate_key("new.pem", "EdDSA")
+        with override_settings(JWT_SIGNING_KEY_FILES=[new_key, old_key]):
+            new_token = self.login()
+            self.assertEqual(jwt.get_unverified_header(new_token)["alg"], "EdDSA")
+            for token in (old_token, new_token):
+                self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                self.assertEqual(self.client.get(reverse("me")).status_code, status.HTTP_200_OK)
+
+            response = self.client.get(reverse("jwks"))
+            self.assertEqual(len(response.json()["keys"]), 2)
+            self.assertIn("max-age", response["Cache-Control"])
+            revalidated = self.client.get(reverse("jwks"), HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+            fetches = []
+            verifier = JWKSVerifier("unused", fetch=lambda: fetches.append(1) or response.json())
+            self.assertEqual(verifier.verify(old_token)["email"], "test@example.com")
+            self.assertEqual(verifier.verify(new_token)["email"], "test@example.com")
+            self.assertEqual(len(fetches), 1)
+
+    def test_key_file_private(self):
+        path = self.generate_key("key.pem", "EdDSA")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def test_verifier_keeps_stale_keys_when_fetch_fails(self):
+        with override_settings(JWT_SIGNING_KEY_FILES=[self.generate_key("key.pem", "EdDSA")]):
+            token = self.login()
+            jwks = self.client.get(reverse("jwks")).json()
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            if len(fetches) > 1:
+                raise URLError("down")
+            return jwks
+
+        verifier = JWKSVerifier("unused", max_age=0, min_refetch_interval=0, fetch=fetch)
+        self.assertEqual(verifier.verify(token)["email"], "test@example.com")
+        with self.assertLogs("authapi.verifier", "WARNING"):
+            self.assertEqual(verifier.verify(token)["email"], "test@example.com")
+        # The next attempt waits for the interval
+        verifier.min_refetch_interval = 60
+        verifier.verify(token)
+        self.assertEqual(len(fetches), 2)
+        with self.assertRaises(JWKSFetchError), self.assertLogs("authapi.verifier", "WARNING"):
+            JWKSVerifier("unused", fetch=fetch).verify(token)
@@ -0,0 +1,81 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.bulk import insert_batch
+from accounts.models import User
+from authapi.login_guard import login_guard
+
+
+class LoginGuardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+        self.attempts = 0
+
+    def login(self, email="test@example.com", password="testpass123"):
+        # A new client IP per attempt, so the per-IP login throttle stays out of the way
+        self.attempts += 1
+        return self.client.post(
+            reverse("login"), {"email": email, "password": password}, REMOTE_ADDR=f"10.0.2.{self.attempts}"
+        )
+
+    def build_filter(self):
+        call_command("rebuild_email_filter", stdout=StringIO())
+
+    def test_unknown_email_rejected_without_queries(self):
+        self.build_filter()
+        with self.assertNumQueries(0):
+            response = self.login("nobody@example.com")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {"detail": "Invalid credentials."})
+        self.assertEqual(self.login("Test@Example.com").status_code, status.HTTP_200_OK)
+
+    def test_new_users_join_filter(self):
+        self.build_filter()
+        User.objects.create_user(email="new@example.com", full_name="New User", password="testpass123")
+        insert_batch([{
+            "email": "imported@example.com", "full_name": "Imported", "password": self.user.password,
+            "is_active": True, "is_staff": False, "is_superuser": False, "date_joined": self.user.date_joined,
+        }])
+        self.assertEqual(self.login("new@example.com").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login("imported@example.com").status_code, status.HTTP_200_OK)
+
+    def test_lockout_after_failures(self):
+        for _ in range(login_guard.lockout_threshold):
+            self.assertEqual(self.login(password="wrongpass123").status_code, status.HTTP_401_UNAUTHORIZED)
+        # Locked even with the right password
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(int(response["Retry-After"]), login_guard.lockout_base_seconds)
+
+    def test_unknown_email_locks_like_an_account(self):
+        self.build_filter()
+        for _ in range(login_guard.lockout_threshold):
+            self.assertEqual(self.login("nobody@example.com").status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login("nobody@example.com")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(int(response["Retry-After"]), login_guard.lockout_base_seconds)
+
+    def test_success_clears_failures(self):
+        for _ in range(login_guard.lockout_threshold - 1):
+            self.login(password="wrongpass123")
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login(password="wrongpass123").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    @mock.patch.object(login_guard, "hash_failure_budget", 2)
+    def test_breaker_sheds_failing_accounts(self):
+        User.objects.create_user(email="other@example.com", full_name="Other User", password="testpass123")
+        for _ in range(3):
+            self.login(password="wrongpass123")
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("Retry-After", response)
+        # Accounts without failures still log in
+        self.assertEqual(self.login("other@example.com").status_code, status.HTTP_200_OK)
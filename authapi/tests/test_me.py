@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from authapi.renderers import ORJSONRenderer
+from authapi.serializers import UserSerializer
+
+
+class MeConditionalTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    def test_validators(self):
+        response = self.client.get(reverse("me"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"0-'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("Authorization", response["Vary"])
+
+    def test_not_modified(self):
+        etag = self.client.get(reverse("me"))["ETag"]
+        response = self.client.get(reverse("me"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_not_modified_since(self):
+        last_modified = self.client.get(reverse("me"))["Last-Modified"]
+        response = self.client.get(reverse("me"), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_stale_etag(self):
+        response = self.client.get(reverse("me"), HTTP_IF_NONE_MATCH='"0-0000000000000000"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"id": self.user.pk, "email": "test@example.com", "full_name": "Test User"})
+
+
+class FastRenderingTests(APITestCase):
+    def test_compiled_serializer_matches_drf(self):
+        user = User(id=7, email="test@example.com", full_name="Tëst User")
+        self.assertEqual(UserSerializer.serialize(user), UserSerializer(user).data)
+        self.assertEqual(
+            ORJSONRenderer().render(UserSerializer.serialize(user)), JSONRenderer().render(UserSerializer(user).data)
+        )
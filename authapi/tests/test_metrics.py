@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def login(self, password="testpass123"):
+        return self.client.post(reverse("login"), {"email": "test@example.com", "password": password})
+
+    def test_login_is_instrumented(self):
+        labels = {"view": "login", "method": "POST", "status": "200"}
+        before = {
+            name: sample(name, **labels)
+            for name in (
+                "auth_request_duration_seconds_count", "auth_redis_commands_total",
+                "auth_password_hash_duration_seconds_count",
+            )
+        }
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.assertEqual(sample("auth_request_duration_seconds_count", **labels), before["auth_request_duration_seconds_count"] + 1)
+        self.assertGreater(sample("auth_redis_commands_total", **labels), before["auth_redis_commands_total"])
+        self.assertEqual(
+            sample("auth_password_hash_duration_seconds_count", **labels),
+            before["auth_password_hash_duration_seconds_count"] + 1,
+        )
+
+    def test_throttle_rejections(self):
+        before = sample("auth_throttled_requests_total", view="login")
+        responses = [self.login("wrongpass").status_code for _ in range(6)]
+        self.assertEqual(responses[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(sample("auth_throttled_requests_total", view="login"), before + 1)
+
+    @override_settings(METRICS_TOKENS=["scrape-token"])
+    def test_metrics_endpoint(self):
+        self.login()
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong-token")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'auth_request_duration_seconds_bucket{le="0.005",method="POST",status="200",view="login"}', response.content)
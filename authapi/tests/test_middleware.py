@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+
+
+class StatelessMiddlewareTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def test_api_skips_browser_middleware(self):
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Frame-Options", response.headers)
+        self.assertNotIn("sessionid", response.cookies)
+        self.assertFalse(hasattr(response.wsgi_request, "session"))
+        # Security headers still apply
+        self.assertEqual(response.headers["X-Content-Type-Options"], "nosniff")
+
+    def test_api_checks_allowed_hosts(self):
+        response = self.client.get(reverse("me"), HTTP_HOST="evil.example.com")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_keeps_full_stack(self):
+        response = self.client.get(reverse("admin:login"))
+        self.assertEqual(response.headers["X-Frame-Options"], "DENY")
+        self.assertIn("csrftoken", response.cookies)
+
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(reverse("admin:login"), {"username": "test@example.com", "password": "testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,66 @@
+import signal
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+
+import redis
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase
+from django_redis import get_redis_connection
+
+from accounts.models import User
+from authapi import outbox
+
+
+class OutboxWorkerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    def test_batch_shares_one_connection(self):
+        for _ in range(3):
+            outbox.enqueue_password_reset("test@example.com")
+        worker = outbox.OutboxWorker("test")
+        worker.ensure_group()
+        with mock.patch.object(outbox, "get_connection", wraps=outbox.get_connection) as get_connection:
+            self.assertEqual(worker.process_batch(block=False), 3)
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_failures_are_retried_then_dead_lettered(self):
+        outbox.enqueue_password_reset("test@example.com")
+        worker = outbox.OutboxWorker("test", max_attempts=2, backoff=0)
+        worker.ensure_group()
+        redis_conn = get_redis_connection("default")
+        with mock.patch("django.core.mail.EmailMessage.send", side_effect=SMTPException("down")):
+            worker.process_batch(block=False)
+            self.assertEqual(redis_conn.zcard(outbox.RETRY_QUEUE), 1)
+            worker.process_batch(block=False)
+        self.assertEqual(redis_conn.zcard(outbox.RETRY_QUEUE), 0)
+        self.assertEqual(redis_conn.xlen(outbox.DEAD_LETTER_STREAM), 1)
+
+
+class SendOutboxCommandTests(TestCase):
+    def setUp(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+
+    @mock.patch("authapi.management.commands.send_outbox.time.sleep")
+    def test_worker_survives_transient_errors(self, sleep):
+        errors = iter([redis.ConnectionError("down"), DatabaseError("gone")])
+
+        def batches(block=True):
+            for exc in errors:
+                raise exc
+            # Then stop, as on SIGTERM
+            signal.raise_signal(signal.SIGTERM)
+            return 0
+
+        with mock.patch.object(outbox.OutboxWorker, "process_batch", side_effect=batches) as process_batch, \
+                self.assertLogs("authapi.management.commands.send_outbox", "WARNING"):
+            call_command("send_outbox", stdout=StringIO())
+        self.assertEqual(process_batch.call_count, 3)
+        self.assertEqual([call.args for call in sleep.call_args_list], [(2,), (4,)])
@@ -0,0 +1,63 @@
+from unittest import mock
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.cache import get_user_cache
+from accounts.models import User
+from authapi.login_guard import login_guard
+from config.redis_client import BlockingConnectionPool, deferred_writes, get_redis, pool_usage
+
+
+class RedisClientTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_shared_pool_from_settings(self):
+        pool = get_redis().connection_pool
+        self.assertIs(get_redis(), get_redis_connection("default"))
+        self.assertIsInstance(pool, BlockingConnectionPool)
+        self.assertEqual(pool.max_connections, settings.REDIS["MAX_CONNECTIONS"])
+        self.assertEqual(pool.connection_kwargs["socket_timeout"], settings.REDIS["SOCKET_TIMEOUT"])
+        in_use, idle = pool_usage()["sync"]
+        self.assertEqual(in_use, 0)
+
+    def test_deferred_writes(self):
+        redis_conn = get_redis_connection("default")
+        with deferred_writes(), self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+            key = get_user_cache()._pk_key(user.pk)
+            self.assertFalse(redis_conn.exists(key))
+        self.assertTrue(redis_conn.exists(key))
+
+    def test_deferred_writes_dropped_on_error(self):
+        redis_conn = get_redis_connection("default")
+        with self.assertRaises(ValueError), deferred_writes() as pipe:
+            pipe.set("deferred", 1)
+            raise ValueError
+        self.assertFalse(redis_conn.exists("deferred"))
+
+
+class RedisUnavailableTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(email="test@example.com", full_name="Test User", password="testpass123")
+
+    @mock.patch.object(login_guard, "acheck", side_effect=redis.TimeoutError)
+    @mock.patch.object(login_guard, "check", side_effect=redis.TimeoutError)
+    def test_outage_is_503(self, check, acheck):
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_pool_gauges(self):
+        self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        labels = {"client": "sync", "state": "idle"}
+        self.assertGreaterEqual(REGISTRY.get_sample_value("auth_redis_pool_connections", labels), 1)
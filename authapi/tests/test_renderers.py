@@ -0,0 +1,49 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from authapi.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def assertRendersLikeDRF(self, data, media_type=None):
+        self.assertEqual(ORJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    def test_matches_json_renderer(self):
+        self.assertRendersLikeDRF({
+            "id": 7,
+            "name": "Tëst ✓",
+            "ratio": 0.1,
+            "tags": ["a", None, True],
+            "nested": {1: "integer key"},
+            "uuid": uuid.UUID(int=1),
+            "decimal": Decimal("1.50"),
+            "big": 2 ** 70,
+        })
+
+    def test_datetimes(self):
+        self.assertRendersLikeDRF({
+            "utc": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "offset": datetime(2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=2))),
+            "naive": datetime(2024, 5, 1, 12, 30, 15, 999),
+            "date": date(2024, 5, 1),
+            "time": time(12, 30, 15, 123456),
+        })
+
+    def test_line_separators_escaped(self):
+        data = {"text": "a\u2028b\u2029c"}
+        self.assertRendersLikeDRF(data)
+        self.assertEqual(ORJSONRenderer().render(data), b'{"text":"a\\u2028b\\u2029c"}')
+
+    def test_non_finite_floats_rejected(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({"values": [value]})
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render({"values": [value]})
+
+    def test_indent(self):
+        self.assertRendersLikeDRF({"id": 7, "tags": ["a"]}, "application/json; indent=4")
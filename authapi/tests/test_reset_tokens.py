@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django_redis import get_redis_connection
+
+from authapi.reset_tokens import ResetTokenStore
+
+
+class ResetTokenStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = ResetTokenStore(ttl=60)
+
+    def test_redeem_once(self):
+        token = self.store.issue(1)
+        self.assertEqual(self.store.redeem(token), 1)
+        self.assertIsNone(self.store.redeem(token))
+
+    def test_new_token_revokes_previous(self):
+        first = self.store.issue(1)
+        second = self.store.issue(1)
+        self.assertIsNone(self.store.redeem(first))
+        self.assertEqual(self.store.redeem(second), 1)
+
+    def test_keyspace_bounded_per_user(self):
+        for _ in range(5):
+            token = self.store.issue(1)
+        redis_conn = get_redis_connection("default")
+        self.assertEqual(len(redis_conn.keys("reset:*")), 2)
+        self.store.redeem(token)
+        self.assertEqual(redis_conn.keys("reset:*"), [])
+
+    def test_raw_token_not_stored(self):
+        token = self.store.issue(1)
+        self.assertFalse(any(token in key.decode() for key in get_redis_connection("default").keys("reset:*")))
@@ -0,0 +1,63 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+
+class PrebuiltSchemaTests(APITestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.schema_dir = Path(tmp.name)
+        settings_override = override_settings(OPENAPI_SCHEMA_DIR=str(self.schema_dir))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command("build_schema", stdout=StringIO())
+
+    def test_build_writes_files(self):
+        schema = json.loads((self.schema_dir / "schema.json").read_text())
+        self.assertIn("/api/auth/login", schema["paths"])
+        self.assertEqual(gzip.decompress((self.schema_dir / "schema.json.gz").read_bytes()), (self.schema_dir / "schema.json").read_bytes())
+
+    def test_serves_prebuilt_file(self):
+        (self.schema_dir / "schema.yaml").write_bytes(b"openapi: prebuilt\n")
+        (self.schema_dir / "schema.yaml.gz").write_bytes(gzip.compress(b"openapi: prebuilt\n"))
+        response = self.client.get(reverse("schema"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi")
+        self.assertEqual(response.content, b"openapi: prebuilt\n")
+
+    def test_json_gzip_and_etag(self):
+        response = self.client.get(reverse("schema"), {"format": "json"}, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("/api/auth/login", json.loads(gzip.decompress(response.content))["paths"])
+
+        response = self.client.get(
+            reverse("schema"), {"format": "json"}, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_gzip_refused_with_zero_quality(self):
+        for accept_encoding in ("gzip;q=0", "br, gzip; q=0.0", "*;q=0", "gzip;q=0, *"):
+            response = self.client.get(reverse("schema"), {"format": "json"}, HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertNotIn("Content-Encoding", response, accept_encoding)
+            self.assertIn("/api/auth/login", json.loads(response.content)["paths"])
+        for accept_encoding in ("gzip;q=0.5", "*", "br;q=1, GZIP"):
+            response = self.client.get(reverse("schema"), {"format": "json"}, HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertEqual(response["Content-Encoding"], "gzip", accept_encoding)
+
+    def test_swagger_ui(self):
+        response = self.client.get(reverse("swagger-ui"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bearer_security_scheme(self):
+        schema = json.loads((self.schema_dir / "schema.json").read_text())
+        self.assertEqual(schema["components"]["securitySchemes"]["jwtAuth"], {"type": "http", "scheme": "bearer", "bearerFormat": "JWT"})
+        self.assertIn({"jwtAuth": []}, schema["paths"]["/api/auth/me"]["get"]["security"])
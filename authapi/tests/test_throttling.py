@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authapi.login_guard import login_guard
+
+
+class ThrottlingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def login(self, email, ip):
+        return self.client.post(
+            reverse("login"), {"email": email, "password": "wrongpass123"}, REMOTE_ADDR=ip
+        )
+
+    def test_login_throttled_per_ip(self):
+        for i in range(5):
+            self.assertEqual(self.login(f"user{i}@example.com", "10.0.0.1").status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login("user5@example.com", "10.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        # Other clients are unaffected
+        self.assertEqual(self.login("user5@example.com", "10.0.0.2").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    # Keep the account lockout (tested in test_login_guard) from answering first
+    @mock.patch.object(login_guard, "lockout_threshold", 100)
+    def test_login_throttled_per_account(self):
+        for i in range(10):
+            self.assertEqual(self.login("target@example.com", f"10.0.1.{i}").status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login("Target@example.com", "10.0.1.99")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+
+
+class TokenRefreshTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", full_name="Test User", password="testpass123"
+        )
+        response = self.client.post(reverse("login"), {"email": "test@example.com", "password": "testpass123"})
+        self.access, self.refresh = response.data["access"], response.data["refresh"]
+
+    def refresh_tokens(self, refresh):
+        return self.client.post(reverse("token-refresh"), {"refresh": refresh})
+
+    def test_refresh_rotates(self):
+        response = self.refresh_tokens(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get(reverse("me")).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh_tokens(response.data["refresh"]).status_code, status.HTTP_200_OK)
+
+    def test_reuse_revokes_family(self):
+        rotated = self.refresh_tokens(self.refresh).data["refresh"]
+        response = self.refresh_tokens(self.refresh)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.refresh_tokens(rotated).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_refresh_and_access(self):
+        response = self.client.post(reverse("logout"), {"refresh": self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.refresh_tokens(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        self.assertEqual(self.client.get(reverse("me")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_refresh(self):
+        self.user.set_password("changedpass123")
+        self.user.save()
+        self.assertEqual(self.refresh_tokens(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_tokens_rejected(self):
+        self.user.delete()
+        self.assertEqual(self.refresh_tokens(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        self.assertEqual(self.client.get(reverse("me")).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_picks_up_profile_changes(self):
+        self.user.full_name = "New Name"
+        self.user.save()
+        response = self.refresh_tokens(self.refresh)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get(reverse("me")).json()["full_name"], "New Name")
+        refreshed = self.refresh_tokens(response.data["refresh"])
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
@@ -0,0 +1,127 @@
+"""
+Refresh token families tracked in Redis, replacing SimpleJWT's SQL blacklist tables.
+Every login starts a family; its Redis key holds the jti of the only refresh token in
+the family that may still be used. Refreshing rotates that jti. Presenting an older
+refresh token means it was stolen or replayed, so the whole family is revoked.
+Revoked families are also remembered for one access token lifetime, so access tokens
+issued from them stop authenticating too.
+"""
+
+import uuid
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+
+from config.redis_client import get_redis
+
+from .tokens import USER_VERSIONS_KEY, VERSION_CLAIM
+
+FAMILY_CLAIM = "fam"
+FAMILY_KEY_PREFIX = "refresh:family:"
+REVOKED_KEY_PREFIX = "refresh:revoked:"
+
+# Outcomes of a rotation
+ROTATED = 1
+UNKNOWN_FAMILY = 0
+REUSED = -1
+STALE_VERSION = -2
+
+# KEYS: family key, revoked key, user versions hash.
+# ARGV: presented jti, new jti, family ttl, revoked ttl, user id, token version.
+# Checks the user version (deleted users are negative) and rotates the family's jti
+# in one round trip.
+_ROTATE = """
+local version = tonumber(redis.call('HGET', KEYS[3], ARGV[5]) or '0')
+if version < 0 or version ~= tonumber(ARGV[6]) then
+    return -2
+end
+local current = redis.call('GET', KEYS[1])
+if not current then return 0 end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    redis.call('SET', KEYS[2], 1, 'EX', ARGV[4])
+    return -1
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def family_key(family):
+    return FAMILY_KEY_PREFIX + family
+
+
+def revoked_key(family):
+    return REVOKED_KEY_PREFIX + family
+
+
+class TokenFamilyStore:
+    """
+    Starts, rotates and revokes refresh token families.
+    """
+    _script = None
+
+    @property
+    def family_ttl(self):
+        return int(settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds())
+
+    @property
+    def revoked_ttl(self):
+        return int(settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds())
+
+    def start(self, refresh, pipe=None):
+        """
+        Put a freshly issued refresh token in a new family. With `pipe`, the command is
+        queued on that pipeline for the caller to execute.
+        """
+        refresh[FAMILY_CLAIM] = uuid.uuid4().hex
+        (pipe or get_redis()).set(
+            family_key(refresh[FAMILY_CLAIM]), refresh[api_settings.JTI_CLAIM], ex=self.family_ttl
+        )
+        return refresh
+
+    async def astart(self, refresh, redis_conn):
+        """
+        Async variant of start, using the given redis.asyncio client or pipeline.
+        """
+        refresh[FAMILY_CLAIM] = uuid.uuid4().hex
+        await redis_conn.set(
+            family_key(refresh[FAMILY_CLAIM]), refresh[api_settings.JTI_CLAIM], ex=self.family_ttl
+        )
+        return refresh
+
+    def rotate(self, refresh):
+        """
+        Rotate a validated refresh token in place (new jti, iat and exp) and return
+        the outcome: ROTATED, UNKNOWN_FAMILY, REUSED or STALE_VERSION.
+        """
+        family = refresh.get(FAMILY_CLAIM)
+        if not family or VERSION_CLAIM not in refresh:
+            return UNKNOWN_FAMILY
+        presented_jti = refresh[api_settings.JTI_CLAIM]
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        redis_conn = get_redis()
+        if TokenFamilyStore._script is None:
+            TokenFamilyStore._script = redis_conn.register_script(_ROTATE)
+        return self._script(
+            keys=[family_key(family), revoked_key(family), USER_VERSIONS_KEY],
+            args=[
+                presented_jti, refresh[api_settings.JTI_CLAIM], self.family_ttl, self.revoked_ttl,
+                refresh[api_settings.USER_ID_CLAIM], refresh[VERSION_CLAIM],
+            ],
+            client=redis_conn,
+        )
+
+    def revoke(self, family):
+        """
+        Revoke a family: its refresh tokens and any access tokens issued from it.
+        """
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.delete(family_key(family))
+        pipe.set(revoked_key(family), 1, ex=self.revoked_ttl)
+        pipe.execute()
+
+
+token_families = TokenFamilyStore()
@@ -0,0 +1,87 @@
+"""
+JWT tokens carrying a snapshot of the user, and the Redis-held user version map.
+Access tokens embed email, full_name and the user's current version so read-only
+endpoints can authenticate without loading the user row. Bumping a user's version
+(password reset, deactivation) invalidates every token issued before it; deleting
+the user sets a version no token carries. Refreshing copies the current snapshot.
+"""
+
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from config.redis_client import get_redis, write_pipeline
+
+from .jwt_keys import get_token_backend
+
+# Redis hash of user id -> version; missing users are at version 0
+USER_VERSIONS_KEY = "user:versions"
+
+# Claims copied from the user into the token
+SNAPSHOT_CLAIMS = ("email", "full_name")
+VERSION_CLAIM = "ver"
+
+# Version of deleted users, never matched by a token
+DELETED_VERSION = -1
+
+
+def get_user_version(user_id):
+    """
+    Return the current token version for a user.
+    """
+    redis_conn = get_redis()
+    return int(redis_conn.hget(USER_VERSIONS_KEY, user_id) or 0)
+
+
+def bump_user_version(user_id):
+    """
+    Invalidate all tokens issued to a user so far.
+    """
+    with write_pipeline() as pipe:
+        pipe.hincrby(USER_VERSIONS_KEY, user_id, 1)
+
+
+def retire_user_version(user_id):
+    """
+    Invalidate all tokens of a deleted user for good.
+    """
+    with write_pipeline() as pipe:
+        pipe.hset(USER_VERSIONS_KEY, user_id, DELETED_VERSION)
+
+
+class KeyRingTokenMixin:
+    """
+    Signs and verifies with the asymmetric key ring when one is configured.
+    """
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+class UserSnapshotAccessToken(KeyRingTokenMixin, AccessToken):
+    """
+    Access token derived from a UserSnapshotRefreshToken.
+    """
+
+
+class UserSnapshotRefreshToken(KeyRingTokenMixin, RefreshToken):
+    """
+    Refresh token (and derived access token) carrying the user snapshot claims.
+    """
+    access_token_class = UserSnapshotAccessToken
+
+    @classmethod
+    def for_user(cls, user, version=None):
+        """
+        Build a token for the user. `version` may be passed by callers that already
+        read it (e.g. with the async Redis client); otherwise it is read here.
+        """
+        token = super().for_user(user)
+        token.update_snapshot(user)
+        token[VERSION_CLAIM] = get_user_version(user.pk) if version is None else version
+        return token
+
+    def update_snapshot(self, user):
+        """
+        Copy the user's current snapshot claims into the token.
+        """
+        for claim in SNAPSHOT_CLAIMS:
+            self[claim] = getattr(user, claim)
@@ -0,0 +1,100 @@
+"""
+Local verification of this service's access tokens, for other services.
+Fetches the JWKS published at /.well-known/jwks.json and keeps the parsed public keys
+in-process, refetching only when the cache expires or a token names an unknown key
+(i.e. after a key rotation). If a refetch fails, the keys already held stay in use and
+the next attempt waits min_refetch_interval. Depends only on PyJWT with cryptography,
+not on Django:
+
+    verifier = JWKSVerifier("https://auth.example.com/.well-known/jwks.json")
+    claims = verifier.verify(token)  # raises jwt.InvalidTokenError
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.request
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSFetchError(jwt.InvalidTokenError):
+    """
+    The JWKS could not be fetched and no cached key matches the token.
+    """
+
+
+class JWKSVerifier:
+    """
+    Verifies access tokens against a cached JWKS document.
+    `fetch` may replace the HTTP fetch (it must return the parsed JWKS dict).
+    """
+
+    def __init__(self, jwks_url, audience=None, issuer=None, max_age=3600,
+                 min_refetch_interval=30, leeway=0, timeout=5, fetch=None):
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.issuer = issuer
+        self.max_age = max_age
+        self.min_refetch_interval = min_refetch_interval
+        self.leeway = leeway
+        self.timeout = timeout
+        self.fetch = fetch or self._fetch
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._fetched_at = None
+        self._attempted_at = None
+
+    def _fetch(self):
+        with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as response:
+            return json.load(response)
+
+    def _refresh(self):
+        keys = {key.key_id: key for key in jwt.PyJWKSet.from_dict(self.fetch()).keys}
+        self._keys, self._fetched_at = keys, time.monotonic()
+
+    def get_key(self, kid):
+        """
+        Return the PyJWK for a key id, refetching the JWKS if needed.
+        """
+        error = None
+        with self._lock:
+            now = time.monotonic()
+            expired = self._fetched_at is None or now - self._fetched_at > self.max_age
+            # An unknown key may be newly rotated; attempts are at most once per interval
+            if (expired or kid not in self._keys) and (
+                self._attempted_at is None or now - self._attempted_at > self.min_refetch_interval
+            ):
+                self._attempted_at = now
+                try:
+                    self._refresh()
+                except (OSError, ValueError, jwt.PyJWTError) as exc:
+                    logger.warning("Fetching %s failed, keeping the cached keys: %s", self.jwks_url, exc)
+                    error = exc
+            key = self._keys.get(kid)
+        if key is None:
+            if error is not None:
+                raise JWKSFetchError("Could not fetch the signing keys") from error
+            raise jwt.InvalidTokenError("Token is signed with an unknown key")
+        return key
+
+    def verify(self, token):
+        """
+        Verify an access token's signature, expiry, audience and issuer, and return its claims.
+        """
+        key = self.get_key(jwt.get_unverified_header(token).get("kid"))
+        claims = jwt.decode(
+            token,
+            key.key,
+            algorithms=[key.algorithm_name],
+            audience=self.audience,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={"verify_aud": self.audience is not None},
+        )
+        if claims.get("token_type") != "access":
+            raise jwt.InvalidTokenError("Token is not an access token")
+        return claims
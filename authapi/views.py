@@ -1,35 +1,51 @@
 """
 Views for authentication endpoints using Django REST Framework.
-Handles registration, login, user info, password reset, and integrates with Redis for token storage.
+Handles registration, login, user info, password reset, and integrates with Redis (config.redis_client) for token storage.
 """
 
-import secrets
-import redis
+import time
 from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django_redis import get_redis_connection
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from drf_spectacular.utils import extend_schema, OpenApiExample
-import uuid
+
+from accounts.hashing import make_password
+from config.redis_client import deferred_writes, get_redis
 
 from .serializers import (
     RegisterSerializer, LoginSerializer, ForgotPasswordSerializer,
-    ResetPasswordSerializer, UserSerializer
+    ResetPasswordSerializer, UserSerializer, RefreshTokenSerializer,
+    IntrospectSerializer, BulkRegisterSerializer
 )
+from .activity import record_login
+from .authentication import DatabaseJWTAuthentication
+from .bulk_register import register_users
+from .conditional import me_response
+from .idempotency import IdempotencyMixin
+from .introspection import introspect
+from .jwt_keys import get_jwks_document
+from .login_guard import login_guard
+from .permissions import HasIntrospectionKey
+from .schema import CONTENT_TYPES, accepts_gzip, get_schema_documents, negotiate_format, schema_etag
+from .outbox import enqueue_password_reset
+from .reset_tokens import reset_tokens
+from .token_families import FAMILY_CLAIM, REUSED, ROTATED, token_families
+from .tokens import UserSnapshotRefreshToken
 
 # Get the custom user model
 User = get_user_model()
 
-# Create a Redis connection using Django settings
-r = redis.from_url(settings.CACHES["default"]["LOCATION"])
-
-class RegisterView(generics.CreateAPIView):
+class RegisterView(IdempotencyMixin, generics.CreateAPIView):
     """
     API endpoint for user registration.
+    Retries with the same Idempotency-Key get the first response back.
     """
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
@@ -49,6 +65,41 @@ class RegisterView(generics.CreateAPIView):
         """
         return super().post(request, *args, **kwargs)
 
+    def perform_create(self, serializer):
+        # The post_save receivers' Redis writes go out in one round trip
+        with deferred_writes():
+            serializer.save()
+
+class BulkRegisterView(APIView):
+    """
+    API endpoint for registering many users at once, for partner onboarding.
+    Restricted to staff users.
+    """
+    # Staff status isn't in the token snapshot, so load the user
+    authentication_classes = [DatabaseJWTAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        request=BulkRegisterSerializer,
+        responses={200: OpenApiExample(
+            "Bulk Register Example",
+            value={"created": 1, "failed": 1, "results": [
+                {"status": "created", "user": {"id": 1, "email": "user@example.com", "full_name": "John Doe"}},
+                {"status": "error", "errors": {"email": ["user with this email already exists."]}},
+            ]}
+        )}
+    )
+    def post(self, request):
+        """
+        Handle POST request for bulk registration.
+        Returns one result per user, in the order they were sent.
+        """
+        serializer = BulkRegisterSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = register_users(serializer.validated_data["users"])
+        created = sum(1 for result in results if result["status"] == "created")
+        return Response({"created": created, "failed": len(results) - created, "results": results})
+
 class LoginView(APIView):
     """
     API endpoint for user login. Returns JWT access and refresh tokens.
@@ -74,12 +125,21 @@ class LoginView(APIView):
         """
         serializer = LoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = authenticate(
-            request, email=serializer.validated_data["email"], password=serializer.validated_data["password"]
-        )
+        email = serializer.validated_data["email"]
+        # Unknown emails, locked accounts and shed logins stop here, before any query or hash
+        if not login_guard.check(email):
+            return Response({"detail": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED)
+        user = authenticate(request, email=email, password=serializer.validated_data["password"])
         if not user:
+            login_guard.failed(email)
             return Response({"detail": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED)
-        refresh = RefreshToken.for_user(user)
+        # One round trip for the new token family, the write-behind login record and
+        # clearing the account's failed logins
+        pipe = get_redis().pipeline(transaction=False)
+        refresh = token_families.start(UserSnapshotRefreshToken.for_user(user), pipe)
+        record_login(pipe, user, request, time.time())
+        login_guard.succeeded(pipe, email)
+        pipe.execute()
         return Response({
             "access": str(refresh.access_token),
             "refresh": str(refresh)
@@ -98,14 +158,14 @@ class MeView(APIView):
     def get(self, request):
         """
         Handle GET request to return the authenticated user's details.
+        Answers 304 when the client's ETag or Last-Modified is still current.
         """
-        serializer = UserSerializer(request.user)
-        return Response(serializer.data)
+        return me_response(request)
 
 class ForgotPasswordView(APIView):
     """
     API endpoint to initiate password reset.
-    Generates a reset token, stores it in Redis, and (in production) would email it to the user.
+    Queues a reset email in the outbox; the token is only ever sent by email.
     """
     permission_classes = [permissions.AllowAny]
     throttle_scope = "password_reset"
@@ -123,22 +183,15 @@ class ForgotPasswordView(APIView):
         """
         serializer = ForgotPasswordSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        email = serializer.validated_data["email"]
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            # Always return success to avoid leaking which emails are registered
-            return Response({"detail": "Password reset email sent if user exists."}, status=200)
-        token = str(uuid.uuid4())
-        redis_conn = get_redis_connection("default")
-        # Store the reset token in Redis with a 10-minute expiry
-        redis_conn.set(f"reset:{token}", user.pk, ex=600)
-        # In production, send the token via email here
-        return Response({"detail": "Password reset email sent if user exists.", "reset_token": token})
+        # Same single Redis command whether or not the email is registered, so the
+        # response time doesn't leak it; the outbox worker looks the user up and mails them
+        enqueue_password_reset(serializer.validated_data["email"])
+        return Response({"detail": "Password reset email sent if user exists."})
 
-class ResetPasswordView(APIView):
+class ResetPasswordView(IdempotencyMixin, APIView):
     """
     API endpoint to reset the user's password using a token.
+    Retries with the same Idempotency-Key get the first response back.
     """
     permission_classes = [permissions.AllowAny]
     throttle_scope = "password_reset"
@@ -159,15 +212,147 @@ class ResetPasswordView(APIView):
         serializer.is_valid(raise_exception=True)
         token = serializer.validated_data["token"]
         password = serializer.validated_data["password"]
-        redis_conn = get_redis_connection("default")
-        user_id = redis_conn.get(f"reset:{token}")
+        # Hash before consuming the token, so a busy hashing pool (503) leaves it usable
+        encoded = make_password(password)
+        # Consumes the token, so concurrent requests can't redeem it twice
+        user_id = reset_tokens.redeem(token)
         if not user_id:
             return Response({"detail": "Invalid or expired token."}, status=400)
         try:
-            user = User.objects.get(pk=int(user_id))
+            user = User.objects.get_cached(pk=user_id)
         except User.DoesNotExist:
             return Response({"detail": "User not found."}, status=404)
-        user.set_password(password)
-        user.save()
-        redis_conn.delete(f"reset:{token}")
-        return Response({"detail": "Password has been reset successfully."})
\ No newline at end of file
+        user.set_password(password, encoded)
+        # The cached copy may be stale, so only the password is written back
+        with deferred_writes():
+            user.save(update_fields=["password"])
+        return Response({"detail": "Password has been reset successfully."})
+
+class TokenRefreshView(APIView):
+    """
+    API endpoint to exchange a refresh token for a new access and refresh token.
+    The presented refresh token is rotated out; reusing it revokes the whole family.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    @extend_schema(
+        request=RefreshTokenSerializer,
+        responses={200: OpenApiExample(
+            "JWT Token Example",
+            value={"access": "jwt-access-token", "refresh": "jwt-refresh-token"}
+        )}
+    )
+    def post(self, request):
+        """
+        Handle POST request to refresh tokens.
+        Verifies the token signature, then checks and rotates its family in one Redis call.
+        The new tokens carry the user's current email and name.
+        """
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            refresh = UserSnapshotRefreshToken(serializer.validated_data["refresh"])
+        except TokenError:
+            return Response({"detail": "Invalid or expired token."}, status=status.HTTP_401_UNAUTHORIZED)
+        outcome = token_families.rotate(refresh)
+        if outcome == REUSED:
+            return Response({"detail": "Token reuse detected, please log in again."}, status=status.HTTP_401_UNAUTHORIZED)
+        if outcome != ROTATED:
+            return Response({"detail": "Invalid or expired token."}, status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            refresh.update_snapshot(User.objects.get_cached(pk=refresh[api_settings.USER_ID_CLAIM]))
+        except User.DoesNotExist:
+            return Response({"detail": "Invalid or expired token."}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response({
+            "access": str(refresh.access_token),
+            "refresh": str(refresh)
+        })
+
+class LogoutView(APIView):
+    """
+    API endpoint to log out by revoking a refresh token's family.
+    Access tokens issued from the family are rejected from then on as well.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    @extend_schema(
+        request=RefreshTokenSerializer,
+        responses={200: OpenApiExample(
+            "Logout Example",
+            value={"detail": "Logged out."}
+        )}
+    )
+    def post(self, request):
+        """
+        Handle POST request to log out.
+        """
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            refresh = UserSnapshotRefreshToken(serializer.validated_data["refresh"])
+        except TokenError:
+            return Response({"detail": "Invalid or expired token."}, status=status.HTTP_401_UNAUTHORIZED)
+        if FAMILY_CLAIM in refresh:
+            token_families.revoke(refresh[FAMILY_CLAIM])
+        return Response({"detail": "Logged out."})
+
+class IntrospectView(APIView):
+    """
+    API endpoint for gateways to validate many access tokens in one request.
+    Authenticated with an introspection key rather than a user token.
+    """
+    permission_classes = [HasIntrospectionKey]
+    authentication_classes = []
+    # Gateways call this for every upstream request; the key is the access control
+    throttle_classes = []
+
+    @extend_schema(
+        request=IntrospectSerializer,
+        responses={200: OpenApiExample(
+            "Introspection Example",
+            value={"results": [
+                {"active": True, "sub": "1", "exp": 1735689600,
+                 "user": {"id": 1, "email": "user@example.com", "full_name": "John Doe"}},
+                {"active": False},
+            ]}
+        )}
+    )
+    def post(self, request):
+        """
+        Handle POST request to introspect tokens.
+        Returns one result per token, in the order they were sent.
+        """
+        serializer = IntrospectSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({"results": introspect(serializer.validated_data["tokens"])})
+
+@require_GET
+@cache_control(public=True, max_age=settings.JWKS_MAX_AGE)
+@condition(etag_func=lambda request: get_jwks_document()[1])
+def jwks_view(request):
+    """
+    Publish the public keys for verifying this service's tokens (RFC 7517).
+    The document only changes when keys rotate, so clients can cache it and
+    revalidate with If-None-Match.
+    """
+    return HttpResponse(get_jwks_document()[0], content_type="application/json")
+
+
+@require_GET
+@cache_control(public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+@condition(etag_func=schema_etag)
+def schema_view(request):
+    """
+    Serve the prebuilt OpenAPI schema, gzipped when the client accepts it.
+    """
+    fmt = negotiate_format(request)
+    document = get_schema_documents()[fmt]
+    if accepts_gzip(request):
+        response = HttpResponse(document.gzipped, content_type=CONTENT_TYPES[fmt])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(document.body, content_type=CONTENT_TYPES[fmt])
+    response["Vary"] = "Accept, Accept-Encoding"
+    return response
@@ -0,0 +1,9 @@
+"""
+Benchmarks for the auth endpoints.
+Drives register, login, me (plain, and revalidated with If-None-Match), forgot-password
+and reset-password either in-process (through Django's test client, counting SQL
+queries and Redis round trips per request) or over HTTP against a local
+gunicorn/uvicorn server, and reports throughput and latency percentiles, plus the CPU
+cost of rendering the /me body (see bench.rendering).
+Run it with `python manage.py bench --settings=bench.settings`.
+"""
@@ -0,0 +1,72 @@
+"""
+Per-request counters of SQL queries and Redis round trips.
+The active counter lives in a context variable, so it follows a request across the
+threads and event loops that sync_to_async/async_to_sync hop between.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+from django.db.backends.utils import CursorWrapper
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.asyncio.client import Redis as AsyncRedis
+from redis.client import Pipeline, Redis
+
+_current = contextvars.ContextVar("bench_counter", default=None)
+_installed = False
+
+
+class Counter:
+    __slots__ = ("queries", "redis")
+
+    def __init__(self):
+        self.queries = 0
+        self.redis = 0
+
+
+def _count(attr, method):
+    def wrapper(*args, **kwargs):
+        counter = _current.get()
+        if counter is not None:
+            setattr(counter, attr, getattr(counter, attr) + 1)
+        return method(*args, **kwargs)
+    return wrapper
+
+
+def _count_async(attr, method):
+    async def wrapper(*args, **kwargs):
+        counter = _current.get()
+        if counter is not None:
+            setattr(counter, attr, getattr(counter, attr) + 1)
+        return await method(*args, **kwargs)
+    return wrapper
+
+
+def install():
+    """
+    Wrap the DB cursor and Redis clients once per process. Pipelines override
+    execute_command to buffer, so a pipeline counts as one round trip on execute().
+    """
+    global _installed
+    if _installed:
+        return
+    CursorWrapper._execute = _count("queries", CursorWrapper._execute)
+    CursorWrapper._executemany = _count("queries", CursorWrapper._executemany)
+    Redis.execute_command = _count("redis", Redis.execute_command)
+    Pipeline.execute = _count("redis", Pipeline.execute)
+    AsyncRedis.execute_command = _count_async("redis", AsyncRedis.execute_command)
+    AsyncPipeline.execute = _count_async("redis", AsyncPipeline.execute)
+    _installed = True
+
+
+@contextmanager
+def counting():
+    """
+    Count the queries and Redis round trips made inside the block.
+    """
+    counter = Counter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
@@ -0,0 +1,52 @@
+"""
+CPU cost of building the /me response body, per request: DRF's path (a UserSerializer
+instance and JSONRenderer) against the compiled serializer and orjson renderer the
+view uses. Runs in-process on a user built from an access token, as /me sees it, so
+it measures serialization and rendering only.
+"""
+
+import json
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from accounts.models import User
+from authapi.authentication import ClaimsUser
+from authapi.renderers import ORJSONRenderer
+from authapi.serializers import UserSerializer
+from authapi.tokens import UserSnapshotRefreshToken
+
+
+def _drf(user, renderer=JSONRenderer()):
+    return renderer.render(UserSerializer(user).data)
+
+
+def _fast(user, renderer=ORJSONRenderer()):
+    return renderer.render(UserSerializer.serialize(user))
+
+
+def _cpu_us(render, user, iterations):
+    for _ in range(min(iterations, 100)):
+        render(user)
+    start = time.process_time_ns()
+    for _ in range(iterations):
+        render(user)
+    return (time.process_time_ns() - start) / iterations / 1000
+
+
+def compare(iterations):
+    """
+    Return the CPU microseconds per request of both paths and the difference.
+    """
+    user = User(id=1, email="bench@example.com", full_name="Bench User")
+    user = ClaimsUser(UserSnapshotRefreshToken.for_user(user, version=0).access_token)
+    if json.loads(_drf(user)) != json.loads(_fast(user)):
+        raise AssertionError("The compiled path renders a different body than DRF's")
+    drf, fast = _cpu_us(_drf, user, iterations), _cpu_us(_fast, user, iterations)
+    return {
+        "iterations": iterations,
+        "drf_cpu_us": round(drf, 2),
+        "compiled_cpu_us": round(fast, 2),
+        "saved_cpu_us": round(drf - fast, 2),
+        "speedup": round(drf / fast, 2),
+    }
@@ -0,0 +1,139 @@
+"""
+Load drivers and result aggregation.
+"""
+
+import http.client
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.db import close_old_connections
+from django.test import Client
+
+from . import counters
+
+
+class InProcessDriver:
+    """
+    Sends requests through the full middleware and view stack in this process.
+    """
+    counts = True
+
+    def __init__(self):
+        self._local = threading.local()
+        counters.install()
+
+    def client(self):
+        if not hasattr(self._local, "client"):
+            self._local.client = Client(raise_request_exception=False)
+        return self._local.client
+
+    def send(self, request):
+        headers = {f"HTTP_{name.upper().replace('-', '_')}": value for name, value in request.headers.items()}
+        with counters.counting() as counter:
+            if request.method == "GET":
+                response = self.client().get(request.path, **headers)
+            else:
+                response = self.client().post(request.path, request.body, content_type="application/json", **headers)
+        return response.status_code, counter
+
+    def finish_thread(self):
+        close_old_connections()
+
+
+class HTTPDriver:
+    """
+    Sends requests to a running server over keep-alive connections, one per thread.
+    SQL and Redis activity happens in the server, so it isn't counted.
+    """
+    counts = False
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def connection(self):
+        if not hasattr(self._local, "connection"):
+            self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return self._local.connection
+
+    def send(self, request):
+        body = json.dumps(request.body) if request.body is not None else None
+        headers = {"Content-Type": "application/json", **request.headers}
+        connection = self.connection()
+        try:
+            connection.request(request.method, request.path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            del self._local.connection
+            return None, None
+        return response.status, None
+
+    def finish_thread(self):
+        if hasattr(self._local, "connection"):
+            self._local.connection.close()
+
+
+def run(driver, requests, concurrency):
+    """
+    Send the requests from `concurrency` threads and return the raw samples:
+    (latency in seconds, status, counter) per request, and the wall time.
+    """
+    samples = [None] * len(requests)
+    barrier = threading.Barrier(concurrency)
+
+    def worker(offset):
+        barrier.wait()
+        try:
+            for i in range(offset, len(requests), concurrency):
+                start = time.perf_counter()
+                status, counter = driver.send(requests[i])
+                samples[i] = (time.perf_counter() - start, status, counter)
+        finally:
+            driver.finish_thread()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return samples, elapsed
+
+
+def summarize(samples, elapsed, counted):
+    """
+    Aggregate samples into the JSON-serializable result for one endpoint.
+    """
+    latencies = sorted(latency * 1000 for latency, _, _ in samples)
+    statuses = {}
+    for _, status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    result = {
+        "requests": len(samples),
+        "errors": sum(1 for _, status, _ in samples if status is None or status >= 400),
+        "statuses": statuses,
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(p50, 3),
+            "p95": round(p95, 3),
+            "p99": round(p99, 3),
+            "max": round(latencies[-1], 3),
+        },
+        "sql_queries_per_request": None,
+        "redis_round_trips_per_request": None,
+    }
+    if counted:
+        result["sql_queries_per_request"] = statistics.fmean(counter.queries for _, _, counter in samples)
+        result["redis_round_trips_per_request"] = statistics.fmean(counter.redis for _, _, counter in samples)
+    return result
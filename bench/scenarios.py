@@ -0,0 +1,141 @@
+"""
+One scenario per endpoint. `setup` prepares whatever the requests need (users, tokens)
+directly against the database and Redis, outside the measured section, and returns the
+list of requests to send.
+"""
+
+import uuid
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+
+from authapi.authentication import ClaimsUser
+from authapi.conditional import user_etag
+from authapi.reset_tokens import reset_tokens
+from authapi.serializers import UserSerializer
+from authapi.token_families import token_families
+from authapi.tokens import VERSION_CLAIM, UserSnapshotRefreshToken
+
+User = get_user_model()
+
+PASSWORD = "benchpass123"
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    body: dict = None
+    headers: dict = field(default_factory=dict)
+
+
+class Scenario:
+    name = None
+    method = "POST"
+    path = None
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+
+    def email(self, i):
+        return f"bench-{self.run_id}-{self.name}-{i}@example.com"
+
+    def create_users(self, count):
+        """
+        Create `count` users in one query. They all share one password hash, so setup
+        doesn't pay for `count` hashes.
+        """
+        password = User(email="", full_name="")
+        password.set_password(PASSWORD)
+        users = [
+            User(email=self.email(i), full_name=f"Bench User {i}", password=password.password)
+            for i in range(count)
+        ]
+        return User.objects.bulk_create(users)
+
+    def setup(self, count):
+        raise NotImplementedError
+
+
+class Register(Scenario):
+    name = "register"
+    path = "/api/auth/register"
+
+    def setup(self, count):
+        return [
+            Request("POST", self.path, {"email": self.email(i), "full_name": f"Bench User {i}", "password": PASSWORD})
+            for i in range(count)
+        ]
+
+
+class Login(Scenario):
+    name = "login"
+    path = "/api/auth/login"
+
+    def setup(self, count):
+        return [Request("POST", self.path, {"email": user.email, "password": PASSWORD}) for user in self.create_users(count)]
+
+
+class Me(Scenario):
+    name = "me"
+    method = "GET"
+    path = "/api/auth/me"
+
+    def setup(self, count):
+        requests = []
+        for user in self.create_users(count):
+            access = token_families.start(UserSnapshotRefreshToken.for_user(user)).access_token
+            requests.append(Request("GET", self.path, headers={"Authorization": f"Bearer {access}"}))
+        return requests
+
+
+class MeRevalidate(Scenario):
+    """
+    /me polled by clients that already have the current copy (304s).
+    """
+    name = "me-revalidate"
+    method = "GET"
+    path = "/api/auth/me"
+
+    def setup(self, count):
+        requests = []
+        for user in self.create_users(count):
+            access = token_families.start(UserSnapshotRefreshToken.for_user(user)).access_token
+            etag = user_etag(UserSerializer.serialize(ClaimsUser(access)), access[VERSION_CLAIM])
+            requests.append(Request("GET", self.path, headers={
+                "Authorization": f"Bearer {access}", "If-None-Match": etag,
+            }))
+        return requests
+
+
+class ForgotPassword(Scenario):
+    name = "forgot-password"
+    path = "/api/auth/forgot-password"
+
+    def setup(self, count):
+        return [Request("POST", self.path, {"email": user.email}) for user in self.create_users(count)]
+
+
+class ResetPassword(Scenario):
+    name = "reset-password"
+    path = "/api/auth/reset-password"
+
+    def setup(self, count):
+        return [
+            Request("POST", self.path, {"token": reset_tokens.issue(user.pk), "password": f"{PASSWORD}-new"})
+            for user in self.create_users(count)
+        ]
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (Register, Login, Me, MeRevalidate, ForgotPassword, ResetPassword)}
+
+
+def new_run_id():
+    return uuid.uuid4().hex[:8]
+
+
+def cleanup(run_id):
+    """
+    Delete the users created by a run.
+    """
+    User.objects.filter(email__startswith=f"bench-{run_id}-").delete()
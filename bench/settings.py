@@ -0,0 +1,16 @@
+"""
+Settings for benchmark runs: the project settings with throttle limits raised so load
+isn't rejected. The throttle class itself stays enabled, so its Redis call is still
+part of every measured request.
+"""
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import ALLOWED_HOSTS, REST_FRAMEWORK
+
+# Host name used by the in-process driver (Django's test client)
+ALLOWED_HOSTS = [*ALLOWED_HOSTS, "testserver"]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_RATES": {scope: "1000000/hour" for scope in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]},
+}
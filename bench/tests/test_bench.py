@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from accounts.models import User
+
+
+class BenchCommandTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_inprocess_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            call_command(
+                "bench", endpoints=["me", "me-revalidate", "forgot-password"], requests=2, warmup=0, concurrency=2,
+                render_iterations=10, output=output, stdout=open(os.devnull, "w"), stderr=open(os.devnull, "w"),
+            )
+            with open(output) as f:
+                results = json.load(f)
+        me = results["endpoints"]["me"]
+        self.assertEqual(me["statuses"], {"200": 2})
+        self.assertEqual(me["sql_queries_per_request"], 0)
+        self.assertEqual(me["redis_round_trips_per_request"], 2)
+        self.assertEqual(results["endpoints"]["me-revalidate"]["statuses"], {"304": 2})
+        self.assertEqual(results["endpoints"]["forgot-password"]["errors"], 0)
+        self.assertEqual(results["rendering"]["iterations"], 10)
+        self.assertEqual(results["meta"]["mode"], "inprocess")
+        # Benchmark users are cleaned up
+        self.assertFalse(User.objects.exists())
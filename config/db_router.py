@@ -0,0 +1,196 @@
+"""
+Routing of reads to read replicas.
+Writes always go to the primary. During a request, reads go to a randomly chosen
+healthy replica until the request writes, runs a transaction on the primary, or
+belongs to a user who wrote in the last few seconds; from then on they stay on the
+primary, so users read their own writes despite replication lag. That last case is
+tracked in Redis: registering or changing a password marks the user, and the mark is
+checked in the same round trip as the token revocation check (or by email on login).
+Outside requests (management commands, workers), reads use the primary.
+Each process checks replica health and lag at most every HEALTH_CHECK_INTERVAL seconds.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from accounts.cache import normalize_email
+
+from .redis_client import get_async_redis, get_redis, write_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+_LAG_SQL = """
+SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+
+
+class RoutingState:
+    __slots__ = ("pinned",)
+
+    def __init__(self):
+        self.pinned = False
+
+
+_state = contextvars.ContextVar("db_routing_state", default=None)
+
+
+def pin_to_primary():
+    """
+    Send the rest of the current request's reads to the primary.
+    """
+    state = _state.get()
+    if state is not None:
+        state.pinned = True
+
+
+def replicas_enabled():
+    return bool(settings.DATABASE_REPLICAS)
+
+
+def sticky_user_key(user_id):
+    return f"db:primary:user:{user_id}"
+
+
+def sticky_email_key(email):
+    return f"db:primary:email:{normalize_email(email)}"
+
+
+def stick_to_primary(user):
+    """
+    Keep the user's reads on the primary for STICKY_SECONDS, in every process.
+    """
+    if not replicas_enabled():
+        return
+    seconds = settings.REPLICA_ROUTING["STICKY_SECONDS"]
+    with write_pipeline() as pipe:
+        pipe.set(sticky_user_key(user.pk), 1, ex=seconds)
+        pipe.set(sticky_email_key(user.email), 1, ex=seconds)
+
+
+def pin_if_sticky_email(email):
+    """
+    Pin the request to the primary if the user with this email wrote recently.
+    """
+    if replicas_enabled() and get_redis().exists(sticky_email_key(email)):
+        pin_to_primary()
+
+
+async def apin_if_sticky_email(email):
+    """
+    Async variant of pin_if_sticky_email().
+    """
+    if replicas_enabled():
+        if await get_async_redis().exists(sticky_email_key(email)):
+            pin_to_primary()
+
+
+class ReplicaHealth:
+    """
+    Healthy replica aliases, refreshed at most every HEALTH_CHECK_INTERVAL seconds.
+    A replica is healthy when it answers and lags at most MAX_LAG_SECONDS.
+    """
+
+    def __init__(self):
+        self._healthy = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def healthy(self):
+        interval = settings.REPLICA_ROUTING["HEALTH_CHECK_INTERVAL"]
+        if self._healthy is None or time.monotonic() - self._checked_at >= interval:
+            # One thread checks while the others keep using the previous result
+            if self._lock.acquire(blocking=self._healthy is None):
+                try:
+                    self._healthy = [alias for alias in settings.DATABASE_REPLICAS if self.check(alias)]
+                    self._checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return self._healthy
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(_LAG_SQL if connection.vendor == "postgresql" else "SELECT 0")
+                lag = float(cursor.fetchone()[0])
+        except DatabaseError:
+            logger.warning("Replica %s is unavailable", alias, exc_info=True)
+            connection.close()
+            return False
+        if lag > settings.REPLICA_ROUTING["MAX_LAG_SECONDS"]:
+            logger.warning("Replica %s is %.1fs behind", alias, lag)
+            return False
+        return True
+
+
+replica_health = ReplicaHealth()
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending reads to replicas and writes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        state = _state.get()
+        if state is None or state.pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        healthy = replica_health.healthy()
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Gives each request its own routing state, so its reads may use replicas.
+    Only active when DATABASE_REPLICAS is set.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replicas_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _state.set(RoutingState())
+        try:
+            return self.get_response(request)
+        finally:
+            _state.reset(token)
+
+    async def __acall__(self, request):
+        token = _state.set(RoutingState())
+        try:
+            return await self.get_response(request)
+        finally:
+            _state.reset(token)
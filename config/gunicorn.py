@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration: `gunicorn -c config/gunicorn.py config.wsgi:application`.
+Threaded workers, so requests waiting on the password hashing pool don't hold up
+cheap ones; settings.PASSWORD_HASHING is sized from the same variables.
+With PROMETHEUS_MULTIPROC_DIR set, workers share metrics through files in that
+directory, which is emptied at startup and cleaned up for workers that exit.
+"""
+
+import os
+import shutil
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+
+def on_starting(server):
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,250 @@
+"""
+Request instrumentation exported in Prometheus format on /metrics.
+While a request runs, its DB, Redis and password-hash timings are added up in a plain
+per-request object held in a context variable (no locks, and it follows the request
+across sync_to_async threads). The middleware turns that object into a handful of
+metric updates once the response is ready.
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so every worker writes its values to
+shared files and /metrics aggregates them (see config/gunicorn.py).
+"""
+
+import contextvars
+import hmac
+import os
+import time
+
+import redis
+import redis.asyncio as aioredis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+LABELS = ("view", "method", "status")
+
+REQUEST_SECONDS = Histogram(
+    "auth_request_duration_seconds", "Request latency.", LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Counter("auth_db_queries_total", "SQL queries run by requests.", LABELS)
+DB_SECONDS = Counter("auth_db_query_seconds_total", "Time spent in SQL queries.", LABELS)
+REDIS_COMMANDS = Counter("auth_redis_commands_total", "Redis round trips made by requests.", LABELS)
+REDIS_SECONDS = Counter("auth_redis_command_seconds_total", "Time spent in Redis round trips.", LABELS)
+HASH_SECONDS = Histogram(
+    "auth_password_hash_duration_seconds", "Time waiting for password hashes, per request.", LABELS,
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+THROTTLED = Counter("auth_throttled_requests_total", "Requests rejected by the throttle.", ("view",))
+# Per pool ("sync" or "async") and state ("in_use" or "idle"), summed over live workers
+REDIS_POOL_CONNECTIONS = Gauge(
+    "auth_redis_pool_connections", "Redis connections in the pools, after the latest request.", ("client", "state"),
+    multiprocess_mode="livesum",
+)
+REDIS_POOL_EXHAUSTED = Counter(
+    "auth_redis_pool_exhausted_total", "Redis commands that found no free pooled connection in time.", ("client",)
+)
+# Lookups in the user cache (accounts.cache) by result: local_hit, redis_hit or miss
+USER_CACHE_LOOKUPS = Counter("auth_user_cache_lookups_total", "User cache lookups.", ("result",))
+LOGIN_REJECTED = Counter(
+    "auth_login_rejected_total", "Logins rejected before checking the password (see authapi.login_guard).", ("reason",)
+)
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds", "redis_commands", "redis_seconds", "hash_seconds", "throttled")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.redis_commands = 0
+        self.redis_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.throttled = False
+
+
+_stats = contextvars.ContextVar("request_stats", default=None)
+
+
+def record_hash(seconds):
+    stats = _stats.get()
+    if stats is not None:
+        stats.hash_seconds += seconds
+
+
+def record_throttled():
+    stats = _stats.get()
+    if stats is not None:
+        stats.throttled = True
+
+
+def record_login_rejected(reason):
+    LOGIN_REJECTED.labels(reason).inc()
+
+
+def record_user_cache_lookup(result, count=1):
+    USER_CACHE_LOOKUPS.labels(result).inc(count)
+
+
+def _record_redis(seconds):
+    stats = _stats.get()
+    if stats is not None:
+        stats.redis_commands += 1
+        stats.redis_seconds += seconds
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    stats = _stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def instrument_connection(connection, **kwargs):
+    if settings.METRICS_ENABLED:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    def execute(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().execute(*args, **kwargs)
+        finally:
+            _record_redis(time.perf_counter() - start)
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    Redis client timing every round trip; a pipeline counts as one.
+    Used by django-redis through REDIS_CLIENT_CLASS.
+    """
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            _record_redis(time.perf_counter() - start)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedAsyncPipeline(aioredis.client.Pipeline):
+    async def execute(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            _record_redis(time.perf_counter() - start)
+
+
+class InstrumentedAsyncRedis(aioredis.Redis):
+    """
+    redis.asyncio counterpart of InstrumentedRedis.
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            _record_redis(time.perf_counter() - start)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class MetricsMiddleware:
+    """
+    Records latency and the per-request DB, Redis, hashing and throttle stats,
+    labelled by view name, method and status, and the Redis pool usage after the
+    request. Place it first in MIDDLEWARE.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _stats.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _stats.reset(token)
+        self.observe(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, stats, seconds):
+        match = request.resolver_match
+        view = match.view_name if match else "<unmatched>"
+        labels = (view, request.method, str(response.status_code))
+        REQUEST_SECONDS.labels(*labels).observe(seconds)
+        if stats.db_queries:
+            DB_QUERIES.labels(*labels).inc(stats.db_queries)
+            DB_SECONDS.labels(*labels).inc(stats.db_seconds)
+        if stats.redis_commands:
+            REDIS_COMMANDS.labels(*labels).inc(stats.redis_commands)
+            REDIS_SECONDS.labels(*labels).inc(stats.redis_seconds)
+        if stats.hash_seconds:
+            HASH_SECONDS.labels(*labels).observe(stats.hash_seconds)
+        if stats.throttled:
+            THROTTLED.labels(view).inc()
+        record_pool_usage()
+
+
+def record_pool_usage():
+    from .redis_client import pool_usage
+    for client, (in_use, idle) in pool_usage().items():
+        REDIS_POOL_CONNECTIONS.labels(client, "in_use").set(in_use)
+        REDIS_POOL_CONNECTIONS.labels(client, "idle").set(idle)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, aggregating all workers in multiprocess mode.
+    Requires `Authorization: Bearer <token>` with one of METRICS_TOKENS.
+    """
+    presented = request.headers.get("Authorization", "").removeprefix("Bearer ").encode()
+    # Compare against every token so the timing doesn't reveal which one matched
+    matches = [hmac.compare_digest(presented, token.encode()) for token in settings.METRICS_TOKENS]
+    if not presented or not any(matches):
+        return HttpResponse(status=403)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
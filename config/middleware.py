@@ -0,0 +1,68 @@
+"""
+Path-scoped versions of Django's browser middleware.
+The API, JWKS and metrics endpoints are stateless, so they skip the session, CSRF,
+auth, messages and clickjacking middleware and only get metrics, CORS, security
+headers and the ALLOWED_HOSTS check. Everything else, the admin included, runs the
+full stack. Under ASGI this also saves the thread hops each of these middlewares
+costs per request.
+"""
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, common, csrf
+
+
+def is_stateless(request):
+    return request.path_info.startswith(tuple(settings.STATELESS_PATH_PREFIXES))
+
+
+class SkipStatelessMixin:
+    """
+    Pass requests for STATELESS_PATH_PREFIXES straight to the next middleware.
+    """
+
+    def __call__(self, request):
+        if is_stateless(request):
+            # A coroutine in async mode, which the caller awaits
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipStatelessMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CommonMiddleware(common.CommonMiddleware):
+    def process_request(self, request):
+        if is_stateless(request):
+            # Keep the ALLOWED_HOSTS check, skip the APPEND_SLASH URL resolving
+            request.get_host()
+            return None
+        return super().process_request(request)
+
+    def process_response(self, request, response):
+        if is_stateless(request):
+            return response
+        return super().process_response(request, response)
+
+
+class CsrfViewMiddleware(SkipStatelessMixin, csrf.CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # Called by the handler, not __call__, so it needs its own check
+        if is_stateless(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(SkipStatelessMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SkipStatelessMixin, messages_middleware.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(SkipStatelessMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
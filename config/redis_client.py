@@ -0,0 +1,224 @@
+"""
+Redis access for the whole project.
+get_redis() returns the client behind the default cache (django-redis), and
+get_async_redis() the redis.asyncio client for the running event loop. Both use
+blocking connection pools configured from the REDIS setting: a bounded number of
+connections, a short wait for a free one, socket timeouts, one quick retry and
+periodic health checks of idle connections. Pools are created on first use, so each
+gunicorn worker gets its own after the fork. A Redis outage therefore fails requests
+within a couple of seconds with a 503 (see exception_handler) instead of hanging workers.
+Writes whose results aren't needed go through write_pipeline(); inside deferred_writes()
+they are all sent in one round trip when the block ends, e.g. the cache, version and
+email filter updates made by User post_save receivers.
+"""
+
+import asyncio
+import contextvars
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from functools import cache
+
+import redis
+import redis.asyncio as aioredis
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.retry import Retry
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .metrics import REDIS_POOL_EXHAUSTED, InstrumentedAsyncRedis
+
+
+def _pool_options(retry_class):
+    config = settings.REDIS
+    errors = (redis.ConnectionError, redis.TimeoutError) if config["RETRY_ON_TIMEOUT"] else (redis.ConnectionError,)
+    return {
+        "max_connections": config["MAX_CONNECTIONS"],
+        "timeout": config["POOL_TIMEOUT"],
+        "socket_timeout": config["SOCKET_TIMEOUT"],
+        "socket_connect_timeout": config["SOCKET_CONNECT_TIMEOUT"],
+        "health_check_interval": config["HEALTH_CHECK_INTERVAL"],
+        "retry": retry_class(ExponentialBackoff(cap=0.5, base=0.05), config["RETRIES"], supported_errors=errors),
+    }
+
+
+def _is_exhausted(exc):
+    return str(exc) == "No connection available."
+
+
+class BlockingConnectionPool(redis.BlockingConnectionPool):
+    """
+    Connection pool for django-redis (CONNECTION_POOL_CLASS), configured from the
+    REDIS setting and counting requests that found no free connection.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**{**_pool_options(Retry), **kwargs})
+
+    def get_connection(self, *args, **kwargs):
+        try:
+            return super().get_connection(*args, **kwargs)
+        except redis.ConnectionError as exc:
+            if _is_exhausted(exc):
+                REDIS_POOL_EXHAUSTED.labels("sync").inc()
+            raise
+
+    def usage(self):
+        """
+        Return (connections in use, idle connections).
+        """
+        idle = sum(1 for connection in list(self.pool.queue) if connection is not None)
+        return len(self._connections) - idle, idle
+
+
+class AsyncBlockingConnectionPool(aioredis.BlockingConnectionPool):
+    """
+    redis.asyncio counterpart of BlockingConnectionPool.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**{**_pool_options(AsyncRetry), **kwargs})
+
+    async def get_connection(self, *args, **kwargs):
+        try:
+            return await super().get_connection(*args, **kwargs)
+        except redis.ConnectionError as exc:
+            if _is_exhausted(exc):
+                REDIS_POOL_EXHAUSTED.labels("async").inc()
+            raise
+
+    def usage(self):
+        return len(self._in_use_connections), len(self._available_connections)
+
+
+def get_redis():
+    """
+    Return the shared Redis client.
+    """
+    return get_redis_connection("default")
+
+
+# Async clients per event loop, dropped together with the loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis():
+    """
+    Return the redis.asyncio client for the running loop. redis.asyncio connections
+    are bound to the loop that created them, so each loop has its own pool; requests
+    on a loop share it and wait for a free connection instead of opening one each.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        pool = AsyncBlockingConnectionPool.from_url(settings.CACHES["default"]["LOCATION"])
+        client = _async_clients[loop] = InstrumentedAsyncRedis(connection_pool=pool)
+    return client
+
+
+@cache
+def get_script(source):
+    """
+    Return the Script for a Lua source, created once per process. Run it with the
+    client or pipeline to use: get_script(SOURCE)(keys=..., args=..., client=...).
+    """
+    return get_redis().register_script(source)
+
+
+@cache
+def get_async_script(source):
+    """
+    redis.asyncio counterpart of get_script(); pass the client of the running loop.
+    """
+    return get_async_redis().register_script(source)
+
+
+def pool_usage():
+    """
+    Return {"sync": (in use, idle), "async": (in use, idle)} for this process's
+    pools that exist so far.
+    """
+    usage = {}
+    sync_pool = get_redis().connection_pool
+    if isinstance(sync_pool, BlockingConnectionPool):
+        usage["sync"] = sync_pool.usage()
+    pools = [client.connection_pool for client in list(_async_clients.values())]
+    if pools:
+        usage["async"] = tuple(map(sum, zip(*(pool.usage() for pool in pools))))
+    return usage
+
+
+_batch = contextvars.ContextVar("redis_write_batch", default=None)
+
+
+@contextmanager
+def write_pipeline():
+    """
+    Pipeline for writes whose replies aren't needed: the enclosing deferred_writes()
+    batch if there is one, otherwise a pipeline sent when the block exits.
+    """
+    pipe = _batch.get()
+    if pipe is not None:
+        yield pipe
+        return
+    pipe = get_redis().pipeline(transaction=False)
+    yield pipe
+    pipe.execute()
+
+
+def _begin_batch():
+    pipe = get_redis().pipeline(transaction=False)
+    return pipe, _batch.set(pipe)
+
+
+@contextmanager
+def deferred_writes():
+    """
+    Collect the write_pipeline() writes made in the block (in this thread, or in
+    sync_to_async calls from it) and send them in one round trip at the end.
+    Nothing is sent if the block raises.
+    """
+    pipe, token = _begin_batch()
+    try:
+        yield pipe
+    finally:
+        _batch.reset(token)
+    pipe.execute()
+
+
+@asynccontextmanager
+async def adeferred_writes():
+    """
+    deferred_writes() for async code whose writes happen in sync_to_async calls
+    (e.g. signal receivers run by Model.asave()).
+    """
+    pipe, token = _begin_batch()
+    try:
+        yield pipe
+    finally:
+        _batch.reset(token)
+    await sync_to_async(pipe.execute)()
+
+
+class RedisUnavailable(APIException):
+    """
+    Returned for requests that failed because Redis didn't answer in time.
+    DRF's exception handler turns `wait` into a Retry-After header.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Service temporarily unavailable, please retry shortly."
+    default_code = "redis_unavailable"
+    wait = 1
+
+
+def exception_handler(exc, context):
+    """
+    DRF exception handler answering Redis connection errors and timeouts with a 503.
+    """
+    from rest_framework.views import exception_handler as drf_exception_handler
+    if isinstance(exc, (redis.ConnectionError, redis.TimeoutError)):
+        exc = RedisUnavailable()
+    return drf_exception_handler(exc, context)
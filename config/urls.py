@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.contrib import admin
 from django.http import JsonResponse
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from authapi.views import RegisterView, LoginView, MeView, ForgotPasswordView, ResetPasswordView
+from config.metrics import metrics_view
+from authapi.schema import swagger_view
+from authapi.views import TokenRefreshView, LogoutView, IntrospectView, BulkRegisterView, jwks_view, schema_view
+
+if settings.ASYNC_VIEWS:
+    from authapi.async_views import RegisterView, LoginView, MeView, ForgotPasswordView, ResetPasswordView
+else:
+    from authapi.views import RegisterView, LoginView, MeView, ForgotPasswordView, ResetPasswordView
 
 def root(request):
     return JsonResponse({"message": "Welcome to the Auth Service API. See /api/docs/ for documentation."})
@@ -10,11 +17,17 @@ def root(request):
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/register", RegisterView.as_view(), name='register'),
+    path("api/auth/register/bulk", BulkRegisterView.as_view(), name='register-bulk'),
     path("api/auth/login", LoginView.as_view(), name='login'),
     path("api/auth/me", MeView.as_view(), name='me'),
     path("api/auth/forgot-password", ForgotPasswordView.as_view(), name='forgot-password'),
     path("api/auth/reset-password", ResetPasswordView.as_view(), name='reset-password'),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    path("api/auth/token/refresh", TokenRefreshView.as_view(), name='token-refresh'),
+    path("api/auth/logout", LogoutView.as_view(), name='logout'),
+    path("api/auth/introspect", IntrospectView.as_view(), name='introspect'),
+    path(".well-known/jwks.json", jwks_view, name="jwks"),
+    path("metrics", metrics_view, name="metrics"),
+    path("api/schema/", schema_view, name="schema"),
+    path("api/docs/", swagger_view, name="swagger-ui"),
     path("", root),
 ]